@@ -147,6 +147,15 @@ FILTER_CONFIG = {
 ALERT_TG_BOT_TOKEN = '8441606860:'
 TECH_ALERTS_CHAT_ID = '341122695'
 USER_ALERTS_CHAT_ID = '-1003636568887'
+TG_DISPATCH_WORKERS = 4 #параллельные отправки алертов в телеграм (отдельно от отправки сигналов на сервер)
+TG_GROUP_MESSAGES_PER_MINUTE = 20 #лимит телеграма на сообщения в группу
+TG_PRIVATE_MESSAGES_PER_MINUTE = 60 #лимит на сообщения в личный чат
+TG_BURST = 3 #сколько сообщений можно отправить подряд без ожидания
+TG_DIGEST_BACKLOG = 3 #при такой очереди в чат (или после 429) нижние тиры алертов склеиваются в дайджест
+TG_DIGEST_INTERVAL = 30 #как часто отправлять дайджест, сек
+STATUS_UPDATE_INTERVAL = 20 #как часто обновлять панель метрик в статусном сообщении тех. чата, сек
+METRICS_HISTOGRAM_SIZE = 1024 #по скольким последним значениям считаются перцентили (задержка алертов, лаг цикла)
+LOOP_LAG_CHECK_INTERVAL = 0.5 #как часто замерять задержку event loop, сек
 
 MANAGER_TG_BOT_TOKEN = '8441606860:'
 MANAGER_TG_BOT_IDS = [
@@ -200,11 +209,31 @@ CHAIN_NAMES = {
 #------WS SETTINGS
 SIGNAL_WS_URL = "ws://:8000/ws_in"
 RECONNECT_ATTEMPTS = 10
-RECONNECT_DELAY = 5
+RECONNECT_DELAY = 5 #начальная задержка переподключения, дальше растёт экспоненциально (со случайным разбросом), сек
+RECONNECT_MAX_DELAY = 60 #максимальная задержка между попытками переподключения, сек
+WS_PING_INTERVAL = 20 #как часто пинговать сервер сигналов (замер RTT), сек
+WS_PING_TIMEOUT = 20 #соединение считается мёртвым, если pong не пришёл за это время, сек
+SIGNAL_ACKS_ENABLED = False #сервер подтверждает сигналы сообщением {"type": "ack", "msg_id": ...}; без подтверждений сигнал считается доставленным после отправки
+SIGNAL_ACK_TIMEOUT = 10 #через сколько переотправить сигнал без подтверждения, сек
+SIGNAL_OUTBOX_TTL = 60 #сигнал, не доставленный за это время, выбрасывается (устаревшее автооткрытие опасно), сек
+SIGNAL_BATCH_WINDOW_MS = 0 #окно склейки автооткрытий одного блока в одно сообщение, мс; 0 - каждый сигнал отдельным сообщением
+SIGNAL_BATCH_MAX_SIGNALS = 50 #сообщение с таким числом сигналов уходит сразу, не дожидаясь конца окна склейки
+
+#------SIGNAL PUBLISHER (локальная раздача сигналов ботам/дашбордам)
+PUBLISHER_ENABLED = False
+PUBLISHER_HOST = '127.0.0.1'
+PUBLISHER_PORT = 8765
+PUBLISHER_CLIENT_QUEUE_SIZE = 1000 #буфер сигналов на клиента, при переполнении самые старые выбрасываются
 
 #------REST API SETTINGS
 
 CACHE_UPDATE_BATCH_SIZE = 100  #количество распаралелленых запросов в пачке при обновлении ончейн-данных
+PARSE_INFO_WORKERS = 2 #параллельные запросы cmc info (каждый по CACHE_UPDATE_BATCH_SIZE айди)
+PARSE_DECIMALS_WORKERS = 50 #параллельные rpc запросы decimals
+PARSE_FUTURES_WORKERS = 20 #параллельные запросы фьючерсных пар cmc
+PARSE_FUTURES_REQUEUE_ATTEMPTS = 2 #сколько раз вернуть в конец очереди токен, для которого не удалось получить фьючерсы; потом берутся прежние значения
+PARSE_PRICE_WORKERS = 30 #параллельные запросы цен
+PARSE_PROGRESS_LOG_INTERVAL = 10 #как часто логировать прогресс парсинга по стадиям, сек
 DELAY_BETWEEN_BATCHES = 10 #Задержка между пачками токенов, (на платной по идее можно в ноль поставить)
 REQUEST_RETRY = 3 #общее количество попыток для обычных ошибок
 REQUEST_TIMEOUT = 30 #таймаут запроса в секундах
@@ -218,9 +247,17 @@ MIN_MCAP = 1_000_000
 MIN_VOLUME = 100_000
 
 MIN_PARSED_PRICE_SIZE_TO_CHECK = 200_000
+PRICE_REFRESH_INTERVAL_MINUTES = 5 #как часто обновлять last_price для всех токенов без перепарса
+PRICE_REFRESH_BATCH_SIZE = 100 #сколько токенов в одном запросе цен (cmc id / gecko адреса)
+QUOTE_STALE_SECONDS = 420 #котировка в кэше старше этого считается устаревшей для алерта, сек
+QUOTE_FOLLOWUP_EDIT = True #алерт с устаревшей котировкой отправляется сразу и потом редактируется свежими данными
 
 PARSED_DATA_CHECK_DELAY_DAYS = 1 #раз в сколько дней обновлять данные 
 FORCE_UPDATE_ON_START = False #обновить данные пулов для евм/соланы на запуске 
+INCREMENTAL_REFRESH = False #плановое обновление дельтой (новые/делистнутые токены) вместо полного перепарса. True меняет поведение планового парсинга: полный перепарс только при отсутствии данных
+PARSE_ROLLING_REFRESH_SIZE = 300 #сколько уже известных токенов перепроверять на фьючерсы за одно обновление
+PARSE_CHECKPOINT_MAX_AGE_HOURS = 12 #чекпоинт прерванного парсинга старше этого не используется (чекпоинт только у полного парсинга, инкрементальное обновление при ошибке повторяется целиком)
+PARSE_RESUME_DELAY_MINUTES = 10 #пауза перед продолжением упавшего парсинга с чекпоинта
 
 #------CMC DATA
 
@@ -284,6 +321,15 @@ CMC_BLACK_LISTS = {
         "limit": 700
     }
 }
+#============================= STORAGE SETTINGS ==================================
+
+SIGNAL_HISTORY_ROTATE_DAYS = 30 #раз в сколько дней начинать новый файл истории сигналов
+SIGNAL_HISTORY_MAX_DB_MB = 512 #максимальный размер активного файла истории сигналов, МБ
+PERSIST_COALESCE_DELAY = 0.5 #сколько ждать перед записью json, чтобы склеить частые сохранения, сек
+PERSIST_COMPACT_THRESHOLD_KB = 1024 #json больше этого размера пишется без отступов, КБ
+LABEL_RELOAD_CHECK_INTERVAL = 10 #как часто проверять изменения файлов фильтров/меток для горячей перезагрузки, сек
+LABEL_INDEX_MIN_FILE_MB = 5 #файлы меток больше этого размера грузятся через компактный mmap индекс (.idx рядом), МБ
+
 #=============================FILE PATHS========================================
 
 TOKEN_DATA_BASE_PATH = 'database/'
@@ -293,6 +339,12 @@ CUSTOM_RULES_PATH = TOKEN_DATA_BASE_PATH + 'custom_rules.json'
 BANNED_PATH = TOKEN_DATA_BASE_PATH + 'banned.json'
 SUPPLY_DATA_PATH = TOKEN_DATA_BASE_PATH + 'token_data.json'
 LAST_CHECK_PATH = TOKEN_DATA_BASE_PATH + 'last_check.txt'
+PARSE_CHECKPOINT_PATH = TOKEN_DATA_BASE_PATH + 'parse_checkpoint.json'
+SKIPPED_CMC_IDS_PATH = TOKEN_DATA_BASE_PATH + 'skipped_cmc_ids.json'
+STARTUP_SNAPSHOT_PATH = TOKEN_DATA_BASE_PATH + 'startup.snapshot'
+SIGNAL_HISTORY_DB_PATH = TOKEN_DATA_BASE_PATH + 'signals_history.db'
+SIGNAL_HISTORY_LEGACY_PATH = TOKEN_DATA_BASE_PATH + 'signals_history.json'
+SIGNAL_OUTBOX_DB_PATH = TOKEN_DATA_BASE_PATH + 'signals_outbox.db'
 
 TP_CACHE_PATH = TOKEN_DATA_BASE_PATH + '/TP_data/'
 
@@ -3,16 +3,18 @@ Price tracker for monitoring token prices after usd_based_transfer signals.
 Schedules delayed price checks and triggers alerts on significant drops.
 """
 import asyncio
+import itertools
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Dict, Optional, Callable, Awaitable
-from utils import get_logger, Gecko
+from utils import get_logger, get_metrics, Gecko
 
 
 @dataclass
 class PendingPriceCheck:
     """Represents a scheduled price check"""
-    message_id: int
+    # None until the alert it replies to is sent
+    message_id: Optional[int]
     chat_id: str
     chain: str
     contract: str
@@ -32,16 +34,21 @@ class PriceTracker:
             reply_callback: Async function to call when price drop detected.
                            Receives (pending_check, new_price, drop_percent)
         """
-        self.pending_checks: Dict[str, PendingPriceCheck] = {}  # key: f"{chain}:{contract}:{message_id}"
+        self.pending_checks: Dict[str, PendingPriceCheck] = {}  # key: f"{chain}:{contract}:{seq}"
         self.gecko = Gecko()
         self.logger = get_logger("PRICE_TRACKER")
         self.reply_callback = reply_callback
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._seq = itertools.count()
+        metrics = get_metrics()
+        metrics.gauge('price_checks_pending', fn=lambda: len(self.pending_checks))
+        self._checks = metrics.counter('price_checks')
+        self._check_errors = metrics.counter('price_check_errors')
     
     def schedule_check(
         self,
-        message_id: int,
+        message_id: Optional[int],
         chat_id: str,
         chain: str,
         contract: str,
@@ -50,12 +57,15 @@ class PriceTracker:
         delay_minutes: int,
         threshold_percent: float,
         cmc_id: Optional[int] = None
-    ):
-        """Schedule a price check after delay_minutes"""
+    ) -> str:
+        """
+        Schedule a price check after delay_minutes and return its key.
+        message_id may be None while the alert waits to be sent, see set_message_id.
+        """
         check_time = datetime.now(timezone.utc).timestamp() + (delay_minutes * 60)
         check_time_dt = datetime.fromtimestamp(check_time, tz=timezone.utc)
         
-        key = f"{chain}:{contract}:{message_id}"
+        key = f"{chain}:{contract}:{next(self._seq)}"
         self.pending_checks[key] = PendingPriceCheck(
             message_id=message_id,
             chat_id=chat_id,
@@ -72,13 +82,23 @@ class PriceTracker:
             f"Scheduled price check for {ticker} ({chain}) in {delay_minutes}m. "
             f"Initial price: ${initial_price:.6f}, threshold: {threshold_percent}%"
         )
+        return key
+
+    def set_message_id(self, key: str, message_id: Optional[int]):
+        """Attach the sent alert to a check. None means the alert was not sent and drops the check."""
+        if message_id is None:
+            self.pending_checks.pop(key, None)
+        elif key in self.pending_checks:
+            self.pending_checks[key].message_id = message_id
     
     async def _check_price(self, pending: PendingPriceCheck) -> Optional[float]:
         """Get current price for a pending check"""
+        self._checks.inc()
         try:
             price = await self.gecko.get_token_price_simple(pending.chain, pending.contract)
             return price
         except Exception as e:
+            self._check_errors.inc()
             self.logger.error(f"Error fetching price for {pending.ticker}: {e}")
             return None
     
@@ -88,6 +108,9 @@ class PriceTracker:
         keys_to_remove = []
         
         for key, pending in list(self.pending_checks.items()):
+            if pending.message_id is None:
+                # Alert still waiting in the Telegram queue, nothing to reply to yet
+                continue
             if now >= pending.check_time:
                 self.logger.debug(f"Processing price check for {pending.ticker}")
                 
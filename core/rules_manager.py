@@ -1,30 +1,25 @@
 import json
 from typing import Dict, Literal
-from config import SUPPLY_DATA_PATH, CUSTOM_RULES_PATH, CHAIN_NAMES
-from utils import get_logger
+from config import CUSTOM_RULES_PATH, CHAIN_NAMES
+from utils import get_logger, get_token_registry, get_persistence, get_startup_snapshot, source_stats
 
 class RulesManager:
     def __init__(self):
         self.logger = get_logger("RULES_MANAGER")
-        self.token_data = self._load_token_data()
+        self.token_registry = get_token_registry()
         self.custom_rules = self._load_custom_rules()
 
-    def _load_token_data(self):
-        try:
-            with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-                raw = json.load(f)
-                if isinstance(raw, list) and len(raw) > 1:
-                    return raw[1]
-                else:
-                    return {}
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            self.logger.error(f"Failed to load token_data.json: {e}")
-            return {}
-
     def _load_custom_rules(self):
+        snapshot = get_startup_snapshot()
+        custom_rules = snapshot.get('custom_rules')
+        if custom_rules is not None:
+            return custom_rules
+        sources = source_stats([CUSTOM_RULES_PATH])
         try:
             with open(CUSTOM_RULES_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                custom_rules = json.load(f)
+            snapshot.put('custom_rules', custom_rules, sources)
+            return custom_rules
         except FileNotFoundError:
             return {}
         except json.JSONDecodeError as e:
@@ -32,21 +27,22 @@ class RulesManager:
             return {}
 
     def _save_custom_rules(self):
-        with open(CUSTOM_RULES_PATH, 'w') as f:
-            json.dump(self.custom_rules, f, indent=4)
+        custom_rules = self.custom_rules
+        get_persistence().write(
+            CUSTOM_RULES_PATH,
+            custom_rules,
+            on_written=lambda: get_startup_snapshot().put('custom_rules', custom_rules, source_stats([CUSTOM_RULES_PATH]))
+        )
 
     def get_token_data(self, token_address: str) -> Dict:
-        token_data = self._load_token_data()
-        for chain_name, tokens in token_data.items():
-            for addr, data in tokens.items():
-                if addr == token_address:
-                    return {
-                        "ticker": data.get("ticker", ""),
-                        "chain": chain_name,
-                        "decimals": data.get("decimals"),
-                        "circulating_supply": data.get("circulating_supply"),
-                        "supply": data.get("total_supply"),
-                    }
+        for chain_name, _, data in self.token_registry.find(token_address):
+            return {
+                "ticker": data.get("ticker", ""),
+                "chain": chain_name,
+                "decimals": data.get("decimals"),
+                "circulating_supply": data.get("circulating_supply"),
+                "supply": data.get("total_supply"),
+            }
         return {}
 
     def add_rule(
@@ -108,22 +104,18 @@ class RulesManager:
         return True
 
     def get_rules(self, chain: str, token_address: str) -> Dict:
-        self._load_custom_rules()
         chain = chain.upper()
         return self.custom_rules.get(chain, {}).get(token_address, {})
 
     def get_chain_rules(self, chain: str) -> Dict:
-        self._load_custom_rules()
         chain = chain.upper()
         return self.custom_rules.get(chain, {})
 
     def get_all_rules(self) -> Dict:
-        self._load_custom_rules()
         return self.custom_rules
 
     def get_all_rules_flat(self) -> list:
         """Returns a flat list of (chain, token_address, data) tuples for UI display"""
-        self._load_custom_rules()
         result = []
         for chain, tokens in self.custom_rules.items():
             for token_address, data in tokens.items():
@@ -166,5 +158,4 @@ class RulesManager:
         return True
 
     def reload(self):
-        self._load_token_data()
-        self._load_custom_rules()
+        self.custom_rules = self._load_custom_rules()
@@ -1,11 +1,12 @@
 import asyncio
 import json
+import time
 from typing import Dict, List
 from config import CHAIN_NAMES, EVENT_SIGNATURES
-from utils import get_logger
+from utils import get_logger, get_metrics
 from onchain import BlockListenerEVM
 from tg_client import TelegramClient, RulesBot
-from onchain import EventDetectorEVM
+from onchain import EventDetectorEVM, LabelStore, acquire_label_store, release_label_store
 from .rules_manager import RulesManager
 from parser import SupplyParser
 from .ws_client import WebsocketClient
@@ -26,12 +27,16 @@ class Runner:
         self.tg_client = TelegramClient(supply_parser=self.token_parser)
         self.detectors: Dict[str, EventDetectorEVM] = {}
         self.listeners: Dict[str, BlockListenerEVM] = {}
+        self.label_store: LabelStore = None
         self.ws_client: WebsocketClient = None
         self.rules_bot: RulesBot = None
         self.logger = get_logger("RUNNER")
 
     async def _init_components(self):
-        await self.token_parser.start_scheduled_parsing_loop_task(self.update_token_address_list)
+        await self.token_parser.start_scheduled_parsing_loop_task(
+            self.update_token_address_list,
+            self.apply_token_address_delta,
+        )
         self.token_data = self.token_parser.main_token_data
         self.ws_client = WebsocketClient(self.tg_client)
         self.custom_rules = self.rules_manager.get_all_rules()
@@ -42,35 +47,52 @@ class Runner:
         self.rules_bot = RulesBot(
             rules_manager=self.rules_manager,
             update_callback=callback_for_rules_bot,
+            signal_history=self.ws_client.signal_history,
         )
         
-        for chain_name in self.chains:
-            chain_token_data = self.token_data.get(chain_name, {})
-            if not chain_token_data:
-                self.logger.warning(f"No token data for {chain_name}, skipping")
-                continue
-            
-            detector = EventDetectorEVM(
-                tg_client=self.tg_client,
-                chain_name=chain_name,
-                token_data=self.token_data,
-                custom_rules=self.custom_rules,
-                supply_parser=self.token_parser
-            )
-            self.detectors[chain_name] = detector
-            self.ws_client.add_detector(chain_name, detector)
-            
-            token_address_list = get_full_token_list(chain_name) 
+        # Filters, labels and custom rules are loaded once and shared by every chain
+        self.label_store = acquire_label_store()
+        t1 = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._init_chain(chain_name) for chain_name in self.chains),
+            return_exceptions=True
+        )
+        for chain_name, result in zip(self.chains, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to initialize {chain_name}: {result}")
+        self.logger.info(f"Initialized {len(self.listeners)}/{len(self.chains)} chains in {time.perf_counter() - t1:.1f}s")
+
+    async def _init_chain(self, chain_name: str):
+        chain_token_data = self.token_data.get(chain_name, {})
+        if not chain_token_data:
+            self.logger.warning(f"No token data for {chain_name}, skipping")
+            return
+        
+        detector = EventDetectorEVM(
+            tg_client=self.tg_client,
+            chain_name=chain_name,
+            token_data=self.token_data,
+            custom_rules=self.custom_rules,
+            supply_parser=self.token_parser
+        )
+        
+        token_address_list = get_full_token_list(chain_name, self.custom_rules)
+        try:
             listener = await BlockListenerEVM.create(
                 tg_client=self.tg_client,
                 chain_name=chain_name,
                 token_address_list=token_address_list,
                 target_events=self.target_events,
             )
-            self.listeners[chain_name] = listener
-            self.ws_client.add_listener(chain_name, listener)
-            
-            self.logger.success(f"Initialized {chain_name}")
+        except BaseException:
+            detector.close()
+            raise
+        self.detectors[chain_name] = detector
+        self.ws_client.add_detector(chain_name, detector)
+        self.listeners[chain_name] = listener
+        self.ws_client.add_listener(chain_name, listener)
+        
+        self.logger.success(f"Initialized {chain_name}")
 
     def update_custom_rules(self,):
         self.custom_rules = self.rules_manager.get_all_rules()
@@ -79,21 +101,39 @@ class Runner:
         self.logger.info(f"Updated custom rules for {len(self.detectors)} detectors")
     
     def reload_filters(self):
-        for chain_name, detector in self.detectors.items():
-            detector.reload_filters()
+        # Detectors share one label store, a single reload swaps it for all of them
+        self.label_store.reload()
         self.logger.info(f"Reloaded filters for {len(self.detectors)} detectors")
 
     def update_token_address_list(self):
+        self.tg_client.schedule_template_precompute()
         for chain_name, listener in self.listeners.items():
-            token_list = get_full_token_list(chain_name)
+            token_list = get_full_token_list(chain_name, self.custom_rules)
             if not token_list:
                 self.logger.warning(f"No token list for {chain_name}, skipping")
                 continue
             listener.update_token_address_list(token_list)
             self.logger.info(f"Updated token list for {chain_name}")
 
+    def apply_token_address_delta(self, delta: dict):
+        self.tg_client.schedule_template_precompute()
+        for chain_name, chain_delta in delta.items():
+            listener = self.listeners.get(chain_name)
+            if not listener:
+                continue
+            # Tokens with custom rules stay subscribed even if they drop out of the parsed set
+            custom_tokens = self.rules_manager.get_chain_rules(chain_name)
+            added = chain_delta['added']
+            removed = [address for address in chain_delta['removed'] if address not in custom_tokens]
+            listener.apply_token_address_delta(added, removed)
+            self.logger.info(f"Applied token delta for {chain_name}: +{len(added)} / -{len(removed)}")
+
     async def start(self):
         await self._init_components()
+        self.tg_client.schedule_template_precompute()
+        self.token_parser.start_price_refresh_loop_task()
+        self.label_store.start_watcher()
+        get_metrics().start_loop_monitor()
         
         rules_bot_task = asyncio.create_task(self.rules_bot.start())
         tg_bot_status_task = asyncio.create_task(self.tg_client.start_status_monitor(self.chains))
@@ -104,6 +144,15 @@ class Runner:
             rules_bot_task.cancel()
             tg_bot_status_task.cancel()
             await self.rules_bot.stop()
+            self.ws_client.signal_history.stop()
+            self.ws_client.outbox.close()
+            if self.ws_client.publisher:
+                await self.ws_client.publisher.stop()
+            self.label_store.stop_watcher()
+            for detector in self.detectors.values():
+                detector.close()
+            release_label_store(self.label_store)
+            get_metrics().stop_loop_monitor()
             try:
                 await rules_bot_task
                 await tg_bot_status_task
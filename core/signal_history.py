@@ -0,0 +1,283 @@
+"""
+Append-only signal history.
+Signals go to SQLite (WAL mode) from a background writer thread, so saving
+never blocks the event loop. The active database is rotated by size and age,
+and the old signals_history.json is migrated into it once on first start.
+Queries run over the active database and rotated segments, newest first.
+"""
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional, List
+from config import (
+    SIGNAL_HISTORY_DB_PATH,
+    SIGNAL_HISTORY_LEGACY_PATH,
+    SIGNAL_HISTORY_ROTATE_DAYS,
+    SIGNAL_HISTORY_MAX_DB_MB,
+)
+from utils import get_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    saved_at REAL NOT NULL,
+    chain TEXT,
+    ticker TEXT,
+    contract TEXT,
+    event_type TEXT,
+    tx_hash TEXT,
+    auto_open INTEGER,
+    message_tier TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signals_saved_at ON signals(saved_at);
+CREATE INDEX IF NOT EXISTS idx_signals_ticker ON signals(ticker, saved_at);
+CREATE INDEX IF NOT EXISTS idx_signals_contract ON signals(contract, saved_at);
+CREATE INDEX IF NOT EXISTS idx_signals_chain ON signals(chain, saved_at);
+CREATE INDEX IF NOT EXISTS idx_signals_event_type ON signals(event_type, saved_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INSERT_SQL = """
+INSERT INTO signals (saved_at, chain, ticker, contract, event_type, tx_hash, auto_open, message_tier, payload)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Max signals committed in one transaction by the writer
+WRITE_BATCH_SIZE = 500
+# Writes between rotation checks
+ROTATION_CHECK_EVERY = 100
+
+
+class SignalHistory:
+    """Signal history store with a background writer thread"""
+
+    def __init__(
+        self,
+        db_path: str = SIGNAL_HISTORY_DB_PATH,
+        legacy_json_path: str = SIGNAL_HISTORY_LEGACY_PATH,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.legacy_json_path = Path(legacy_json_path)
+        self.logger = get_logger("SIGNAL_DB")
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._writes_since_check = 0
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._writer_loop, name="signal-history-writer", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Signal history writer started: {self.db_path}")
+
+    def stop(self, timeout: float = 5):
+        """Flush queued signals and stop the writer thread"""
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def backlog(self) -> int:
+        """Signals queued but not written yet"""
+        return self._queue.qsize()
+
+    def save(self, signal: dict):
+        """Queue a signal for writing. Never blocks."""
+        self._queue.put((time.time(), dict(signal)))
+
+    def _segment_paths(self) -> List[Path]:
+        """Active database first, then rotated segments from newest to oldest"""
+        segments = sorted(
+            self.db_path.parent.glob(f"{self.db_path.stem}.*{self.db_path.suffix}"),
+            reverse=True
+        )
+        return ([self.db_path] if self.db_path.exists() else []) + segments
+
+    def _segment_end(self, path: Path) -> float:
+        """Rotation time of a segment, taken from its name"""
+        suffix = path.stem.rsplit('.', 1)[-1]
+        try:
+            return datetime.strptime(suffix, '%Y%m%d_%H%M%S').timestamp()
+        except ValueError:
+            return float('inf')
+
+    def query(
+        self,
+        ticker: str = None,
+        contract: str = None,
+        chain: str = None,
+        event_type: str = None,
+        since: float = None,
+        until: float = None,
+        limit: int = 50,
+    ) -> List[dict]:
+        """
+        Signals matching all given filters, newest first.
+        since/until are unix timestamps. Every filter is backed by an index,
+        so lookups stay fast regardless of history size.
+        """
+        conditions, params = [], []
+        for column, value in (
+            ('ticker', ticker.lower() if ticker else None),
+            ('contract', contract.lower() if contract else None),
+            ('chain', chain.lower() if chain else None),
+            ('event_type', event_type),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("saved_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("saved_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT payload FROM signals {where} ORDER BY saved_at DESC LIMIT ?"
+
+        results = []
+        for path in self._segment_paths():
+            remaining = limit - len(results)
+            if remaining <= 0:
+                break
+            if since is not None and path != self.db_path and self._segment_end(path) < since:
+                # Segments are ordered by rotation time, older ones cannot match either
+                break
+            try:
+                conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                try:
+                    rows = conn.execute(sql, (*params, remaining)).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                # Segment may be mid-rotation or still empty
+                self.logger.debug(f"Skipping {path.name} in query: {e}")
+                continue
+            results.extend(json.loads(payload) for payload, in rows)
+        return results
+
+    def last_for_token(self, token: str, limit: int = 10) -> List[dict]:
+        """Last N signals for a token, by contract address or ticker"""
+        if token.lower().startswith('0x'):
+            return self.query(contract=token, limit=limit)
+        return self.query(ticker=token, limit=limit)
+
+    async def aquery(self, **filters) -> List[dict]:
+        return await asyncio.to_thread(self.query, **filters)
+
+    async def alast_for_token(self, token: str, limit: int = 10) -> List[dict]:
+        return await asyncio.to_thread(self.last_for_token, token, limit)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('created_at', ?)",
+            (str(time.time()),)
+        )
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _row(saved_at: float, signal: dict) -> tuple:
+        entry = {
+            **signal,
+            'saved_at': datetime.fromtimestamp(saved_at, tz=timezone.utc).isoformat()
+        }
+        return (
+            saved_at,
+            signal.get('chain'),
+            (signal.get('ticker') or '').lower(),
+            (signal.get('contract') or '').lower(),
+            signal.get('event_type'),
+            signal.get('tx_hash'),
+            int(bool(signal.get('auto_open'))),
+            signal.get('message_tier'),
+            json.dumps(entry, default=str),
+        )
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        if not self.legacy_json_path.exists():
+            return
+        try:
+            with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+                signals = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            self.logger.error(f"Failed to read {self.legacy_json_path} for migration: {e}")
+            return
+        rows = []
+        for signal in signals if isinstance(signals, list) else []:
+            try:
+                saved_at = datetime.fromisoformat(signal.pop('saved_at')).timestamp()
+            except (KeyError, TypeError, ValueError):
+                saved_at = time.time()
+            rows.append(self._row(saved_at, signal))
+        conn.executemany(INSERT_SQL, rows)
+        conn.commit()
+        self.legacy_json_path.rename(self.legacy_json_path.with_suffix('.json.migrated'))
+        self.logger.success(f"Migrated {len(rows)} signals from {self.legacy_json_path}")
+
+    def _should_rotate(self, conn: sqlite3.Connection) -> bool:
+        wal_path = Path(str(self.db_path) + '-wal')
+        size = os.path.getsize(self.db_path) + (os.path.getsize(wal_path) if wal_path.exists() else 0)
+        size_mb = size / (1024 * 1024)
+        if size_mb >= SIGNAL_HISTORY_MAX_DB_MB:
+            return True
+        row = conn.execute("SELECT value FROM meta WHERE key = 'created_at'").fetchone()
+        created_at = float(row[0]) if row else time.time()
+        return time.time() - created_at >= SIGNAL_HISTORY_ROTATE_DAYS * 24 * 60 * 60
+
+    def _rotate(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        suffix = datetime.now().strftime('%Y%m%d_%H%M%S')
+        rotated_path = self.db_path.with_name(f"{self.db_path.stem}.{suffix}{self.db_path.suffix}")
+        os.replace(self.db_path, rotated_path)
+        for sidecar in ('-wal', '-shm'):
+            sidecar_path = Path(str(self.db_path) + sidecar)
+            if sidecar_path.exists():
+                sidecar_path.unlink()
+        self.logger.info(f"Rotated signal history to {rotated_path}")
+        return self._open()
+
+    def _writer_loop(self):
+        conn = self._open()
+        self._migrate_legacy_json(conn)
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            try:
+                conn.executemany(INSERT_SQL, [self._row(saved_at, signal) for saved_at, signal in batch])
+                conn.commit()
+                self._writes_since_check += len(batch)
+                if self._writes_since_check >= ROTATION_CHECK_EVERY:
+                    self._writes_since_check = 0
+                    if self._should_rotate(conn):
+                        conn = self._rotate(conn)
+            except Exception as e:
+                self.logger.error(f"Error writing {len(batch)} signals: {e}")
+        conn.close()
@@ -0,0 +1,96 @@
+"""
+Durable outbound queue for signals sent to the controller WS server.
+Every message gets an idempotency key (msg_id) and stays in SQLite until the
+server acknowledges it, so signals survive disconnects and restarts and are
+resent in order after reconnect. Messages older than SIGNAL_OUTBOX_TTL are
+expired instead of sent: a late auto-open signal is worse than none.
+"""
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+import ujson
+from config import SIGNAL_OUTBOX_DB_PATH, SIGNAL_OUTBOX_TTL
+from utils import get_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    msg_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL
+);
+"""
+
+
+class SignalOutbox:
+    """Signals waiting for delivery. Small and rarely written, so calls are synchronous."""
+
+    def __init__(self, db_path: str = SIGNAL_OUTBOX_DB_PATH, ttl: float = SIGNAL_OUTBOX_TTL):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.logger = get_logger("OUTBOX")
+        self._conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        pending = len(self)
+        if pending:
+            self.logger.info(f"{pending} undelivered signals left from the previous run")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def put(self, message: dict) -> str:
+        """Persist a message and return its msg_id. The id and creation time are added to the message."""
+        msg_id = uuid.uuid4().hex
+        created_at = time.time()
+        message = {**message, 'msg_id': msg_id, 'created_at': created_at}
+        self._conn.execute(
+            "INSERT INTO outbox (msg_id, created_at, payload) VALUES (?, ?, ?)",
+            (msg_id, created_at, ujson.dumps(message, ensure_ascii=False, escape_forward_slashes=False))
+        )
+        return msg_id
+
+    def expire(self) -> int:
+        """Drop messages older than the TTL. Returns how many were dropped."""
+        deadline = time.time() - self.ttl
+        expired = self._conn.execute(
+            "SELECT msg_id, attempts, payload FROM outbox WHERE created_at < ?", (deadline,)
+        ).fetchall()
+        if not expired:
+            return 0
+        self._conn.execute("DELETE FROM outbox WHERE created_at < ?", (deadline,))
+        for msg_id, attempts, payload in expired:
+            signals = ujson.loads(payload).get('signals', [])
+            self.logger.warning(
+                f"Signal {msg_id} expired undelivered after {attempts} send attempts: "
+                f"{[(signal.get('ticker'), signal.get('event_type')) for signal in signals]}"
+            )
+        return len(expired)
+
+    def due(self, resend_before: float) -> List[Tuple[str, str]]:
+        """(msg_id, serialized message) not sent yet or last sent before resend_before, oldest first"""
+        self.expire()
+        rows = self._conn.execute(
+            "SELECT msg_id, payload FROM outbox WHERE sent_at IS NULL OR sent_at < ? ORDER BY id",
+            (resend_before,)
+        ).fetchall()
+        return rows
+
+    def mark_sent(self, msg_id: str):
+        self._conn.execute(
+            "UPDATE outbox SET sent_at = ?, attempts = attempts + 1 WHERE msg_id = ?",
+            (time.time(), msg_id)
+        )
+
+    def ack(self, msg_id: str) -> bool:
+        """Remove a delivered message. False if it is unknown (already acked or expired)."""
+        return self._conn.execute("DELETE FROM outbox WHERE msg_id = ?", (msg_id,)).rowcount > 0
+
+    def close(self):
+        self._conn.close()
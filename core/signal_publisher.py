@@ -0,0 +1,193 @@
+"""
+Embedded WS publisher that fans signals out to local consumers
+(execution bots, dashboards, research tools).
+
+Clients connect to ws://PUBLISHER_HOST:PUBLISHER_PORT and pick signals with
+query parameters, comma separated values allowed:
+    ?chain=ethereum,bsc&event_type=transfer&tier=Tier%201&auto_open=1
+Filters can be changed later by sending
+    {"type": "subscribe", "chain": [...], "event_type": [...], "tier": [...], "auto_open": true}
+Every client has a bounded buffer. When a slow client falls behind, its
+oldest signals are dropped, so it never holds back the detection pipeline.
+"""
+import asyncio
+from collections import deque
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+import ujson
+import websockets
+from config import PUBLISHER_HOST, PUBLISHER_PORT, PUBLISHER_CLIENT_QUEUE_SIZE
+from utils import get_logger, get_metrics
+
+FILTER_FIELDS = {
+    'chain': 'chain',
+    'event_type': 'event_type',
+    'tier': 'message_tier',
+}
+
+
+class SubscriberFilter:
+    """Server-side signal filter of one client. Empty filter passes everything."""
+
+    def __init__(self, chain=None, event_type=None, tier=None, auto_open: bool = False):
+        self.values = {
+            'chain': {value.lower() for value in chain} if chain else None,
+            'event_type': set(event_type) if event_type else None,
+            'tier': set(tier) if tier else None,
+        }
+        self.auto_open = auto_open
+
+    @classmethod
+    def from_query(cls, path: str) -> 'SubscriberFilter':
+        params = parse_qs(urlsplit(path).query)
+
+        def values(name: str) -> Optional[list]:
+            items = [item.strip() for value in params.get(name, []) for item in value.split(',') if item.strip()]
+            return items or None
+
+        auto_open = params.get('auto_open', ['0'])[0].lower() in ('1', 'true', 'yes')
+        return cls(values('chain'), values('event_type'), values('tier'), auto_open)
+
+    @classmethod
+    def from_message(cls, data: dict) -> 'SubscriberFilter':
+        def values(name: str) -> Optional[list]:
+            value = data.get(name)
+            return [value] if isinstance(value, str) else value
+
+        return cls(values('chain'), values('event_type'), values('tier'), bool(data.get('auto_open')))
+
+    def matches(self, signal: dict) -> bool:
+        if self.auto_open and not signal.get('auto_open'):
+            return False
+        for name, signal_field in FILTER_FIELDS.items():
+            allowed = self.values[name]
+            if allowed is None:
+                continue
+            value = signal.get(signal_field)
+            if name == 'chain' and value:
+                value = value.lower()
+            if value not in allowed:
+                return False
+        return True
+
+    def __repr__(self):
+        active = {name: sorted(values) for name, values in self.values.items() if values}
+        if self.auto_open:
+            active['auto_open'] = True
+        return str(active or 'all')
+
+
+class Subscriber:
+    def __init__(self, ws, signal_filter: SubscriberFilter, sent_counter, dropped_counter):
+        self.ws = ws
+        self.filter = signal_filter
+        self.buffer: deque = deque(maxlen=PUBLISHER_CLIENT_QUEUE_SIZE)
+        self.wakeup = asyncio.Event()
+        self.dropped = 0
+        self.sent = 0
+        # Process-wide totals in the metrics registry, next to the per-client counts
+        self._sent_counter = sent_counter
+        self._dropped_counter = dropped_counter
+
+    @property
+    def name(self) -> str:
+        return f"{self.ws.remote_address[0]}:{self.ws.remote_address[1]}" if self.ws.remote_address else "client"
+
+    def offer(self, payload: str) -> bool:
+        """Buffer a payload. False if the oldest buffered one was dropped to make room."""
+        dropped = len(self.buffer) == self.buffer.maxlen
+        if dropped:
+            self.dropped += 1
+            self._dropped_counter.inc()
+        self.buffer.append(payload)
+        self.wakeup.set()
+        return not dropped
+
+    def mark_sent(self):
+        self.sent += 1
+        self._sent_counter.inc()
+
+
+class SignalPublisher:
+    """Local fan-out WS server. publish() never blocks and never waits for clients."""
+
+    def __init__(self, host: str = PUBLISHER_HOST, port: int = PUBLISHER_PORT):
+        self.host = host
+        self.port = port
+        self.logger = get_logger("PUBLISHER")
+        self.subscribers: set[Subscriber] = set()
+        self._server = None
+        metrics = get_metrics()
+        metrics.gauge('publisher_subscribers', fn=lambda: len(self.subscribers))
+        metrics.gauge('publisher_queued', fn=lambda: sum(len(subscriber.buffer) for subscriber in self.subscribers))
+        self._sent = metrics.counter('publisher_sent')
+        self._dropped = metrics.counter('publisher_dropped')
+
+    async def start(self):
+        self._server = await websockets.serve(self._handle_client, self.host, self.port)
+        self.logger.success(f"Signal publisher listening on ws://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish(self, signal: dict):
+        """Queue a signal for every subscriber whose filter matches. Serialized once for all of them."""
+        payload = None
+        for subscriber in self.subscribers:
+            if not subscriber.filter.matches(signal):
+                continue
+            if payload is None:
+                payload = ujson.dumps(
+                    {'type': 'signal', 'signal': signal}, ensure_ascii=False, escape_forward_slashes=False
+                )
+            if not subscriber.offer(payload) and (
+                subscriber.dropped == 1 or subscriber.dropped % PUBLISHER_CLIENT_QUEUE_SIZE == 0
+            ):
+                self.logger.warning(
+                    f"Subscriber {subscriber.name} is too slow, {subscriber.dropped} signals dropped so far"
+                )
+
+    def stats(self) -> list[dict]:
+        return [
+            {'client': subscriber.name, 'filter': repr(subscriber.filter), 'queued': len(subscriber.buffer),
+             'sent': subscriber.sent, 'dropped': subscriber.dropped}
+            for subscriber in self.subscribers
+        ]
+
+    async def _handle_client(self, ws):
+        subscriber = Subscriber(ws, SubscriberFilter.from_query(ws.request.path), self._sent, self._dropped)
+        self.subscribers.add(subscriber)
+        self.logger.info(f"Subscriber {subscriber.name} connected, filter {subscriber.filter}")
+        sender_task = asyncio.create_task(self._send_loop(subscriber))
+        try:
+            async for message in ws:
+                try:
+                    data = ujson.loads(message)
+                except ValueError:
+                    continue
+                if isinstance(data, dict) and data.get('type') == 'subscribe':
+                    subscriber.filter = SubscriberFilter.from_message(data)
+                    self.logger.info(f"Subscriber {subscriber.name} changed filter to {subscriber.filter}")
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            sender_task.cancel()
+            self.logger.info(
+                f"Subscriber {subscriber.name} disconnected: {subscriber.sent} sent, {subscriber.dropped} dropped"
+            )
+
+    async def _send_loop(self, subscriber: Subscriber):
+        while True:
+            await subscriber.wakeup.wait()
+            subscriber.wakeup.clear()
+            while subscriber.buffer:
+                payload = subscriber.buffer.popleft()
+                try:
+                    await subscriber.ws.send(payload)
+                except websockets.ConnectionClosed:
+                    return
+                subscriber.mark_sent()
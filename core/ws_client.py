@@ -1,14 +1,24 @@
 import asyncio
+import itertools
 import json
+import random
+import time
+from typing import Optional
 import websockets
-from datetime import datetime, timezone
-from pathlib import Path
-from config import SIGNAL_WS_URL, RECONNECT_ATTEMPTS, RECONNECT_DELAY, USER_ALERTS_CHAT_ID
-from utils import get_logger
+from config import (
+    SIGNAL_WS_URL, RECONNECT_ATTEMPTS, RECONNECT_DELAY, RECONNECT_MAX_DELAY, USER_ALERTS_CHAT_ID,
+    SIGNAL_ACKS_ENABLED, SIGNAL_ACK_TIMEOUT, SIGNAL_BATCH_WINDOW_MS, SIGNAL_BATCH_MAX_SIGNALS,
+    WS_PING_INTERVAL, WS_PING_TIMEOUT,
+    PUBLISHER_ENABLED, TG_DISPATCH_WORKERS,
+)
+from utils import get_logger, get_metrics
 from onchain import BlockListenerEVM
 from onchain import EventDetectorEVM
 from tg_client import TelegramClient
 from .price_tracker import PriceTracker, PendingPriceCheck
+from .signal_history import SignalHistory
+from .signal_outbox import SignalOutbox
+from .signal_publisher import SignalPublisher
 
 
 class WebsocketClient:
@@ -18,13 +28,39 @@ class WebsocketClient:
         self.logger = get_logger("WS_CLIENT")
         self.tg_client = tg_client
         self.ws = None
-        self._connected = False
-        self._message_queue: asyncio.Queue = asyncio.Queue()
-        self._signals_file = Path("database/signals_history.json")
-        self._signals_file.parent.mkdir(parents=True, exist_ok=True)
+        # Connection state: exactly one of the two events is set
+        self._connected_event = asyncio.Event()
+        self._disconnected_event = asyncio.Event()
+        self._disconnected_event.set()
+        self._connected_at = 0.0
+        self._disconnected_at = time.time()
+        self.reconnects = 0
+        self.outbox = SignalOutbox()
+        self._outbox_wakeup = asyncio.Event()
+        # Auto-open signals collected within SIGNAL_BATCH_WINDOW_MS, sent as one message
+        self._batch: Optional[dict] = None
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self.signal_history = SignalHistory()
+        self.publisher: Optional[SignalPublisher] = SignalPublisher() if PUBLISHER_ENABLED else None
+        # (priority, seq, received_at, queued_at, chain_name, signal, price_check_key) for Telegram alert workers, higher tiers first
+        self._dispatch_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._dispatch_seq = itertools.count()
         
         # Initialize price tracker with callback
         self.price_tracker = PriceTracker(self._on_price_drop)
+        metrics = get_metrics()
+        metrics.gauge('queue_dispatch', fn=self._dispatch_queue.qsize)
+        metrics.gauge('queue_outbox', fn=lambda: len(self.outbox))
+        metrics.gauge('queue_history', fn=lambda: self.signal_history.backlog)
+        metrics.gauge('ws_connected', fn=lambda: int(self.connected))
+        metrics.gauge('ws_uptime_s', fn=lambda: self.connection_stats()['uptime'])
+        metrics.gauge('ws_downtime_s', fn=lambda: self.connection_stats()['downtime'])
+        metrics.gauge('ws_rtt_ms', fn=lambda: self.connection_stats()['rtt_ms'] or 0)
+        metrics.gauge('ws_reconnects', fn=lambda: self.reconnects)
+        # Closes of dropped connections, referenced until done so they are not garbage collected
+        self._background_tasks: set[asyncio.Task] = set()
+        self._detect_ms = metrics.histogram('detect_ms')
+        self._alert_latency_ms = metrics.histogram('alert_latency_ms')
     
     async def _on_price_drop(self, pending: PendingPriceCheck, new_price: float, drop_percent: float):
         """Callback when price drop is detected"""
@@ -45,150 +81,270 @@ class WebsocketClient:
         self.logger.info(f"Added detector for {chain_name}")
 
     def _save_signal(self, signal: dict):
-        """Append signal to JSON history file."""
-        signal_entry = {
-            **signal,
-            'saved_at': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Load existing signals or start fresh
-        signals = []
-        if self._signals_file.exists():
-            try:
-                with open(self._signals_file, 'r', encoding='utf-8') as f:
-                    signals = json.load(f)
-            except (json.JSONDecodeError, Exception):
-                signals = []
-        
-        signals.append(signal_entry)
-        
-        with open(self._signals_file, 'w', encoding='utf-8') as f:
-            json.dump(signals, f, indent=2, default=str)
+        """Queue signal for the append-only history store."""
+        self.signal_history.save(signal)
 
     async def _send_signal(self, message: dict):
-        """Queue a message to be sent to the WS server"""
-        await self._message_queue.put(message)
-        self.logger.info(f"Signal put to queue: {message}")
+        """
+        Queue a message for the WS server, coalescing signals of one block when batching is on.
+        A batch goes out when the window ends or once it holds SIGNAL_BATCH_MAX_SIGNALS signals.
+        """
+        if SIGNAL_BATCH_WINDOW_MS <= 0:
+            self._put_to_outbox(message)
+            return
+        if self._batch is None:
+            # Callbacks of one block are started together, so a few ms catch the whole block
+            self._batch = {**message, 'signals': []}
+            self._batch_timer = asyncio.get_running_loop().call_later(SIGNAL_BATCH_WINDOW_MS / 1000, self._flush_batch)
+        # Copies: signals get chain/tx_hash added after queueing, the controller payload stays as before
+        self._batch['signals'].extend(dict(signal) for signal in message['signals'])
+        if len(self._batch['signals']) >= SIGNAL_BATCH_MAX_SIGNALS:
+            self._flush_batch()
+
+    def _flush_batch(self):
+        if self._batch_timer:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, None
+        if batch and batch['signals']:
+            self._put_to_outbox(batch)
+
+    def _put_to_outbox(self, message: dict):
+        """Persist a message in the outbox, the sender loop delivers it"""
+        msg_id = self.outbox.put(message)
+        self._outbox_wakeup.set()
+        self.logger.info(f"Signal {msg_id} put to outbox ({len(message['signals'])} signals): {message}")
 
     async def _sender_loop(self):
-        """Background task that sends queued messages to the WS server"""
+        """
+        Background task that delivers outbox messages to the WS server in order.
+        Without acks a message is done once sent. With acks it stays in the outbox
+        and is resent on reconnect or after SIGNAL_ACK_TIMEOUT without an ack.
+        """
         while True:
-            message = await self._message_queue.get()
-            if self._connected and self.ws:
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), timeout=SIGNAL_ACK_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            self._outbox_wakeup.clear()
+            if not self.connected:
+                continue
+            ws = self.ws
+            resend_before = max(self._connected_at, time.time() - SIGNAL_ACK_TIMEOUT)
+            for msg_id, payload in self.outbox.due(resend_before):
                 try:
-                    await self.ws.send(json.dumps(message))
-                    self.logger.success(f"Signal sent to server")
+                    # Payload is stored serialized, resends cost no encoding
+                    await ws.send(payload)
                 except websockets.ConnectionClosed:
-                    self.logger.warning("Connection closed while sending, message dropped")
-                    self._connected = False
+                    self.logger.warning(f"Connection closed while sending, signal {msg_id} kept for resend")
+                    self._set_disconnected(ws)
+                    break
                 except Exception as e:
-                    self.logger.error(f"Error sending message: {e}")
+                    self.logger.error(f"Error sending signal {msg_id}: {e}")
+                    break
+                if SIGNAL_ACKS_ENABLED:
+                    self.outbox.mark_sent(msg_id)
+                else:
+                    self.outbox.ack(msg_id)
+                self.logger.success(f"Signal {msg_id} sent to server")
 
-    async def _receiver_loop(self):
-        """Background task that receives messages from WS server and handles ping/pong"""
-        while True:
-            if not self._connected or not self.ws:
-                await asyncio.sleep(0.1)
-                continue
-            try:
-                message = await self.ws.recv()
-                data = json.loads(message)
+    def _handle_ack(self, msg_id: str):
+        if self.outbox.ack(msg_id):
+            self.logger.success(f"Signal {msg_id} acknowledged by server")
+        else:
+            # Duplicate ack of a resent message or ack after expiry
+            self.logger.debug(f"Ack for unknown signal {msg_id}")
+
+    @property
+    def connected(self) -> bool:
+        return self._connected_event.is_set()
+
+    def _set_connected(self, ws):
+        self.ws = ws
+        self._connected_at = time.time()
+        self._disconnected_event.clear()
+        self._connected_event.set()
+        # Unacknowledged signals from the previous connection go out first
+        self._outbox_wakeup.set()
+
+    def _set_disconnected(self, ws):
+        """Mark ws as lost. Ignored for a connection that was already replaced."""
+        if self.ws is not ws or not self.connected:
+            return
+        self._disconnected_at = time.time()
+        self._connected_event.clear()
+        self._disconnected_event.set()
+
+    def connection_stats(self) -> dict:
+        """Uptime of the current connection (or downtime), ping RTT and reconnect count"""
+        now = time.time()
+        latency = getattr(self.ws, 'latency', 0) if self.connected else 0
+        return {
+            'connected': self.connected,
+            'uptime': now - self._connected_at if self.connected else 0,
+            'downtime': 0 if self.connected else now - self._disconnected_at,
+            'rtt_ms': latency * 1000 if latency else None,
+            'reconnects': self.reconnects,
+        }
+
+    async def _receiver_loop(self, ws):
+        """Receives messages of one connection until it closes"""
+        try:
+            async for message in ws:
+                try:
+                    data = json.loads(message)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Received non-JSON message: {message}")
+                    continue
                 
                 if data.get('type') == 'ping':
-                    await self.ws.send(json.dumps({'type': 'pong'}))
+                    await ws.send(json.dumps({'type': 'pong'}))
                     self.logger.success("Received ping, sent pong")
-                    
-            except websockets.ConnectionClosed:
-                self.logger.warning("Connection closed in receiver loop")
-                self._connected = False
-            except json.JSONDecodeError:
-                self.logger.warning(f"Received non-JSON message: {message}")
-            except Exception as e:
-                self.logger.error(f"Error in receiver loop: {e}")
+                elif data.get('type') == 'ack' and data.get('msg_id'):
+                    self._handle_ack(data['msg_id'])
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            self.logger.error(f"Error in receiver loop: {e}")
+        self.logger.warning("Connection closed in receiver loop")
+        self._set_disconnected(ws)
 
-    async def _connect(self):
-        """Connect to the WS server with retry logic"""
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so restarted clients do not reconnect in lockstep"""
+        delay = min(RECONNECT_MAX_DELAY, RECONNECT_DELAY * 2 ** attempt)
+        return delay * random.uniform(0.5, 1)
+
+    async def _connect(self) -> bool:
+        """Connect to the WS server with exponential backoff"""
         for attempt in range(RECONNECT_ATTEMPTS):
             try:
                 self.logger.info(f"Connecting to WS server: {SIGNAL_WS_URL}")
-                self.ws = await websockets.connect(SIGNAL_WS_URL)
-                self._connected = True
+                # Library keepalive pings measure RTT and drop connections with no pong in time
+                ws = await websockets.connect(
+                    SIGNAL_WS_URL, ping_interval=WS_PING_INTERVAL, ping_timeout=WS_PING_TIMEOUT
+                )
+                self._set_connected(ws)
                 self.logger.success(f"Connected to WS server: {SIGNAL_WS_URL}")
-                attempt = 0
                 return True
             except Exception as e:
                 self.logger.warning(f"Connection attempt {attempt + 1}/{RECONNECT_ATTEMPTS} failed: {e}")
                 if attempt < RECONNECT_ATTEMPTS - 1:
-                    await asyncio.sleep(RECONNECT_DELAY)
+                    await asyncio.sleep(self._backoff_delay(attempt))
         
         self.logger.error(f"Failed to connect to WS server after {RECONNECT_ATTEMPTS} attempts")
         return False
 
     async def _connection_loop(self):
-        """Maintain connection to the WS server"""
+        """Run the receiver of the current connection and reconnect once it is lost"""
         while True:
-            if not self._connected:
-                connected = await self._connect()
-                if connected:
-                    await self.ws.wait_closed()
-                    self._connected = False
-                else: 
-                    self.tg_client.send_error_alert(
-                        f"Failed to connect to controller WS server after {RECONNECT_ATTEMPTS} attempts",
-                        "Reconnect failed"
-                    )
-                    return
-            await asyncio.sleep(1)
+            ws = self.ws
+            receiver_task = asyncio.create_task(self._receiver_loop(ws))
+            await self._disconnected_event.wait()
+            receiver_task.cancel()
+            uptime = self._disconnected_at - self._connected_at
+            self.logger.warning(f"Disconnected from WS server after {uptime:.0f}s, reconnecting")
+            # Close in the background: a half-dead peer can hold the closing handshake for seconds
+            close_task = asyncio.create_task(ws.close())
+            self._background_tasks.add(close_task)
+            close_task.add_done_callback(self._background_tasks.discard)
+            if not await self._connect():
+                await self.tg_client.send_error_alert(
+                    "Reconnect failed",
+                    f"Failed to connect to controller WS server after {RECONNECT_ATTEMPTS} attempts"
+                )
+                return
+            self.reconnects += 1
 
     def _create_callback(self, chain_name: str):
         detector = self.detectors[chain_name]
         
-        async def callback(tx_hash: str, events: dict):
+        async def callback(tx_hash: str, events: dict, received_at: Optional[float] = None):
+            """
+            Hot path: detection, WS signal, history and queueing. Telegram sends are left to dispatch workers.
+            received_at is when the listener got the block, alert latency is counted from it.
+            """
             try:
-                signals = await detector.detect(tx_hash, events)
-                ws_msg = {
-                    'service_type': 'onchain_screener',
-                    'signals': []
-                }
-                if signals.get('signals'):
-                    for signal in signals.get('signals'):
-                        if signal.get('auto_open'):
-                            ws_msg['signals'].append(signal)
-                if ws_msg['signals']:
-                    self.logger.info(f"Auto open signals detected: {[(signal['ticker'], signal['event_type']) for signal in ws_msg['signals']]}")
-                    await self._send_signal(ws_msg)
-
-                for signal in signals.get('signals'):
+                t1 = time.perf_counter()
+                if received_at is None:
+                    received_at = t1
+                signals = (await detector.detect(tx_hash, events)).get('signals') or []
+                t2 = time.perf_counter()
+                self._detect_ms.observe((t2 - t1) * 1000)
+                auto_open_signals = [signal for signal in signals if signal.get('auto_open')]
+                if auto_open_signals:
+                    self.logger.info(f"Auto open signals detected: {[(signal['ticker'], signal['event_type']) for signal in auto_open_signals]}")
+                    await self._send_signal({
+                        'service_type': 'onchain_screener',
+                        'signals': auto_open_signals
+                    })
+
+                for signal in signals:
                     self.logger.info(f"Signal detected: {signal['ticker']} {signal['event_type']} on {chain_name}")
                     signal['chain'] = chain_name.lower()
                     signal['tx_hash'] = tx_hash
-                    message_id = await self.tg_client.send_alert(signal)
+                    if self.publisher:
+                        self.publisher.publish(signal)
+                    # Recorded here, not after the send: Telegram throttling must not delay or lose history
                     self._save_signal(signal)
-                    
-                    # Schedule price check for usd_based_transfer signals
-                    if signal.get('event_type') == 'usd_based_transfer' and message_id:
-                        delay_minutes = signal.get('price_check_delay_minutes', 5)
-                        threshold_percent = signal.get('price_drop_threshold_percent', 3)
-                        initial_price = signal.get('initial_price', 0)
-                        
-                        if initial_price > 0:
-                            self.price_tracker.schedule_check(
-                                message_id=message_id,
-                                chat_id=USER_ALERTS_CHAT_ID,
-                                chain=chain_name,
-                                contract=signal['contract'],
-                                ticker=signal['ticker'],
-                                initial_price=initial_price,
-                                delay_minutes=delay_minutes,
-                                threshold_percent=threshold_percent,
-                                cmc_id=signal.get('cmc_id')
-                            )
-                return
+                    price_check_key = self._schedule_price_check(chain_name, signal)
+                    self._dispatch_queue.put_nowait((
+                        self.tg_client.alert_priority(signal), next(self._dispatch_seq),
+                        received_at, time.perf_counter(), chain_name, signal, price_check_key
+                    ))
+                if signals:
+                    self.logger.debug(
+                        f"{chain_name} {tx_hash}: detect {(t2 - t1) * 1000:.2f} ms, "
+                        f"signal queueing {(time.perf_counter() - t2) * 1000:.3f} ms"
+                    )
             except Exception as e:
                 self.logger.error(f"Error in callback for {chain_name}: {e}")
         
         return callback
 
+    async def _dispatch_worker(self):
+        """Sends Telegram alerts for queued signals and binds their price checks to the sent messages"""
+        while True:
+            _, _, received_at, queued_at, chain_name, signal, price_check_key = await self._dispatch_queue.get()
+            try:
+                await self._dispatch_signal(received_at, queued_at, signal, price_check_key)
+            except Exception as e:
+                self.logger.error(f"Error dispatching {signal.get('ticker')} signal on {chain_name}: {e}")
+            finally:
+                self._dispatch_queue.task_done()
+
+    def _schedule_price_check(self, chain_name: str, signal: dict) -> Optional[str]:
+        """Price check for usd_based_transfer signals, bound to the alert message once it is sent"""
+        if signal.get('event_type') != 'usd_based_transfer':
+            return None
+        initial_price = signal.get('initial_price', 0)
+        if initial_price <= 0:
+            return None
+        return self.price_tracker.schedule_check(
+            message_id=None,
+            chat_id=USER_ALERTS_CHAT_ID,
+            chain=chain_name,
+            contract=signal['contract'],
+            ticker=signal['ticker'],
+            initial_price=initial_price,
+            delay_minutes=signal.get('price_check_delay_minutes', 5),
+            threshold_percent=signal.get('price_drop_threshold_percent', 3),
+            cmc_id=signal.get('cmc_id')
+        )
+
+    async def _dispatch_signal(self, received_at: float, queued_at: float, signal: dict, price_check_key: Optional[str]):
+        t1 = time.perf_counter()
+        message_id = await self.tg_client.send_alert(signal)
+        t2 = time.perf_counter()
+        if message_id:
+            # From block receipt to Telegram accepting the alert, digested alerts are not counted
+            self._alert_latency_ms.observe((t2 - received_at) * 1000)
+        if price_check_key:
+            self.price_tracker.set_message_id(price_check_key, message_id)
+        self.logger.debug(
+            f"Dispatched {signal['ticker']} {signal['event_type']}: waited {(t1 - queued_at) * 1000:.1f} ms, "
+            f"alert {(t2 - t1) * 1000:.1f} ms, backlog {self._dispatch_queue.qsize()}"
+        )
+
     async def _run_listener(self, chain_name: str):
         if chain_name not in self.detectors:
             self.logger.error(f"No detector for {chain_name}")
@@ -205,24 +361,25 @@ class WebsocketClient:
         
         if not await self._connect():
             self.logger.error(f"Failed to connect to WS server, exiting")
-            self.tg_client.send_error_alert(
-                f"Failed to connect to controller WS server after {RECONNECT_ATTEMPTS} attempts",
-                "WS connection failed"
+            await self.tg_client.send_error_alert(
+                "WS connection failed",
+                f"Failed to connect to controller WS server after {RECONNECT_ATTEMPTS} attempts"
             )
             return
         
         # Start price tracker for monitoring price drops
         self.price_tracker.start()
-        
-        # Start receiver loop after initial connection
-        asyncio.create_task(self._receiver_loop())
+        self.signal_history.start()
+        if self.publisher:
+            await self.publisher.start()
         
         connection_task = asyncio.create_task(self._connection_loop())
         sender_task = asyncio.create_task(self._sender_loop())
+        dispatch_tasks = [asyncio.create_task(self._dispatch_worker()) for _ in range(TG_DISPATCH_WORKERS)]
         
         listener_tasks = [
             asyncio.create_task(self._run_listener(chain))
             for chain in self.listeners.keys()
         ]
 
-        await asyncio.gather(connection_task, sender_task, *listener_tasks)
+        await asyncio.gather(connection_task, sender_task, *dispatch_tasks, *listener_tasks)
@@ -1,4 +1,6 @@
 
 from .log_parser import EventParser
 from .block_listener import BlockListenerEVM
-from .detector import EventDetectorEVM
\ No newline at end of file
+from .detector import EventDetectorEVM
+from .event_filter import EventFilter
+from .label_store import LabelStore, acquire_label_store, release_label_store
\ No newline at end of file
@@ -2,7 +2,7 @@ from .log_parser import EventParser
 from web3 import AsyncWeb3
 from typing import Callable, Literal
 from config import CHAIN_NAMES, WS_RPC, RECONNECT_ATTEMPTS
-from utils import get_logger
+from utils import get_logger, get_metrics
 import asyncio
 import json
 import websockets
@@ -28,6 +28,12 @@ class BlockListenerEVM:
         self.tg_client = tg_client
         self.logger = get_logger(f'{chain_name}')
         self._max_addresses_per_request = 500
+        metrics = get_metrics()
+        self._head_lag = metrics.gauge('head_lag', chain_name)
+        self._blocks = metrics.counter('blocks', chain_name)
+        self._logs = metrics.counter('logs', chain_name)
+        self._rpc_calls = metrics.counter('rpc_calls', chain_name)
+        self._rpc_errors = metrics.counter('rpc_errors', chain_name)
         
     @classmethod
     async def create(
@@ -45,6 +51,13 @@ class BlockListenerEVM:
     def update_token_address_list(self, token_address_list: list):
         self.token_address_list = token_address_list
 
+    def apply_token_address_delta(self, added: list, removed: list):
+        removed = set(removed)
+        known = set(self.token_address_list)
+        self.token_address_list = [
+            address for address in self.token_address_list if address not in removed
+        ] + [address for address in added if address not in known]
+
     async def _ws_connection_checker(self):
         
         while True:
@@ -72,15 +85,21 @@ class BlockListenerEVM:
                 "address": address_batch,
                 "topics": self.target_events,
             }
-            logs = await self.w3.eth.get_logs(payload)
+            self._rpc_calls.inc()
+            try:
+                logs = await self.w3.eth.get_logs(payload)
+            except Exception:
+                self._rpc_errors.inc()
+                raise
             all_logs.extend(logs)
         return all_logs
     
     async def subscribe_new_blocks(self, callback:Callable):
         """
         Подписаться на новые блоки через WebSocket
-        Для каждого нового блока вызывает callback
-        передает в callback 
+        Для каждого нового блока вызывает callback(tx_hash, events, received_at),
+        received_at - time.perf_counter() момента получения заголовка блока
+        events: 
         {
             'token': token_address,
             'from': from_address,
@@ -113,6 +132,8 @@ class BlockListenerEVM:
 
                     while True:
                         message = await ws.recv()
+                        # Alert latency is measured from here
+                        received_at = time.perf_counter()
                         data = json.loads(message)
                         
                         if data.get("method") == "eth_subscription":
@@ -121,8 +142,7 @@ class BlockListenerEVM:
                             
                             if "number" in result:
                                 current_block = int(result["number"], 16)
-                                
-                                t1 = time.perf_counter()
+                                head_block = current_block
 
                                 if current_block > last_block:
                                     # Process blocks one at a time to avoid message too big errors
@@ -138,18 +158,22 @@ class BlockListenerEVM:
                                                     all_txs[tx_hash] = []
                                                 all_txs[tx_hash].append(log)
                                             t2 = time.perf_counter()
-                                            self.logger.debug(f"got data for block {block_num} in {(t2-t1)*1000:.2f}ms")
+                                            self.logger.debug(f"got data for block {block_num} in {(t2 - received_at) * 1000:.2f}ms")
                                             for tx_hash, tx_logs in all_txs.items():
                                                 events = EventParser.parse_tx_token_events_from_logs(tx_logs)
                                                 if events:
-                                                    asyncio.create_task(callback(tx_hash, events))
+                                                    asyncio.create_task(callback(tx_hash, events, received_at))
                                             last_block = block_num
+                                            self._blocks.inc()
+                                            self._logs.inc(len(all_logs))
                                         except Exception as e:
                                             self.logger.error(f"Error processing block {block_num}: {str(e)}")
                                             if "message too big" in str(e):
                                                 self.logger.warning(f"Skipping block {block_num} due to message size")
                                                 last_block = block_num
                                             await asyncio.sleep(0.1)
+                                # Blocks still to process, processing is capped at 5 per head
+                                self._head_lag.set(max(0, head_block - last_block))
                                 
 
             except (websockets.ConnectionClosed, websockets.ConnectionClosedError, ConnectionResetError) as e:
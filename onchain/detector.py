@@ -6,7 +6,7 @@ from typing import Literal
 from .log_parser import EventParser
 from .event_filter import EventFilter
 from config import FILTER_CONFIG, EVENT_TRADE_DIRECTION, BINANCE_ALPHA_WALLETS, MIN_PARSED_PRICE_SIZE_TO_CHECK
-from utils import get_logger
+from utils import get_logger, get_metrics
 from web3 import Web3
 
 class EventDetectorEVM:
@@ -16,7 +16,8 @@ class EventDetectorEVM:
         chain_name:Literal[*CHAIN_NAMES],
         token_data: dict,
         custom_rules: dict,
-        supply_parser: SupplyParser
+        supply_parser: SupplyParser,
+        event_filter: EventFilter = None
     ):
         self.tg_client = tg_client
         self.chain_name = chain_name
@@ -24,8 +25,12 @@ class EventDetectorEVM:
         self.custom_rules = custom_rules
         self.supply_parser = supply_parser
         self.logger = get_logger(chain_name)
-        self.event_filter = EventFilter()
+        # A filter passed in is owned by the caller, one created here is closed by close()
+        self._owns_event_filter = event_filter is None
+        self.event_filter = event_filter or EventFilter(chain_name=chain_name)
         self.w3 = Web3(Web3.HTTPProvider(RPC[chain_name]))
+        self._candidate_events = get_metrics().counter('candidate_events', chain_name)
+        self._signals = get_metrics().counter('signals', chain_name)
 
     
     def _get_event_trade_direction(self, event_type:str) -> Literal['long', 'short']: 
@@ -42,6 +47,11 @@ class EventDetectorEVM:
                 return config
         return {}
 
+    def close(self):
+        """Release the shared label store reference held by the event filter"""
+        if self._owns_event_filter:
+            self.event_filter.close()
+
     def update_custom_rules(self, custom_rules: dict):
         self.custom_rules = custom_rules
     
@@ -106,30 +116,19 @@ class EventDetectorEVM:
         - Filters out exchange self-transfers (same exchange in from and to)
         - Returns address labels for display
         """
-        # Check for multisig involvement
-        multisig_check = self.event_filter.check_multisig_transfer(event_data)
-        if multisig_check['ignore']:
+        # Multisig, self-transfer and label checks in one pass over the transfers
+        analysis = self.event_filter.analyze_event(event_data)
+        if analysis['ignore']:
             return None  # Transfer going TO multisig - ignore
         
         # Check for exchange self-transfers
-        if self.event_filter.is_exchange_self_transfer(event_data):
+        if analysis['self_transfer']:
             return None
-        
-        # Get address labels for display
-        filter_names = self.event_filter.get_filter_names(event_data)
-        from_names = filter_names.get('from_names', {})
-        to_names = filter_names.get('to_names', {})
-        
-        # If transfer is FROM multisig, add "DAO multisig" label to from addresses
-        if multisig_check['from_multisig']:
-            for transfer in event_data.get('transfers', []):
-                from_addr = transfer.get('from', '')
-                if from_addr and self.event_filter.is_multisig_address(from_addr):
-                    from_names[from_addr] = "DAO multisig"
 
         return {
-            "from_names": from_names,
-            "to_names": to_names
+            "from_names": analysis['from_names'],
+            "to_names": analysis['to_names'],
+            "exchange_in_to": analysis['exchange_in_to']
         }
 
     async def _filter_event(self, tx_hash: str, token_address: str, event_type:str, event_data:dict):
@@ -194,7 +193,7 @@ class EventDetectorEVM:
 
             if not event_config: #not supply filter check usd based filter
                 # usd_based_transfer requires exchange address in 'to' (not just any labeled address)
-                if not self.event_filter.has_exchange_in_to(event_data):
+                if not address_filter['exchange_in_to']:
                     return {}
                 usd_size, initial_price = await self._check_usd_size_transfer(token_address, event_type, event_data, MIN_PARSED_PRICE_SIZE_TO_CHECK, "0x0...000")
                 event_type = "usd_based_transfer"
@@ -292,8 +291,10 @@ class EventDetectorEVM:
         }
         for token_address, token_events in events.items():
             for event_type, event_data in token_events.items():
+                self._candidate_events.inc()
                 signal = await self._filter_event(tx_hash, token_address, event_type, event_data)
                 if signal:
                     signals['signals'].append(signal)
+        self._signals.inc(len(signals['signals']))
         
         return signals
\ No newline at end of file
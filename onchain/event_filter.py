@@ -1,104 +1,51 @@
-import os
 from typing import Dict, List, Optional, Tuple
-from pathlib import Path
+from .label_store import LabelStore, DEFAULT_FILTERS_PATH, acquire_label_store, release_label_store
 
 
 class EventFilter:
-    """Event filter using dict for address label lookups and exchange self-transfer detection"""
+    """Chain view over the shared label store: address label lookups and exchange self-transfer detection"""
     
-    def __init__(self, filters_base_path: str = 'database/filters'):
+    def __init__(self, chain_name: str = None, filters_base_path: str = DEFAULT_FILTERS_PATH):
+        self.chain_name = chain_name
         self.filters_base_path = filters_base_path
-        self.filters = {}
-        self.exchange_addresses: Dict[str, str] = {}  # Triggers usd_based_transfer
-        self.entity_addresses: Dict[str, str] = {}    # Only labels, no trigger
-        self.multisig_addresses: set = set()
-        self._ensure_directories()
-        self.reload_filters()
-    
-    def _ensure_directories(self):
-        event_types = ['transfer', 'mint', 'burn']
-        for event_type in event_types:
-            event_dir = os.path.join(self.filters_base_path, event_type)
-            os.makedirs(event_dir, exist_ok=True)
-            
-            for filter_file in ['blacklist_signatures.txt']:
-                file_path = os.path.join(event_dir, filter_file)
-                if not os.path.exists(file_path):
-                    Path(file_path).touch()
-    
-    def _load_filter_file(self, file_path: str) -> Dict[str, str]:
-        result = {}
-        if not os.path.exists(file_path):
-            return result
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    if ':' in line:
-                        key, name = line.split(':', 1)
-                        key = key.strip().lower()
-                        name = name.strip()
-                        if key:
-                            result[key] = name
-        except Exception as e:
-            print(f"Error loading filter file {file_path}: {e}")
-        
-        return result
-    
-    def _load_address_set(self, file_path: str) -> set:
-        """Load a file with one address per line into a set"""
-        result = set()
-        if not os.path.exists(file_path):
-            return result
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    result.add(line.lower())
-        except Exception as e:
-            print(f"Error loading address set file {file_path}: {e}")
-        
-        return result
-    
+        self.label_store: LabelStore = acquire_label_store(filters_base_path)
+
+    def close(self):
+        if self.label_store:
+            release_label_store(self.label_store)
+            self.label_store = None
+
     def reload_filters(self):
-        event_types = ['transfer', 'mint', 'burn']
-        
-        for event_type in event_types:
-            event_dir = os.path.join(self.filters_base_path, event_type)
-            
-            self.filters[event_type] = {
-                'blacklist_signatures': self._load_filter_file(
-                    os.path.join(event_dir, 'blacklist_signatures.txt')
-                )
-            }
-        
-        # Load exchange addresses (trigger usd_based_transfer)
-        exchange_path = os.path.join(self.filters_base_path, 'exchange_addresses.txt')
-        self.exchange_addresses = self._load_filter_file(exchange_path)
-        
-        # Load entity addresses (only labels)
-        entity_path = os.path.join(self.filters_base_path, 'entity_addresses.txt')
-        self.entity_addresses = self._load_filter_file(entity_path)
-        
-        # Load multisig addresses
-        multisig_path = os.path.join(self.filters_base_path, 'multisig_addresses.txt')
-        self.multisig_addresses = self._load_address_set(multisig_path)
+        """Reloads the shared store, affects every chain"""
+        self.label_store.reload()
+
+    def _exchange_entry(self, addr_lower: str, scopes: tuple = None) -> Optional[tuple]:
+        """(family, label) of an exchange address"""
+        for label_set in scopes or self.label_store.state.scopes(self.chain_name):
+            entry = label_set.exchange_entry(addr_lower)
+            if entry:
+                return entry
+        return None
+
+    def _exchange_label(self, addr_lower: str) -> Optional[str]:
+        entry = self._exchange_entry(addr_lower)
+        return entry[1] if entry else None
+
+    def _entity_label(self, addr_lower: str, scopes: tuple = None) -> Optional[str]:
+        for label_set in scopes or self.label_store.state.scopes(self.chain_name):
+            label = label_set.entity.get(addr_lower)
+            if label:
+                return label
+        return None
     
     def get_address_label(self, address: str) -> Optional[str]:
         """Get label for an address (checks both exchange and entity)"""
         addr_lower = address.lower()
-        return self.exchange_addresses.get(addr_lower) or self.entity_addresses.get(addr_lower)
+        return self._exchange_label(addr_lower) or self._entity_label(addr_lower)
     
     def is_exchange_address(self, address: str) -> bool:
         """Check if address is an exchange address (triggers usd_based_transfer)"""
-        return address.lower() in self.exchange_addresses
+        return self._exchange_label(address.lower()) is not None
     
     def has_exchange_in_to(self, event_data: dict) -> bool:
         """Check if any 'to' address is an exchange address"""
@@ -136,34 +83,93 @@ class EventFilter:
         Compares first word of sender name to first word of receiver name.
         e.g. "Binance 14" -> "Binance" matches "Binance 5" -> "Binance"
         """
-        # Get first words from EXCHANGE sender addresses only
-        from_first_words = set()
+        # Exchange families of sender addresses only, precomputed at load time
+        from_families = set()
         for transfer in event_data.get('transfers', []):
             from_addr = transfer.get('from', '')
             if from_addr:
-                label = self.exchange_addresses.get(from_addr.lower())
-                if label:
-                    first_word = label.split()[0].lower()
-                    from_first_words.add(first_word)
+                entry = self._exchange_entry(from_addr.lower())
+                if entry:
+                    from_families.add(entry[0])
         
-        if not from_first_words:
+        if not from_families:
             return False
         
-        # Check if any EXCHANGE receiver first word matches sender first word
+        # Check if any EXCHANGE receiver belongs to a sender family
         for transfer in event_data.get('transfers', []):
             to_addr = transfer.get('to', '')
             if to_addr:
-                label = self.exchange_addresses.get(to_addr.lower())
-                if label:
-                    first_word = label.split()[0].lower()
-                    if first_word in from_first_words:
-                        return True
+                entry = self._exchange_entry(to_addr.lower())
+                if entry and entry[0] in from_families:
+                    return True
         
         return False
     
+    def analyze_event(self, event_data: dict) -> Dict[str, any]:
+        """
+        All address checks of an event in one pass over its transfers.
+        Returns: {'ignore', 'from_multisig', 'self_transfer', 'exchange_in_to', 'from_names', 'to_names'}
+        - ignore=True if ANY transfer goes TO a multisig, other fields are not filled then
+        - self_transfer=True if an exchange sender and receiver are of the same exchange family
+        - from_names/to_names hold address->label for labeled addresses, multisig senders are labeled "DAO multisig"
+        """
+        scopes = self.label_store.state.scopes(self.chain_name)
+        # address -> (exchange entry, label, is multisig), addresses repeat across transfers
+        seen = {}
+
+        def lookup(address: str) -> tuple:
+            info = seen.get(address)
+            if info is None:
+                addr_lower = address.lower()
+                entry = self._exchange_entry(addr_lower, scopes)
+                label = entry[1] if entry else self._entity_label(addr_lower, scopes)
+                multisig = any(addr_lower in label_set.multisig for label_set in scopes)
+                info = seen[address] = (entry, label, multisig)
+            return info
+
+        result = {
+            'ignore': False,
+            'from_multisig': False,
+            'self_transfer': False,
+            'exchange_in_to': False,
+            'from_names': {},
+            'to_names': {},
+        }
+        from_families = set()
+        to_families = set()
+        multisig_senders = []
+        for transfer in event_data.get('transfers', []):
+            to_addr = transfer.get('to', '')
+            from_addr = transfer.get('from', '')
+            if to_addr:
+                entry, label, multisig = lookup(to_addr)
+                if multisig:
+                    result['ignore'] = True
+                    return result
+                if entry:
+                    result['exchange_in_to'] = True
+                    to_families.add(entry[0])
+                if label:
+                    result['to_names'][to_addr] = label
+            if from_addr:
+                entry, label, multisig = lookup(from_addr)
+                if multisig:
+                    multisig_senders.append(from_addr)
+                if entry:
+                    from_families.add(entry[0])
+                if label:
+                    result['from_names'][from_addr] = label
+
+        for from_addr in multisig_senders:
+            result['from_names'][from_addr] = "DAO multisig"
+        result['from_multisig'] = bool(multisig_senders)
+        result['self_transfer'] = not from_families.isdisjoint(to_families)
+        return result
+    
     def is_multisig_address(self, address: str) -> bool:
         """Check if address is a multisig wallet"""
-        return address.lower() in self.multisig_addresses
+        addr_lower = address.lower()
+        return any(addr_lower in label_set.multisig for label_set in self.label_store.state.scopes(self.chain_name))
     
     def check_multisig_transfer(self, event_data: dict) -> Dict[str, any]:
         """
@@ -192,18 +198,10 @@ class EventFilter:
         }
     
     def has_signature_filters(self, event_type: str) -> bool:
-        if event_type not in self.filters:
-            return False
-        
-        event_filters = self.filters[event_type]
-        return len(event_filters['blacklist_signatures']) > 0
+        return len(self.label_store.state.signatures.get(event_type, {})) > 0
     
     def check_signatures_in_receipt(self, event_type: str, receipt) -> List[Tuple[str, str]]:
-        if event_type not in self.filters:
-            return []
-        
-        event_filters = self.filters[event_type]
-        blacklist_sigs = event_filters['blacklist_signatures']
+        blacklist_sigs = self.label_store.state.signatures.get(event_type, {})
         
         if not blacklist_sigs:
             return []
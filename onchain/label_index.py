@@ -0,0 +1,184 @@
+"""
+Compact on-disk index for large address label files.
+
+Layout (u32 arrays in native byte order, the file is a local cache):
+    header | buckets[65537] | label_ids[N] | label_offsets[L + 1] | keys[N * 20] | labels blob | extras
+keys are sorted 20-byte addresses, buckets[p] is the first key whose two leading
+bytes are >= p. Labels are stored once and decoded/interned when the index is
+opened, so lookups return shared strings. Keys that are not 20-byte hex
+addresses go to a small marshalled extras dict.
+"""
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+from utils import get_logger
+
+INDEX_MAGIC = b'OCLIDX'
+INDEX_VERSION = 1
+# magic, version, source mtime_ns, source size, key count, label count, labels blob size, extras size
+HEADER = struct.Struct('<6sHQQIIII')
+KEY_SIZE = 20
+BUCKET_COUNT = 1 << 16
+
+logger = get_logger("LABEL_INDEX")
+
+
+def _parse_line(line: str, with_labels: bool) -> Optional[Tuple[str, str]]:
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if not with_labels:
+        return line.lower(), ''
+    if ':' not in line:
+        return None
+    key, name = line.split(':', 1)
+    key = key.strip().lower()
+    return (key, name.strip()) if key else None
+
+
+def _address_key(address: str) -> Optional[bytes]:
+    if len(address) != 42 or not address.startswith('0x'):
+        return None
+    try:
+        return bytes.fromhex(address[2:])
+    except ValueError:
+        return None
+
+
+def build_label_index(source_path: str, index_path: str, with_labels: bool = True):
+    """Compile a label text file (addr:label per line, or one address per line) into an index file"""
+    st = os.stat(source_path)
+    label_ids: Dict[str, int] = {'': 0}
+    entries: Dict[bytes, int] = {}
+    extras: Dict[str, str] = {}
+    with open(source_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parsed = _parse_line(line, with_labels)
+            if parsed is None:
+                continue
+            address, label = parsed
+            key = _address_key(address)
+            if key is None:
+                extras[address] = label
+                continue
+            entries[key] = label_ids.setdefault(label, len(label_ids))
+
+    keys = sorted(entries)
+    buckets = array('I', bytes(4 * (BUCKET_COUNT + 1)))
+    position = 0
+    for prefix in range(BUCKET_COUNT + 1):
+        while position < len(keys) and (keys[position][0] << 8 | keys[position][1]) < prefix:
+            position += 1
+        buckets[prefix] = position
+    ids = array('I', (entries[key] for key in keys))
+
+    labels = list(label_ids)
+    offsets = array('I', [0])
+    blob = bytearray()
+    for label in labels:
+        blob += label.encode('utf-8')
+        offsets.append(len(blob))
+    extras_blob = marshal.dumps(extras)
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, st.st_mtime_ns, st.st_size,
+            len(keys), len(labels), len(blob), len(extras_blob)
+        ))
+        f.write(buckets.tobytes())
+        f.write(ids.tobytes())
+        f.write(offsets.tobytes())
+        f.write(b''.join(keys))
+        f.write(blob)
+        f.write(extras_blob)
+    os.replace(tmp_path, index_path)
+
+
+class CompactLabelIndex:
+    """Read-only address -> label mapping over an mmapped index file. Quacks like the dict/set it replaces."""
+
+    def __init__(self, index_path: str, source_path: str = None):
+        self.index_path = index_path
+        self.source_path = source_path
+        with open(index_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.source_mtime_ns, self.source_size,
+         self._count, label_count, blob_size, extras_size) = HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Unsupported label index {index_path}")
+
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self._buckets = view[offset:offset + 4 * (BUCKET_COUNT + 1)].cast('I')
+        offset += 4 * (BUCKET_COUNT + 1)
+        self._label_ids = view[offset:offset + 4 * self._count].cast('I')
+        offset += 4 * self._count
+        label_offsets = view[offset:offset + 4 * (label_count + 1)].cast('I')
+        offset += 4 * (label_count + 1)
+        self._keys_start = offset
+        offset += KEY_SIZE * self._count
+        blob = self._mmap[offset:offset + blob_size]
+        self._labels = [
+            sys.intern(blob[label_offsets[i]:label_offsets[i + 1]].decode('utf-8'))
+            for i in range(label_count)
+        ]
+        label_offsets.release()
+        offset += blob_size
+        self._extras: Dict[str, str] = marshal.loads(self._mmap[offset:offset + extras_size])
+
+    @classmethod
+    def open_for_source(cls, source_path: str, with_labels: bool = True) -> 'CompactLabelIndex':
+        """Open <source>.idx, rebuilding it first when the source file changed"""
+        index_path = source_path + '.idx'
+        st = os.stat(source_path)
+        try:
+            index = cls(index_path, source_path)
+            if (index.source_mtime_ns, index.source_size) == (st.st_mtime_ns, st.st_size):
+                return index
+            index.close()
+        except (FileNotFoundError, ValueError, struct.error):
+            pass
+        logger.info(f"Building label index for {source_path}")
+        build_label_index(source_path, index_path, with_labels)
+        return cls(index_path, source_path)
+
+    def close(self):
+        self._buckets.release()
+        self._label_ids.release()
+        self._mmap.close()
+
+    def _position(self, address: str) -> int:
+        key = _address_key(address)
+        if key is None:
+            return -1
+        prefix = key[0] << 8 | key[1]
+        start = self._keys_start + KEY_SIZE * self._buckets[prefix]
+        end = self._keys_start + KEY_SIZE * self._buckets[prefix + 1]
+        position = self._mmap.find(key, start, end)
+        while position != -1 and (position - self._keys_start) % KEY_SIZE:
+            # Match straddling two keys, keep looking from the next byte
+            position = self._mmap.find(key, position + 1, end)
+        return -1 if position == -1 else (position - self._keys_start) // KEY_SIZE
+
+    def get(self, address: str, default: Optional[str] = None) -> Optional[str]:
+        position = self._position(address)
+        if position == -1:
+            return self._extras.get(address, default)
+        return self._labels[self._label_ids[position]]
+
+    def __contains__(self, address: str) -> bool:
+        return self._position(address) != -1 or address in self._extras
+
+    def __len__(self) -> int:
+        return self._count + len(self._extras)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for position in range(self._count):
+            start = self._keys_start + KEY_SIZE * position
+            yield '0x' + self._mmap[start:start + KEY_SIZE].hex(), self._labels[self._label_ids[position]]
+        yield from self._extras.items()
@@ -0,0 +1,357 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional
+from config import CHAIN_NAMES, LABEL_INDEX_MIN_FILE_MB, LABEL_RELOAD_CHECK_INTERVAL
+from utils import get_logger, get_startup_snapshot
+from .label_index import CompactLabelIndex
+
+DEFAULT_FILTERS_PATH = 'database/filters'
+EVENT_TYPES = ['transfer', 'mint', 'burn']
+LABEL_FILES = {
+    'exchange': 'exchange_addresses',   # Triggers usd_based_transfer
+    'entity': 'entity_addresses',       # Only labels, no trigger
+    'multisig': 'multisig_addresses',
+}
+
+
+def _file_stat(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _diff_counts(old, new) -> tuple:
+    """(added, removed) keys between two label collections"""
+    if isinstance(old, (dict, set)) and isinstance(new, (dict, set)):
+        old_keys = old.keys() if isinstance(old, dict) else old
+        new_keys = new.keys() if isinstance(new, dict) else new
+        return len(new_keys - old_keys), len(old_keys - new_keys)
+    # Compact indexes are not diffed key by key, only their sizes are compared
+    return max(0, len(new) - len(old)), max(0, len(old) - len(new))
+
+
+def exchange_family(label: str) -> Optional[str]:
+    """Family of an exchange label: its first word, lowercased. "Binance 14" and "Binance 5" are one family."""
+    words = label.split(maxsplit=1)
+    return sys.intern(words[0].lower()) if words else None
+
+
+class LabelSet:
+    """Labels of one scope: global or a single chain"""
+
+    def __init__(self, exchange: Dict[str, str] = None, entity: Dict[str, str] = None, multisig: set = None):
+        self.exchange = exchange or {}
+        self.entity = entity or {}
+        self.multisig = multisig or set()
+        # label -> (family, label), one shared tuple per distinct label
+        self._family_by_label: Dict[str, tuple] = {}
+        # address -> (family, label) for in-memory exchange labels, compact indexes resolve on lookup
+        self.exchange_families: Optional[Dict[str, tuple]] = None
+        if isinstance(self.exchange, dict):
+            self.exchange_families = {
+                address: self._family_entry(label) for address, label in self.exchange.items() if label
+            }
+
+    def _family_entry(self, label: str) -> tuple:
+        entry = self._family_by_label.get(label)
+        if entry is None:
+            entry = self._family_by_label[label] = (exchange_family(label), label)
+        return entry
+
+    def exchange_entry(self, addr_lower: str) -> Optional[tuple]:
+        """(family, label) of an exchange address, None if it is not an exchange"""
+        if self.exchange_families is not None:
+            return self.exchange_families.get(addr_lower)
+        label = self.exchange.get(addr_lower)
+        return self._family_entry(label) if label else None
+
+    def __len__(self):
+        return len(self.exchange) + len(self.entity) + len(self.multisig)
+
+
+class LabelStoreState:
+    """Immutable result of one reload. Swapped as a whole so readers never see a half-loaded store."""
+
+    def __init__(self, signatures: Dict[str, Dict[str, str]], global_labels: LabelSet, chain_labels: Dict[str, LabelSet]):
+        self.signatures = signatures
+        self.global_labels = global_labels
+        self.chain_labels = chain_labels
+
+    def scopes(self, chain_name: Optional[str]) -> tuple:
+        """Label sets to check for a chain, most specific first"""
+        chain_labels = self.chain_labels.get(chain_name.upper()) if chain_name else None
+        return (chain_labels, self.global_labels) if chain_labels else (self.global_labels,)
+
+
+class LabelStore:
+    """
+    Filter and label files of one filters directory, loaded once per process.
+    Chain specific labels live in <name>.<chain>.txt next to the global <name>.txt
+    and take precedence over global ones for that chain.
+    """
+
+    def __init__(self, filters_base_path: str = DEFAULT_FILTERS_PATH):
+        self.filters_base_path = filters_base_path
+        self.logger = get_logger("LABELS")
+        self._refcount = 0
+        self._reload_lock = threading.Lock()
+        self._file_stats: Dict[str, Optional[tuple]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+        self.state: LabelStoreState = LabelStoreState({}, LabelSet(), {})
+        self._ensure_directories()
+        self.reload()
+
+    def _ensure_directories(self):
+        for event_type in EVENT_TYPES:
+            event_dir = os.path.join(self.filters_base_path, event_type)
+            os.makedirs(event_dir, exist_ok=True)
+            file_path = os.path.join(event_dir, 'blacklist_signatures.txt')
+            if not os.path.exists(file_path):
+                open(file_path, 'a').close()
+
+    def _signature_path(self, event_type: str) -> str:
+        return os.path.join(self.filters_base_path, event_type, 'blacklist_signatures.txt')
+
+    def _label_path(self, kind: str, chain_name: str = None) -> str:
+        file_name = LABEL_FILES[kind]
+        if chain_name:
+            file_name += f'.{chain_name.lower()}'
+        return os.path.join(self.filters_base_path, f'{file_name}.txt')
+
+    def _sources(self) -> list:
+        """(path, ('signatures', event_type) or ('labels', kind, chain_name)) for every watched file"""
+        sources = [(self._signature_path(event_type), ('signatures', event_type)) for event_type in EVENT_TYPES]
+        for chain_name in [None, *sorted(CHAIN_NAMES)]:
+            sources += [(self._label_path(kind, chain_name), ('labels', kind, chain_name)) for kind in LABEL_FILES]
+        return sources
+
+    def source_paths(self) -> list:
+        return [path for path, _ in self._sources()]
+
+    @staticmethod
+    def _is_large(file_path: str) -> bool:
+        return os.path.getsize(file_path) >= LABEL_INDEX_MIN_FILE_MB * 1024 * 1024
+
+    def _load_filter_file(self, file_path: str) -> Dict[str, str]:
+        result = {}
+        if not os.path.exists(file_path):
+            return result
+        if self._is_large(file_path):
+            return CompactLabelIndex.open_for_source(file_path, with_labels=True)
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+
+                    if ':' in line:
+                        key, name = line.split(':', 1)
+                        key = key.strip().lower()
+                        name = name.strip()
+                        if key:
+                            result[key] = name
+        except Exception as e:
+            self.logger.error(f"Error loading filter file {file_path}: {e}")
+
+        return result
+
+    def _load_address_set(self, file_path: str) -> set:
+        """Load a file with one address per line into a set"""
+        result = set()
+        if not os.path.exists(file_path):
+            return result
+        if self._is_large(file_path):
+            return CompactLabelIndex.open_for_source(file_path, with_labels=False)
+
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    result.add(line.lower())
+        except Exception as e:
+            self.logger.error(f"Error loading address set file {file_path}: {e}")
+
+        return result
+
+    def _load_label_set(self, chain_name: str = None) -> LabelSet:
+        return LabelSet(
+            exchange=self._load_filter_file(self._label_path('exchange', chain_name)),
+            entity=self._load_filter_file(self._label_path('entity', chain_name)),
+            multisig=self._load_address_set(self._label_path('multisig', chain_name)),
+        )
+
+    def _parse_files(self) -> LabelStoreState:
+        signatures = {
+            event_type: self._load_filter_file(self._signature_path(event_type))
+            for event_type in EVENT_TYPES
+        }
+        chain_labels = {}
+        for chain_name in CHAIN_NAMES:
+            label_set = self._load_label_set(chain_name)
+            if len(label_set):
+                chain_labels[chain_name] = label_set
+        return LabelStoreState(signatures, self._load_label_set(), chain_labels)
+
+    @staticmethod
+    def _dump_labels(labels):
+        # Large files are not copied into the snapshot, only a reference to their index
+        if isinstance(labels, CompactLabelIndex):
+            return {'__index__': labels.source_path}
+        return labels
+
+    @staticmethod
+    def _restore_labels(kind: str, dumped):
+        if isinstance(dumped, dict) and '__index__' in dumped:
+            return CompactLabelIndex.open_for_source(dumped['__index__'], with_labels=kind != 'multisig')
+        return dumped
+
+    def _dump_label_set(self, label_set: LabelSet) -> dict:
+        return {
+            'exchange': self._dump_labels(label_set.exchange),
+            'entity': self._dump_labels(label_set.entity),
+            'multisig': self._dump_labels(label_set.multisig),
+        }
+
+    def _restore_label_set(self, dumped: dict) -> LabelSet:
+        return LabelSet(**{kind: self._restore_labels(kind, labels) for kind, labels in dumped.items()})
+
+    @property
+    def _snapshot_section(self) -> str:
+        return f'labels:{self.filters_base_path}'
+
+    def _save_snapshot(self, state: LabelStoreState, file_stats: dict):
+        """Queue the state for the snapshot writer, file_stats are the stats taken before parsing"""
+        get_startup_snapshot().put(self._snapshot_section, {
+            'signatures': state.signatures,
+            'global': self._dump_label_set(state.global_labels),
+            'chains': {chain_name: self._dump_label_set(label_set) for chain_name, label_set in state.chain_labels.items()},
+        }, tuple(file_stats.items()))
+
+    def reload(self):
+        """Re-read filter files once and swap the state for every detector"""
+        with self._reload_lock:
+            # Stats are taken first, so edits made while parsing are picked up by the watcher
+            file_stats = {path: _file_stat(path) for path in self.source_paths()}
+            cached = get_startup_snapshot().get(self._snapshot_section)
+            if cached is not None:
+                self.state = LabelStoreState(
+                    cached['signatures'],
+                    self._restore_label_set(cached['global']),
+                    {chain_name: self._restore_label_set(dumped) for chain_name, dumped in cached['chains'].items()},
+                )
+                self._file_stats = file_stats
+                return
+            state = self._parse_files()
+            self.state = state
+            self._file_stats = file_stats
+            self._save_snapshot(state, file_stats)
+            self.logger.info(
+                f"Loaded {len(state.global_labels)} global labels"
+                + ''.join(f", {len(label_set)} {chain_name}" for chain_name, label_set in state.chain_labels.items())
+            )
+
+    def reload_changed(self) -> Dict[str, tuple]:
+        """
+        Re-parse only files whose mtime or size changed and swap in the patched state.
+        Returns {file name: (added, removed)} for changed files.
+        """
+        with self._reload_lock:
+            changed = []
+            for path, source in self._sources():
+                stat = _file_stat(path)
+                if stat != self._file_stats.get(path):
+                    changed.append((path, source, stat))
+            if not changed:
+                return {}
+
+            t1 = time.perf_counter()
+            state = self.state
+            signatures = dict(state.signatures)
+            # Unchanged collections are shared with the old state, changed ones replaced below
+            label_parts = {
+                chain_name: {
+                    'exchange': label_set.exchange, 'entity': label_set.entity, 'multisig': label_set.multisig
+                }
+                for chain_name, label_set in [(None, state.global_labels), *state.chain_labels.items()]
+            }
+
+            report = {}
+            for path, source, stat in changed:
+                if source[0] == 'signatures':
+                    old = signatures.get(source[1], {})
+                    new = signatures[source[1]] = self._load_filter_file(path)
+                else:
+                    _, kind, chain_name = source
+                    parts = label_parts.setdefault(chain_name, {'exchange': {}, 'entity': {}, 'multisig': set()})
+                    old = parts[kind]
+                    new = parts[kind] = (
+                        self._load_address_set(path) if kind == 'multisig' else self._load_filter_file(path)
+                    )
+                self._file_stats[path] = stat
+                report[os.path.relpath(path, self.filters_base_path)] = _diff_counts(old, new)
+
+            global_labels = LabelSet(**label_parts.pop(None))
+            chain_labels = {}
+            for chain_name, parts in label_parts.items():
+                label_set = LabelSet(**parts)
+                if len(label_set):
+                    chain_labels[chain_name] = label_set
+            self.state = LabelStoreState(signatures, global_labels, chain_labels)
+            self._save_snapshot(self.state, dict(self._file_stats))
+
+            self.logger.info(
+                f"Hot reloaded {len(report)} filter files in {(time.perf_counter() - t1) * 1000:.0f} ms: "
+                + ', '.join(f"{name} +{added}/-{removed}" for name, (added, removed) in report.items())
+            )
+            return report
+
+    async def _watch_loop(self):
+        while True:
+            await asyncio.sleep(LABEL_RELOAD_CHECK_INTERVAL)
+            try:
+                await asyncio.to_thread(self.reload_changed)
+            except Exception as e:
+                self.logger.error(f"Error reloading changed filter files: {e}")
+
+    def start_watcher(self):
+        """Watch filter files and hot reload the ones that change"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_loop())
+
+    def stop_watcher(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+
+_stores: Dict[str, LabelStore] = {}
+_stores_lock = threading.Lock()
+
+
+def acquire_label_store(filters_base_path: str = DEFAULT_FILTERS_PATH) -> LabelStore:
+    """Get the shared store for a filters directory, loading it on first use"""
+    with _stores_lock:
+        store = _stores.get(filters_base_path)
+        if store is None:
+            store = LabelStore(filters_base_path)
+            _stores[filters_base_path] = store
+        store._refcount += 1
+        return store
+
+
+def release_label_store(store: LabelStore):
+    """Drop a reference. The store is freed once no filter uses it."""
+    with _stores_lock:
+        store._refcount -= 1
+        if store._refcount <= 0 and _stores.get(store.filters_base_path) is store:
+            del _stores[store.filters_base_path]
+            store.stop_watcher()
@@ -1,11 +1,10 @@
-from typing import Callable
+from typing import Callable, Optional
 from config import (
     CMC_PLATFORM_NAMES,
     CMC_BLACK_LISTS,
     CMC_API_KEY,
     PARSED_DATA_CHECK_DELAY_DAYS, 
     SUPPLY_DATA_PATH, 
-    BANNED_PATH,
     CACHE_UPDATE_BATCH_SIZE,
     CHAIN_NAMES,
     FORCE_UPDATE_ON_START,
@@ -14,21 +13,58 @@ from config import (
     REQUEST_RETRY,
     MIN_MCAP, 
     MIN_VOLUME,
-    SUPPORTED_CEX_SLUGS
+    SUPPORTED_CEX_SLUGS,
+    PARSE_INFO_WORKERS,
+    PARSE_DECIMALS_WORKERS,
+    PARSE_FUTURES_WORKERS,
+    PARSE_FUTURES_REQUEUE_ATTEMPTS,
+    PARSE_PRICE_WORKERS,
+    PARSE_PROGRESS_LOG_INTERVAL,
+    INCREMENTAL_REFRESH,
+    PARSE_ROLLING_REFRESH_SIZE,
+    PARSE_CHECKPOINT_PATH,
+    SKIPPED_CMC_IDS_PATH,
+    PARSE_CHECKPOINT_MAX_AGE_HOURS,
+    PARSE_RESUME_DELAY_MINUTES,
+    PRICE_REFRESH_INTERVAL_MINUTES,
+    PRICE_REFRESH_BATCH_SIZE,
 )
-from utils import Gecko
-from curl_cffi.requests import AsyncSession
+from utils import Gecko, HttpClient, get_banned_registry, get_token_registry, get_persistence
 from web3 import Web3
 from web3 import AsyncWeb3
-import json
 from utils import get_logger
 import asyncio
 import os
 import time
 from onchain.consts import DEX_ROUTER_DATA, erc20_abi
 from datetime import datetime, timedelta
-import ujson
 import base58
+from dataclasses import dataclass, field
+
+# Quote fields kept in memory for alerts
+QUOTE_FIELDS = ('price', 'market_cap', 'fully_diluted_market_cap', 'volume_24h')
+
+
+@dataclass
+class ParseStageStats:
+    """Progress counters for one stage of the token parse pipeline"""
+    name: str
+    queued: int = 0
+    done: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return (self.done + self.failed) / elapsed if elapsed > 0 else 0
+
+    def progress(self) -> str:
+        return f'{self.name} {self.done + self.failed}/{self.queued} ({self.rate:.1f}/s)'
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started_at
+        return f'{self.name}: {self.done} done, {self.failed} failed in {elapsed:.1f}s ({self.rate:.1f}/s)'
 
 class HelperSOL: 
 
@@ -89,12 +125,21 @@ class SupplyParser:
 
     def __init__(self):
         self.logger = get_logger("PARSER")
-        self.main_token_data, self._last_update_time = self._load_token_data()
+        self.token_registry = get_token_registry()
         self.helper_sol = HelperSOL()
         self.helper_evm = HelperEVM()
         self.gecko = Gecko()
+        self.banned_registry = get_banned_registry()
         self.chain_separated_pool_dict = {}
         self._parser_task = None
+        self._price_refresh_task = None
+        # Listed cmc_ids that gave no tracked contracts, persisted so a restart does not count them as new
+        self._skipped_cmc_ids: set = set(get_persistence().load(SKIPPED_CMC_IDS_PATH, []))
+        # cmc_id -> quote fields used in alerts plus 'updated_at' (unix time)
+        self._quotes: dict[int, dict] = {}
+        # New cmc_ids left out of the last parse because their futures could not be fetched
+        self._futures_failed_ids: set = set()
+        self._rolling_refresh_offset = 0
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36',
             'platform': 'web',
@@ -108,11 +153,36 @@ class SupplyParser:
             'Sec-Fetch-Site': 'same-site',
 
         }
+        # CMC requests share one session and report into the HTTP metrics, headers are passed per call.
+        # Helpers with their own REQUEST_RETRY loop pass retries=0, so transport errors are retried once per layer.
+        self.cmc = HttpClient()
+
+    @property
+    def main_token_data(self) -> Optional[dict]:
+        """Live token data owned by the shared registry, None until anything was loaded or parsed"""
+        return self.token_registry.data if self.token_registry.loaded else None
+
+    @property
+    def _last_update_time(self) -> Optional[datetime]:
+        return self.token_registry.updated_at
+
     async def stop(self): 
         if self._parser_task:
             self._parser_task.cancel()
             self._parser_task = None
+        if self._price_refresh_task:
+            self._price_refresh_task.cancel()
+            self._price_refresh_task = None
+        await self.cmc.close()
     
+    @staticmethod
+    def _checked(response, url: str):
+        """Response of a CMC request, raises like raise_for_status when it failed"""
+        if response is None:
+            raise RuntimeError(f'CMC request failed: {url}')
+        response.raise_for_status()
+        return response
+
     async def _search_query(
         self, 
         range_start: int, 
@@ -125,48 +195,43 @@ class SupplyParser:
 
         url = f'https://api.coinmarketcap.com/data-api/v3/cryptocurrency/listing?start={range_start}&limit={range_end}&convert=USD&sortBy=rank&sortType=desc&cryptoType=all&tagType=all&audited=false&aux={aux}&{additional_params}'
 
-        async with AsyncSession() as session: 
-            response = await session.get(url, headers=self.headers)
-            response.raise_for_status() 
-            data = response.json().get('data').get('cryptoCurrencyList')
-        return data
+        response = self._checked(await self.cmc.get(url, headers=self.headers), url)
+        return response.json().get('data').get('cryptoCurrencyList')
 
-    async def _get_supported_futures(self, token_id: int) -> list[str]:
+    async def _get_supported_futures(self, token_id: int) -> Optional[list[str]]:
         """
         Get list of supported futures exchanges for a given token ID.
-        Returns list of exchange slugs that match SUPPORTED_CEX_SLUGS.
+        Returns list of exchange slugs that match SUPPORTED_CEX_SLUGS, None if the request failed.
         """
         url = f'https://api.coinmarketcap.com/data-api/v3/cryptocurrency/market-pairs/latest?id={token_id}&start=1&limit=100&category=perpetual&sort=name&direction=desc&spotUntracked=true'
         
         for _ in range(REQUEST_RETRY): 
             try:
-                async with AsyncSession() as session: 
-                    response = await session.get(url, headers=self.headers)
-                    response.raise_for_status()
-                    data = response.json().get('data', {})
-                    
-                    if not data:
-                        self.logger.warning(f"No data returned from CMC for token ID {token_id}")
-                        return []
-                    
-                    market_pairs = data.get('marketPairs', [])
-                    if not market_pairs:
-                        return []
-                    
-                    # Extract exchange slugs and filter by supported list
-                    supported_exchanges = []
-                    for pair in market_pairs:
-                        exchange_slug = pair.get('exchangeSlug', '').lower()
-                        if exchange_slug in SUPPORTED_CEX_SLUGS:
-                            if exchange_slug not in supported_exchanges:
-                                supported_exchanges.append(exchange_slug)
-                    
-                    return supported_exchanges
+                response = self._checked(await self.cmc.get(url, headers=self.headers, retries=0), url)
+                data = response.json().get('data', {})
+                
+                if not data:
+                    self.logger.warning(f"No data returned from CMC for token ID {token_id}")
+                    return []
+                
+                market_pairs = data.get('marketPairs', [])
+                if not market_pairs:
+                    return []
+                
+                # Extract exchange slugs and filter by supported list
+                supported_exchanges = []
+                for pair in market_pairs:
+                    exchange_slug = pair.get('exchangeSlug', '').lower()
+                    if exchange_slug in SUPPORTED_CEX_SLUGS:
+                        if exchange_slug not in supported_exchanges:
+                            supported_exchanges.append(exchange_slug)
+                
+                return supported_exchanges
                     
             except Exception as e:
                 if _ == REQUEST_RETRY - 1: 
                     self.logger.error(f"Error getting supported futures for token ID {token_id}: {str(e)}")
-                    return []
+                    return None
                 self.logger.warning(f"Error getting supported futures for token ID {token_id}: {str(e)}, retrying...")
 
     async def _get_token_price(self, chain_name: str, address: str, ticker: str, cmc_id: int = None) -> float:
@@ -209,13 +274,11 @@ class SupplyParser:
         }
         for _ in range(REQUEST_RETRY):
             try:
-                async with AsyncSession() as session:
-                    response = await session.get(url, headers=headers)
-                    response.raise_for_status()
-                    data = response.json().get('data', {}).get(str(cmc_id), {})
-                    if not data:
-                        return {}
-                    return data.get('quote', {}).get('USD', {})
+                response = self._checked(await self.cmc.get(url, headers=headers, retries=0), url)
+                data = response.json().get('data', {}).get(str(cmc_id), {})
+                if not data:
+                    return {}
+                return data.get('quote', {}).get('USD', {})
             except Exception as e:
                 if _ == REQUEST_RETRY - 1:
                     self.logger.error(f"Error getting CMC quote by id {cmc_id}: {str(e)}")
@@ -223,6 +286,44 @@ class SupplyParser:
                 self.logger.warning(f"Error getting CMC quote by id {cmc_id}: {str(e)}, retrying...")
         return {}
         
+    def _store_quote(self, cmc_id: int, quote: dict, updated_at: float = None) -> dict:
+        stored = {field: quote.get(field) for field in QUOTE_FIELDS}
+        stored['updated_at'] = updated_at or time.time()
+        self._quotes[cmc_id] = stored
+        return stored
+
+    def get_cached_quote(self, cmc_id: int) -> Optional[dict]:
+        """Last refreshed quote of a token, never waits on the network"""
+        return self._quotes.get(cmc_id)
+
+    async def fetch_quote(self, cmc_id: int) -> dict:
+        """Fresh quote from CMC, also stored in the quote cache"""
+        quote = await self._get_cmc_quote_by_id(cmc_id)
+        return self._store_quote(cmc_id, quote) if quote else {}
+
+    async def _get_cmc_quotes_by_ids(self, cmc_ids: list) -> dict:
+        """Get USD quotes for many cmc_ids in one request. Returns {cmc_id: quote}."""
+        ids = ','.join(str(cmc_id) for cmc_id in cmc_ids)
+        url = f"https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest?id={ids}&convert=USD"
+        headers = {
+            'X-CMC_PRO_API_KEY': CMC_API_KEY,
+            'Accept': 'application/json'
+        }
+        for _ in range(REQUEST_RETRY):
+            try:
+                response = self._checked(await self.cmc.get(url, headers=headers, retries=0), url)
+                data = response.json().get('data', {}) or {}
+                return {
+                    int(cmc_id): token_data.get('quote', {}).get('USD', {})
+                    for cmc_id, token_data in data.items() if token_data
+                }
+            except Exception as e:
+                if _ == REQUEST_RETRY - 1:
+                    self.logger.error(f"Error getting CMC quotes for {len(cmc_ids)} ids: {str(e)}")
+                    return {}
+                self.logger.warning(f"Error getting CMC quotes for {len(cmc_ids)} ids: {str(e)}, retrying...")
+        return {}
+        
     async def _get_cmc_tokens_data_by_ids(self, token_ids: list):
 
         token_ids = ','.join(str(token_id) for token_id in token_ids)
@@ -233,11 +334,8 @@ class SupplyParser:
         }
         for _ in range(REQUEST_RETRY): 
             try:
-                async with AsyncSession() as session: 
-                    response = await session.get(url, headers=headers)
-                    response.raise_for_status()
-                    data = response.json().get('data')
-                    return data
+                response = self._checked(await self.cmc.get(url, headers=headers, retries=0), url)
+                return response.json().get('data')
             except Exception as e:
                 if _ == REQUEST_RETRY - 1: 
                     self.logger.error(f"Error getting CMC tokens data by ids: {str(e)}")
@@ -252,38 +350,34 @@ class SupplyParser:
             "limit": 5,
             "scene": "community"
         }
-        async with AsyncSession() as session: 
-            response = await session.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            data = response.json().get('data',{}).get('suggestions',[])
-            if not data:
-                return None
+        response = self._checked(await self.cmc.post(url, headers=self.headers, json=payload), url)
+        data = response.json().get('data',{}).get('suggestions',[])
+        if not data:
+            return None
 
-            tokens = []
-            for suggestion in data:
-                if suggestion.get('type') == 'token':
-                    tokens = suggestion.get('tokens', [])
-            if not tokens:
-                return None
+        tokens = []
+        for suggestion in data:
+            if suggestion.get('type') == 'token':
+                tokens = suggestion.get('tokens', [])
+        if not tokens:
+            return None
 
-            tk_id = 0
-            for token in tokens:
-                if token.get('symbol', '').lower() == token_ticker.lower():
-                    tk_id = token.get('id')
-                    break
-            if not tk_id:
-                return None
+        tk_id = 0
+        for token in tokens:
+            if token.get('symbol', '').lower() == token_ticker.lower():
+                tk_id = token.get('id')
+                break
+        if not tk_id:
+            return None
         return tk_id
         
     async def _get_supply_by_token_id(self, token_id: int):
-        async with AsyncSession() as session:
-            url = f"https://api.coinmarketcap.com/data-api/v3/cryptocurrency/quote/latest?id={token_id}"
-            response = await session.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json().get('data',[])
-            if data:
-                return data[0].get('circulatingSupply', 0)
-            return None
+        url = f"https://api.coinmarketcap.com/data-api/v3/cryptocurrency/quote/latest?id={token_id}"
+        response = self._checked(await self.cmc.get(url, headers=self.headers), url)
+        data = response.json().get('data',[])
+        if data:
+            return data[0].get('circulatingSupply', 0)
+        return None
 
     async def _get_token_data_by_token_ticker(self, token_ticker: str):
         token_id = await self._get_token_id_from_search(token_ticker)
@@ -298,34 +392,11 @@ class SupplyParser:
             'supply': supply,
         }
 
-    def _load_token_data(self):
-        try:
-            with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-                data = json.loads(f.read())
-                if len(data) != 2:
-                    return None, None
-                else: 
-                    return data[1], datetime.fromisoformat(data[0])
-        except FileNotFoundError:
-            self.logger.warning(f'Token data file not found, returning empty dict')
-            return None, None
-
-    def _load_banned_list(self) -> dict:
-        try:
-            with open(BANNED_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return {}
-                return data
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-
     def _is_banned(self, token_address: str) -> bool:
-        banned_dict = self._load_banned_list()
-        return token_address in banned_dict
+        return self.banned_registry.is_banned(token_address)
 
     def _should_run_parse(self):
-        if self.main_token_data is None:
+        if self.main_token_data is None or self._last_update_time is None:
             return True
         
         if FORCE_UPDATE_ON_START:
@@ -345,29 +416,10 @@ class SupplyParser:
 
     async def _update_token_cache_json(self):
         self.logger.info(f'Saving main data to {SUPPLY_DATA_PATH}')
+        self.token_registry.save(updated_at=datetime.now())
 
-        # Создаем директорию для главного файла, если не существует
-        os.makedirs(os.path.dirname(SUPPLY_DATA_PATH), exist_ok=True)
-        if not os.path.exists(SUPPLY_DATA_PATH):
-            with open(SUPPLY_DATA_PATH, 'w', encoding='utf-8') as f:
-                json.dump([None, {}], f, ensure_ascii=False, indent=2)
-
-        with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
-            if isinstance(raw_data, list) and len(raw_data) == 2:
-                existing_data = raw_data[1]
-            else: 
-                existing_data = {}
-        
-        self._last_update_time = datetime.now()
-        with open(SUPPLY_DATA_PATH, 'w', encoding='utf-8') as f:
-            f.write(json.dumps(
-                [self._last_update_time.isoformat(), self.main_token_data], 
-                indent=4
-            ))
-       
-    async def _parse_tokens(self, ):
-        
+    async def _fetch_token_listing(self) -> list[dict]:
+        """List stage: CMC search lists minus black lists, filtered by mcap/volume."""
         #получаем весь набор токенов мекс + топ 2000 кмк (айди и цирк сапплай)
         token_list = []
         for search_list_name, search_list in CMC_SEARCH_LISTS.items():
@@ -380,7 +432,7 @@ class SupplyParser:
             self.logger.info(f'Fetching tokens list for {search_list_name}')
             black_list += await self._search_query(1, search_list['limit'], additional_params=search_list['params'])
         raw_token_blacklist_dict = {token['id']: token for token in black_list}
-        blacklist_token_ids = [token['id'] for token in raw_token_blacklist_dict.values()]
+        blacklist_token_ids = set(raw_token_blacklist_dict.keys())
         
         raw_token_dict = {token['id']: token for token in token_list}
         unique_tokens = list(raw_token_dict.values())
@@ -409,56 +461,157 @@ class SupplyParser:
             })
 
         self.logger.info(f'Parsed {len(parsed_token_list)} tokens')
+        return parsed_token_list
 
-        main_data_dict = {
-            chain_name: {}
-            for chain_name in CHAIN_NAMES
-        }
+    async def _stage_worker(self, queue: asyncio.Queue, handler: Callable, stats: ParseStageStats):
+        while True:
+            item = await queue.get()
+            try:
+                await handler(item)
+                stats.done += 1
+            except Exception as e:
+                stats.failed += 1
+                self.logger.warning(f'{stats.name} stage error: {str(e)}')
+            finally:
+                queue.task_done()
+
+    async def _log_parse_progress(self, stages: list[ParseStageStats]):
+        while True:
+            await asyncio.sleep(PARSE_PROGRESS_LOG_INTERVAL)
+            self.logger.info(' | '.join(stage.progress() for stage in stages))
+
+    async def _run_parse_pipeline(
+        self,
+        parsed_token_list: list,
+        main_data_dict: dict,
+        refresh_ids: list = None,
+        checkpoint: dict = None,
+    ) -> tuple[int, int]:
+        """
+        Streaming parse: info -> decimals/futures -> prices.
+        Every stage has its own bounded worker pool fed by a queue, so a slow
+        request only holds up its own worker instead of the whole chunk.
+
+        Args:
+            parsed_token_list: tokens from the listing to fetch info for
+            main_data_dict: {chain: {address: token_info}} filled in place
+            refresh_ids: cmc_ids already in main_data_dict whose futures are re-checked
+            checkpoint: info/decimals/futures results from an interrupted run, 
+                reused instead of re-requesting and saved after every completed chunk
+
+        Futures requests that keep failing are re-queued PARSE_FUTURES_REQUEUE_ATTEMPTS times,
+        then the stored futures of the token are kept. New tokens without stored futures are left
+        out and listed in self._futures_failed_ids, so the next refresh picks them up again.
+
+        Raises:
+            RuntimeError: an info chunk failed. main_data_dict is then incomplete and must
+                not be applied, the checkpoint keeps everything that succeeded.
+
+        Returns:
+            (parsed_contracts, parsed_tokens)
+        """
+        if checkpoint is None:
+            results = {'info': {}, 'decimals': {}, 'futures': {}}
+        else:
+            results = checkpoint
+        # cmc_id -> [(chain, address)], so futures results touch only their own contracts
+        cmc_index: dict[int, list[tuple[str, str]]] = {}
+        for cmc_id in refresh_ids or []:
+            cmc_index[cmc_id] = []
+        if cmc_index:
+            for chain_name, chain_data in main_data_dict.items():
+                for address, token_info in chain_data.items():
+                    if token_info.get('cmc_id') in cmc_index:
+                        cmc_index[token_info['cmc_id']].append((chain_name, address))
         chunk_size = CACHE_UPDATE_BATCH_SIZE
+        chunks = [parsed_token_list[i:i + chunk_size] for i in range(0, len(parsed_token_list), chunk_size)]
+        # chunk index -> jobs still running for it, the chunk is checkpointed when it drops to 0
+        chunk_pending: dict[int, int] = {}
         parsed_contracts = 0
         parsed_tokens = 0
-        for i in range(0, len(parsed_token_list), chunk_size):
-            self.logger.info(f'Processing chunk {i//chunk_size+1}/{len(parsed_token_list)//chunk_size+1}')
-            chunk = parsed_token_list[i:i + chunk_size]
 
-            ids = [token.get('id') for token in chunk]
-            data = await self._get_cmc_tokens_data_by_ids(ids)
-            if not data:
-                continue
-            
-            # Collect futures tasks for this chunk
-            futures_tasks = [(self._get_supported_futures(token.get('id')), token.get('id')) for token in chunk]
-            
-            decimals_tasks = []
-            for token in chunk:
-                id = token.get('id')
-                token_data = data.get(str(id))
-                if not token_data:
+        info_stats = ParseStageStats('info', queued=len(chunks))
+        decimals_stats = ParseStageStats('decimals')
+        futures_stats = ParseStageStats('futures', queued=len(cmc_index))
+        price_stats = ParseStageStats('prices')
+        stages = [info_stats, decimals_stats, futures_stats, price_stats]
+
+        info_queue = asyncio.Queue()
+        decimals_queue = asyncio.Queue()
+        futures_queue = asyncio.Queue()
+        price_queue = asyncio.Queue()
+        for chunk_idx, chunk in enumerate(chunks):
+            info_queue.put_nowait((chunk_idx, chunk))
+        for cmc_id in cmc_index:
+            futures_queue.put_nowait((cmc_id, None, 0))
+        self._futures_failed_ids = set()
+
+        def finish_chunk_job(chunk_idx: Optional[int]):
+            if chunk_idx is None:
+                return
+            chunk_pending[chunk_idx] -= 1
+            if chunk_pending[chunk_idx] == 0 and checkpoint is not None:
+                self._save_parse_checkpoint(checkpoint)
+
+        def extract_contracts(token_data: dict) -> list:
+            token_addresses = []
+            for contract_data in token_data.get('contract_address', []):
+                address = contract_data.get('contract_address','').split('#')[0]
+                if not address or address.lower() == "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee": 
                     continue
-                
-                contract_addresses = token_data.get('contract_address', [])
-                if not contract_addresses:
+                platform = contract_data.get('platform')
+                chain_name = platform.get('name')
+                if chain_name not in CMC_PLATFORM_NAMES:
                     continue
-                
-                for contract_data in contract_addresses:
-                    address = contract_data.get('contract_address','').split('#')[0]
-                    if not address or address.lower() == "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee": 
-                        continue
-                    platform = contract_data.get('platform')
-                    chain_name = platform.get('name')
-                    if chain_name not in list(CMC_PLATFORM_NAMES.keys()):
-                        continue
-                    chain_name = CMC_PLATFORM_NAMES.get(chain_name)
-                    if chain_name not in CHAIN_NAMES:
-                        continue
-                    if chain_name == 'SOLANA':
-                        decimals_tasks.append((None, None, None))
-                    else: 
-                        address = Web3.to_checksum_address(address)
+                chain_name = CMC_PLATFORM_NAMES.get(chain_name)
+                if chain_name not in CHAIN_NAMES:
+                    continue
+                if chain_name != 'SOLANA':
+                    address = Web3.to_checksum_address(address)
+                token_addresses.append([chain_name, address])
+            return token_addresses
+
+        def apply_futures(token_id: int, supported_futures: list):
+            # An address listed under several cmc_ids belongs to the last one parsed
+            token_addresses = [
+                (chain_name, address) for chain_name, address in cmc_index.pop(token_id, [])
+                if main_data_dict[chain_name].get(address, {}).get('cmc_id') == token_id
+            ]
+            if not supported_futures:
+                # Remove token without futures from all chains
+                for chain_name, address in token_addresses:
+                    del main_data_dict[chain_name][address]
+                return
+
+            for chain_name, address in token_addresses:
+                main_data_dict[chain_name][address]['supported_futures'] = supported_futures
+                price_queue.put_nowait((chain_name, address))
+                price_stats.queued += 1
+
+        async def handle_info(job: tuple):
+            nonlocal parsed_contracts, parsed_tokens
+            chunk_idx, chunk = job
+            missing_ids = [token.get('id') for token in chunk if str(token.get('id')) not in results['info']]
+            if missing_ids:
+                data = await self._get_cmc_tokens_data_by_ids(missing_ids)
+                if not data:
+                    # Failed chunk, the parse is not complete without it
+                    raise RuntimeError(f'No CMC info for chunk of {len(missing_ids)} tokens')
+                for id in missing_ids:
+                    token_data = data.get(str(id))
+                    if token_data:
+                        results['info'][str(id)] = extract_contracts(token_data)
+
+            # The info job itself holds the chunk open until all its jobs are queued
+            chunk_pending[chunk_idx] = 1
+            for token in chunk:
+                id = token.get('id')
+                token_addresses = []
+                for chain_name, address in results['info'].get(str(id), []):
+                    if chain_name != 'SOLANA':
                         if self._is_banned(address):
                             self.logger.debug(f'Skipping banned token {address}')
                             continue
-                        decimals_tasks.append((self.helper_evm._get_token_decimals(address, chain_name), address, chain_name))
                     main_data_dict[chain_name][address] = {
                         'ticker': token.get('symbol', '').lower(),
                         'circulating_supply': token.get('circulating_supply'),
@@ -466,98 +619,367 @@ class SupplyParser:
                         'token_address': address,
                         'cmc_id': token.get('id')
                     }
+                    token_addresses.append((chain_name, address))
                     parsed_contracts += 1
+                    if chain_name == 'SOLANA':
+                        continue
+                    cached_decimals = results['decimals'].get(f'{chain_name}:{address}')
+                    if cached_decimals is not None:
+                        main_data_dict[chain_name][address]['decimals'] = cached_decimals
+                        parsed_tokens += 1
+                    else:
+                        decimals_queue.put_nowait((address, chain_name, chunk_idx))
+                        decimals_stats.queued += 1
+                        chunk_pending[chunk_idx] += 1
 
-            # Execute decimals and futures tasks in parallel
-            self.logger.info(f"{len(decimals_tasks)} decimals tasks, {len(futures_tasks)} futures tasks")
-            decimals_results = await asyncio.gather(*[task for task, _ , _ in decimals_tasks if task is not None], return_exceptions=True)
-            futures_results = await asyncio.gather(*[task for task, _ in futures_tasks], return_exceptions=True)
-            
-            # Process decimals results
-            for result, (address, chain_name) in zip(decimals_results, [(address, chain_name) for _, address, chain_name in decimals_tasks if _ is not None]):
-                if result is not None and not isinstance(result, Exception):
-                    main_data_dict[chain_name][address]['decimals'] = result
-                parsed_tokens += 1
-            
-            # Process futures results and add to all addresses for this token
-            chunk_token_ids = set(token.get('id') for token in chunk)
-            tokens_with_futures = set()
-            for (_, token_id), supported_futures in zip(futures_tasks, futures_results):
-                if isinstance(supported_futures, Exception) or not len(supported_futures):
+                if not token_addresses:
                     continue
-                tokens_with_futures.add(token_id)
-                # Add supported_futures to all addresses for this token_id
-                for chain_name, chain_data in main_data_dict.items():
-                    for address, token_info in chain_data.items():
-                        if token_info.get('cmc_id') == token_id:
-                            token_info['supported_futures'] = supported_futures
-            
-            # Remove tokens from THIS CHUNK that don't have futures
-            tokens_without_futures = chunk_token_ids - tokens_with_futures
-            removed_count = 0
-            for chain_name in list(main_data_dict.keys()):
-                addresses_to_remove = [
-                    addr for addr, info in main_data_dict[chain_name].items()
-                    if info.get('cmc_id') in tokens_without_futures
-                ]
-                for addr in addresses_to_remove:
-                    del main_data_dict[chain_name][addr]
-                    removed_count += 1
-            
-            self.logger.success(f'Processed chunk {i//chunk_size+1}/{len(parsed_token_list)//chunk_size+1}, removed {removed_count} tokens without futures')
-        
-        # Fetch prices in batches
-        for main_data_dict_chain_name, main_data_dict_chain_data in main_data_dict.items():
-            chain_tokens = list(main_data_dict_chain_data.items())
-            self.logger.info(f"Fetching prices for {len(chain_tokens)} {main_data_dict_chain_name} tokens in batches of {CACHE_UPDATE_BATCH_SIZE}")
-            
-            for i in range(0, len(chain_tokens), CACHE_UPDATE_BATCH_SIZE):
-                batch = chain_tokens[i:i+CACHE_UPDATE_BATCH_SIZE]
-                price_tasks = [
-                    self._get_token_price(main_data_dict_chain_name, address, data['ticker'], data.get('cmc_id'))
-                    for address, data in batch
-                ]
-                prices = await asyncio.gather(*price_tasks, return_exceptions=True)
-                
-                for (address, data), price in zip(batch, prices):
-                    if isinstance(price, Exception):
-                        self.logger.warning(f"Failed to get price for {data['ticker']}: {price}")
-                        main_data_dict[main_data_dict_chain_name][address]['last_price'] = 0
+                cmc_index[id] = token_addresses
+                cached_futures = results['futures'].get(str(id))
+                if cached_futures is not None:
+                    apply_futures(id, cached_futures)
+                else:
+                    futures_queue.put_nowait((id, chunk_idx, 0))
+                    futures_stats.queued += 1
+                    chunk_pending[chunk_idx] += 1
+            finish_chunk_job(chunk_idx)
+
+        async def handle_decimals(job: tuple):
+            nonlocal parsed_tokens
+            address, chain_name, chunk_idx = job
+            try:
+                result = await self.helper_evm._get_token_decimals(address, chain_name)
+                token_info = main_data_dict[chain_name].get(address)
+                if result is not None:
+                    results['decimals'][f'{chain_name}:{address}'] = result
+                    if token_info is not None:
+                        token_info['decimals'] = result
+                parsed_tokens += 1
+            finally:
+                finish_chunk_job(chunk_idx)
+
+        def keep_stored_futures(token_id: int):
+            """Futures request gave up: keep what is stored for the token instead of failing the parse"""
+            stored = [
+                token_info['supported_futures'] for _, _, token_info in self.token_registry.by_cmc_id(token_id)
+                if 'supported_futures' in token_info
+            ]
+            if stored:
+                self.logger.warning(f'No futures data for token ID {token_id}, keeping stored {stored[0]}')
+                apply_futures(token_id, stored[0])
+            else:
+                self.logger.warning(f'No futures data for new token ID {token_id}, leaving it for the next update')
+                self._futures_failed_ids.add(token_id)
+                apply_futures(token_id, [])
+
+        async def handle_futures(job: tuple):
+            token_id, chunk_idx, attempt = job
+            try:
+                supported_futures = await self._get_supported_futures(token_id)
+                if supported_futures is None:
+                    # Failed request, not the same as no futures
+                    if attempt < PARSE_FUTURES_REQUEUE_ATTEMPTS:
+                        # Back of the queue, a short CMC outage is over by the time it comes up again
+                        futures_queue.put_nowait((token_id, chunk_idx, attempt + 1))
+                        futures_stats.queued += 1
+                        if chunk_idx is not None:
+                            chunk_pending[chunk_idx] += 1
                     else:
-                        main_data_dict[main_data_dict_chain_name][address]['last_price'] = price
-                
-                self.logger.info(f"Updated prices for batch {i//CACHE_UPDATE_BATCH_SIZE+1}/{(len(chain_tokens)-1)//CACHE_UPDATE_BATCH_SIZE+1}")
+                        keep_stored_futures(token_id)
+                    return
+                results['futures'][str(token_id)] = supported_futures or []
+                apply_futures(token_id, supported_futures)
+            finally:
+                finish_chunk_job(chunk_idx)
+
+        async def handle_price(job: tuple):
+            chain_name, address = job
+            token_info = main_data_dict[chain_name].get(address)
+            if token_info is None:
+                return
+            try:
+                price = await self._get_token_price(chain_name, address, token_info['ticker'], token_info.get('cmc_id'))
+            except Exception as e:
+                self.logger.warning(f"Failed to get price for {token_info['ticker']}: {e}")
+                price = 0
+            token_info['last_price'] = price
+
+        self.logger.info(f'Processing {len(chunks)} chunks of {chunk_size} tokens')
+        workers = [
+            *[asyncio.create_task(self._stage_worker(info_queue, handle_info, info_stats)) for _ in range(PARSE_INFO_WORKERS)],
+            *[asyncio.create_task(self._stage_worker(decimals_queue, handle_decimals, decimals_stats)) for _ in range(PARSE_DECIMALS_WORKERS)],
+            *[asyncio.create_task(self._stage_worker(futures_queue, handle_futures, futures_stats)) for _ in range(PARSE_FUTURES_WORKERS)],
+            *[asyncio.create_task(self._stage_worker(price_queue, handle_price, price_stats)) for _ in range(PARSE_PRICE_WORKERS)],
+        ]
+        progress_task = asyncio.create_task(self._log_parse_progress(stages))
+        try:
+            # Stages only feed downstream queues, so joining in order drains the whole pipeline
+            await info_queue.join()
+            await asyncio.gather(decimals_queue.join(), futures_queue.join())
+            await price_queue.join()
+        except BaseException:
+            if checkpoint is not None:
+                self._save_parse_checkpoint(checkpoint)
+            raise
+        finally:
+            progress_task.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(progress_task, *workers, return_exceptions=True)
+
+        for stage in stages:
+            self.logger.info(f'Stage {stage.summary()}')
+        if info_stats.failed:
+            # Missing chunks would truncate the token universe. Completed chunks stay in the checkpoint.
+            if checkpoint is not None:
+                self._save_parse_checkpoint(checkpoint)
+            raise RuntimeError(f'Parse incomplete: {info_stats.failed} info chunks failed')
+        return parsed_contracts, parsed_tokens
+
+    def _load_parse_checkpoint(self) -> Optional[dict]:
+        """Checkpoint of an interrupted full parse. Broken or outdated ones are removed."""
+        try:
+            checkpoint = get_persistence().load(PARSE_CHECKPOINT_PATH)
+            if checkpoint is None:
+                return None
+            if not isinstance(checkpoint, dict) or not isinstance(checkpoint.get('started_at'), str):
+                raise ValueError('no started_at')
+            for key in ('info', 'decimals', 'futures'):
+                if not isinstance(checkpoint[key], dict):
+                    raise ValueError(f'{key} is not a dict')
+            started_at = datetime.fromisoformat(checkpoint['started_at'])
+        except (TypeError, ValueError, KeyError) as e:
+            self.logger.warning(f'Broken parse checkpoint, starting from scratch: {str(e)}')
+            self._remove_parse_checkpoint()
+            return None
+        if datetime.now() - started_at > timedelta(hours=PARSE_CHECKPOINT_MAX_AGE_HOURS):
+            self.logger.info(f'Parse checkpoint from {started_at} is outdated, starting from scratch')
+            self._remove_parse_checkpoint()
+            return None
+        return checkpoint
+
+    def _save_parse_checkpoint(self, checkpoint: dict):
+        get_persistence().write(PARSE_CHECKPOINT_PATH, checkpoint)
+
+    def _remove_parse_checkpoint(self):
+        get_persistence().remove(PARSE_CHECKPOINT_PATH)
+
+    def _set_skipped_cmc_ids(self, skipped_ids: set):
+        self._skipped_cmc_ids = skipped_ids
+        get_persistence().write(SKIPPED_CMC_IDS_PATH, sorted(skipped_ids))
+
+    def _apply_token_data(self, main_data_dict: dict):
+        """Swap parsed data in place so detectors holding chain dicts see it"""
+        self.token_registry.replace(main_data_dict)
+
+    async def _parse_tokens(self, ):
+        parsed_token_list = await self._fetch_token_listing()
+        main_data_dict = {
+            chain_name: {}
+            for chain_name in CHAIN_NAMES
+        }
+        checkpoint = self._load_parse_checkpoint()
+        if checkpoint:
+            self.logger.info(
+                f"Resuming parse from checkpoint of {checkpoint['started_at']}: "
+                f"{len(checkpoint['info'])} tokens info, {len(checkpoint['decimals'])} decimals, {len(checkpoint['futures'])} futures cached"
+            )
+        else:
+            checkpoint = {'started_at': datetime.now().isoformat(), 'info': {}, 'decimals': {}, 'futures': {}}
+        parsed_contracts, parsed_tokens = await self._run_parse_pipeline(parsed_token_list, main_data_dict, checkpoint=checkpoint)
+        kept_ids = {token_info['cmc_id'] for chain_data in main_data_dict.values() for token_info in chain_data.values()}
+        self._set_skipped_cmc_ids({token['id'] for token in parsed_token_list} - kept_ids - self._futures_failed_ids)
         
         # Обновляем данные в памяти
-        self.main_token_data = main_data_dict
+        self._apply_token_data(main_data_dict)
         self.logger.success(f'Found {parsed_contracts} contracts for {parsed_tokens} tokens')
         
         # Сохраняем данные в JSON файлы
         await self._update_token_cache_json()
+        self._remove_parse_checkpoint()
         
         self.logger.success(f'Token data updated and saved successfully')
         
-    async def _scheduled_parse_loop(self, update_callback:Callable=None):
+    async def _refresh_tokens(self) -> dict:
+        """
+        Incremental refresh against the stored token set:
+        - new cmc_ids go through info/decimals/futures/prices
+        - supply of stored tokens is updated from the listing
+        - futures are re-checked for a rolling subset of PARSE_ROLLING_REFRESH_SIZE ids
+        - delisted and banned tokens are pruned
+        Not checkpointed, only full parses resume: a failed refresh leaves stored data as is and is retried as a whole.
+
+        Returns:
+            dict: {chain: {'added': [addresses], 'removed': [addresses]}} for changed chains
+        """
+        parsed_token_list = await self._fetch_token_listing()
+        listing_by_id = {token['id']: token for token in parsed_token_list}
+
+        work_data = {
+            chain_name: dict(self.main_token_data.get(chain_name, {}))
+            for chain_name in CHAIN_NAMES
+        }
+        stored_ids = set()
+        delisted_ids = set()
+        for chain_name, chain_data in work_data.items():
+            for address, token_info in list(chain_data.items()):
+                listed_token = listing_by_id.get(token_info.get('cmc_id'))
+                if listed_token is None or self._is_banned(address):
+                    delisted_ids.add(token_info.get('cmc_id'))
+                    del chain_data[address]
+                    continue
+                stored_ids.add(listed_token['id'])
+                token_info['circulating_supply'] = listed_token.get('circulating_supply')
+                token_info['total_supply'] = listed_token.get('total_supply')
+
+        # Ids that produced no tracked contracts are re-parsed only when the rolling window reaches them
+        known_ids = stored_ids | (self._skipped_cmc_ids & listing_by_id.keys())
+        rolling_ids = sorted(known_ids)
+        if self._rolling_refresh_offset >= len(rolling_ids):
+            self._rolling_refresh_offset = 0
+        rolling_window = rolling_ids[self._rolling_refresh_offset:self._rolling_refresh_offset + PARSE_ROLLING_REFRESH_SIZE]
+        self._rolling_refresh_offset += PARSE_ROLLING_REFRESH_SIZE
+
+        refresh_ids = [cmc_id for cmc_id in rolling_window if cmc_id in stored_ids]
+        new_tokens = [
+            token for token in parsed_token_list
+            if token['id'] not in known_ids or (token['id'] in rolling_window and token['id'] not in stored_ids)
+        ]
+        self.logger.info(f'Incremental refresh: {len(new_tokens)} new, {len(refresh_ids)} rechecked, {len(delisted_ids)} delisted')
+
+        await self._run_parse_pipeline(new_tokens, work_data, refresh_ids=refresh_ids)
+        kept_ids = {token_info['cmc_id'] for chain_data in work_data.values() for token_info in chain_data.values()}
+        # Ids whose futures failed stay unknown, so the next refresh treats them as new again
+        self._set_skipped_cmc_ids((self._skipped_cmc_ids | {token['id'] for token in new_tokens}) - kept_ids - self._futures_failed_ids)
+
+        delta = {}
+        for chain_name, fresh_chain_data in work_data.items():
+            live_chain_data = self.main_token_data.setdefault(chain_name, {})
+            removed = [address for address in live_chain_data if address not in fresh_chain_data]
+            added = [address for address in fresh_chain_data if address not in live_chain_data]
+            for address in removed:
+                del live_chain_data[address]
+            for address, token_info in fresh_chain_data.items():
+                if live_chain_data.get(address) is not token_info:
+                    live_chain_data[address] = token_info
+            if added or removed:
+                delta[chain_name] = {'added': added, 'removed': removed}
+                self.logger.info(f'{chain_name}: +{len(added)} / -{len(removed)} contracts')
+        self.token_registry.touch()
+
+        await self._update_token_cache_json()
+        self.logger.success(f'Incremental refresh done, {len(delta)} chains changed')
+        return delta
+
+    async def _run_update(self, update_callback: Callable = None, delta_callback: Callable = None):
+        # An interrupted full parse is finished first, incremental refreshes have no checkpoint
+        resume_full_parse = get_persistence().exists(PARSE_CHECKPOINT_PATH)
+        if INCREMENTAL_REFRESH and self.main_token_data and not resume_full_parse:
+            delta = await self._refresh_tokens()
+            # Called for an empty delta too: futures of kept tokens may have changed
+            if delta_callback:
+                delta_callback(delta)
+        else:
+            await self._parse_tokens()
+            if update_callback:
+                update_callback()
+
+    async def _refresh_prices(self):
+        """
+        Update last_price of every tracked contract in place, CMC batches first, Gecko for the rest.
+        Full CMC quotes are kept in the quote cache for alerts.
+        """
+        cmc_index: dict[int, list[dict]] = {}
+        for chain_data in self.main_token_data.values():
+            for token_info in chain_data.values():
+                if token_info.get('cmc_id'):
+                    cmc_index.setdefault(token_info['cmc_id'], []).append(token_info)
+
+        t1 = time.perf_counter()
+        updated_ids = set()
+        cmc_ids = list(cmc_index.keys())
+        for i in range(0, len(cmc_ids), PRICE_REFRESH_BATCH_SIZE):
+            quotes = await self._get_cmc_quotes_by_ids(cmc_ids[i:i + PRICE_REFRESH_BATCH_SIZE])
+            fetched_at = time.time()
+            for cmc_id, quote in quotes.items():
+                price = quote.get('price')
+                if not price or cmc_id not in cmc_index:
+                    continue
+                self._store_quote(cmc_id, quote, fetched_at)
+                for token_info in cmc_index[cmc_id]:
+                    token_info['last_price'] = price
+                updated_ids.add(cmc_id)
+
+        gecko_updated = 0
+        for chain_name, chain_data in self.main_token_data.items():
+            if chain_name == 'SOLANA':
+                continue
+            missing = [address for address, token_info in chain_data.items() if token_info.get('cmc_id') not in updated_ids]
+            for i in range(0, len(missing), PRICE_REFRESH_BATCH_SIZE):
+                prices = await self.gecko.get_token_prices_simple(chain_name, missing[i:i + PRICE_REFRESH_BATCH_SIZE])
+                for address in missing[i:i + PRICE_REFRESH_BATCH_SIZE]:
+                    price = prices.get(address.lower())
+                    token_info = chain_data.get(address)
+                    if price and token_info is not None:
+                        token_info['last_price'] = price
+                        gecko_updated += 1
+        self.token_registry.touch(metadata=False)
+
+        self.logger.info(
+            f'Refreshed prices for {len(updated_ids)}/{len(cmc_ids)} tokens from CMC '
+            f'and {gecko_updated} contracts from Gecko in {time.perf_counter() - t1:.1f}s'
+        )
+
+    async def _price_refresh_loop(self):
+        while True:
+            # Runs right away so alerts have cached quotes from the start
+            if self.main_token_data:
+                try:
+                    await self._refresh_prices()
+                except Exception as e:
+                    self.logger.error(f'Error in price refresh loop: {str(e)}')
+            await asyncio.sleep(PRICE_REFRESH_INTERVAL_MINUTES * 60)
+
+    def start_price_refresh_loop_task(self):
+        if self._price_refresh_task is None or self._price_refresh_task.done():
+            self._price_refresh_task = asyncio.create_task(self._price_refresh_loop())
+            return True
+        self.logger.warning(f'Price refresh task already running')
+        return False
+
+    async def _scheduled_parse_loop(self, update_callback:Callable=None, delta_callback:Callable=None):
         while True:
             try:
                 if self._should_run_parse():
                     self.logger.info(f'Starting scheduled parse')
-                    await self._parse_tokens()
-                    if update_callback:
-                        update_callback()
+                    await self._run_update(update_callback, delta_callback)
                 
                 await asyncio.sleep(PARSED_DATA_CHECK_DELAY_DAYS * 24 * 60 * 60)
                 
             except Exception as e:
                 self.logger.error(f'Error in scheduled parse loop: {str(e)}')
-                self.logger.warning(f'Waiting 1 hour before retrying')
-                await asyncio.sleep(60 * 60)
-
-    async def start_scheduled_parsing_loop_task(self, update_callback:Callable=None):
+                if get_persistence().exists(PARSE_CHECKPOINT_PATH):
+                    self.logger.warning(f'Waiting {PARSE_RESUME_DELAY_MINUTES} minutes before resuming from checkpoint')
+                    await asyncio.sleep(PARSE_RESUME_DELAY_MINUTES * 60)
+                else:
+                    self.logger.warning(f'Waiting 1 hour before retrying')
+                    await asyncio.sleep(60 * 60)
+
+    async def start_scheduled_parsing_loop_task(self, update_callback:Callable=None, delta_callback:Callable=None):
         if self._parser_task is None or self._parser_task.done():
-            if self._should_run_parse():
-                await self._parse_tokens()
-            self._parser_task = asyncio.create_task(self._scheduled_parse_loop(update_callback=update_callback))
+            if self.main_token_data is None:
+                # Nothing stored to start listeners from, the first parse has to finish here.
+                # Otherwise the loop below refreshes stale data in the background.
+                self.logger.info(f'No stored token data, waiting for the first parse')
+                while True:
+                    try:
+                        await self._run_update()
+                        break
+                    except Exception as e:
+                        self.logger.error(f'First parse failed: {str(e)}')
+                        self.logger.warning(f'Waiting {PARSE_RESUME_DELAY_MINUTES} minutes before resuming from checkpoint')
+                        await asyncio.sleep(PARSE_RESUME_DELAY_MINUTES * 60)
+            self._parser_task = asyncio.create_task(self._scheduled_parse_loop(update_callback=update_callback, delta_callback=delta_callback))
             return True
         else:
             self.logger.warning(f'Scheduled parsing task already running')
@@ -578,9 +1000,9 @@ class SupplyParser:
         """
         
         try: 
-            token_data = self.main_token_data.get(token_address)
-            if token_data:
-                return token_data
+            matches = self.token_registry.find(token_address)
+            if matches:
+                return matches[0][2]
             else:
                 self.logger.warning(f'No parsed token data for {token_address}')
                 return {}
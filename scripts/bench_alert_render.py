@@ -0,0 +1,78 @@
+"""
+Alert render benchmark: _format_alert with the per-token template cache
+against a cache that is dropped before every alert (what a price refresh
+used to do). Run from the repo root with config.py in place:
+
+    python scripts/bench_alert_render.py --tokens 500 --alerts 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: F401  (import order: core before tg_client)
+from tg_client.updates_bot import TelegramClient
+
+FUTURES = ['binance', 'bybit', 'okx', 'bitget', 'gate', 'mexc']
+
+
+def make_signals(tokens: int, alerts: int) -> list[tuple[dict, list]]:
+    rng = random.Random(42)
+    token_set = [
+        (f"TKN{i}", f"0x{i:040x}", rng.sample(FUTURES, rng.randint(0, len(FUTURES))))
+        for i in range(tokens)
+    ]
+    signals = []
+    for _ in range(alerts):
+        ticker, contract, futures = rng.choice(token_set)
+        signals.append(({
+            'chain': 'ETH',
+            'ticker': ticker,
+            'contract': contract,
+            'direction': rng.choice(['long', 'short']),
+            'event_type': 'deposit',
+            'message_tier': 'Tier_1',
+            'supply_percent': rng.random() / 100,
+            'tx_hash': f"0x{rng.getrandbits(256):064x}",
+            'from_addresses': [f"0x{rng.getrandbits(160):040x}"],
+            'to_addresses': [f"0x{rng.getrandbits(160):040x}"],
+            'filter_matches': {},
+        }, futures))
+    return signals
+
+
+def run(client: TelegramClient, signals: list, drop_cache: bool) -> float:
+    registry = client.supply_parser.token_registry
+    token_data = {'price': 1.2345, 'market_cap': 12_345_678, 'volume_24h': 987_654}
+    t1 = time.perf_counter()
+    for signal, futures in signals:
+        if drop_cache:
+            registry.metadata_version += 1
+        client._format_alert(signal, token_data, futures)
+    return time.perf_counter() - t1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, default=500)
+    parser.add_argument('--alerts', type=int, default=20000)
+    args = parser.parse_args()
+
+    client = TelegramClient(bot_token=None)
+    client.supply_parser = SimpleNamespace(token_registry=SimpleNamespace(metadata_version=0))
+    signals = make_signals(args.tokens, args.alerts)
+    run(client, signals[:1000], drop_cache=False)
+
+    uncached = run(client, signals, drop_cache=True)
+    cached = run(client, signals, drop_cache=False)
+    for name, elapsed in (('template rebuilt', uncached), ('template cached', cached)):
+        print(f"{name:<18} {elapsed * 1e6 / len(signals):8.1f} us/alert  ({elapsed:.2f}s total)")
+    print(f"speedup            {uncached / cached:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
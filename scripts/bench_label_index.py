@@ -0,0 +1,111 @@
+"""
+Label lookups and memory: dict[str, str] (what EventFilter used to load) against
+CompactLabelIndex over the same generated addr:label file. Each variant is loaded
+in its own process so RSS figures do not mix.
+
+    python scripts/bench_label_index.py --addresses 2000000 --labels 5000
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOOKUPS = 200_000
+
+
+def rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generate(path: str, addresses: int, labels: int):
+    rng = random.Random(42)
+    names = [f"Exchange {i} Hot Wallet" for i in range(labels)]
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(addresses):
+            f.write(f"0x{rng.getrandbits(160):040x}:{rng.choice(names)}\n")
+
+
+def probe_addresses(path: str, count: int) -> list[str]:
+    """Half known addresses, half random misses, shuffled"""
+    rng = random.Random(7)
+    with open(path, 'r', encoding='utf-8') as f:
+        known = [line.split(':', 1)[0] for line in f]
+    probes = rng.sample(known, count // 2) + [f"0x{rng.getrandbits(160):040x}" for _ in range(count - count // 2)]
+    rng.shuffle(probes)
+    return probes
+
+
+def load_dict(path: str) -> dict:
+    labels = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, name = line.split(':', 1)
+            labels[key.strip().lower()] = name.strip()
+    return labels
+
+
+def run_variant(variant: str, source_path: str):
+    """Child process: load one variant, print load time, RSS growth, lookup rate and a result checksum"""
+    import core  # noqa: F401  (import order as in main.py)
+    from onchain.label_index import CompactLabelIndex
+
+    probes = probe_addresses(source_path, LOOKUPS)
+    base_rss = rss_mb()
+    t1 = time.perf_counter()
+    if variant == 'dict':
+        labels = load_dict(source_path)
+    else:
+        labels = CompactLabelIndex.open_for_source(source_path)
+    load_time = time.perf_counter() - t1
+    rss = rss_mb() - base_rss
+
+    t1 = time.perf_counter()
+    results = [labels.get(address) for address in probes]
+    lookup_time = time.perf_counter() - t1
+    checksum = zlib.crc32('\n'.join(result or '' for result in results).encode())
+    hits = sum(result is not None for result in results)
+    print(f"{variant:<8} load {load_time:6.2f}s  rss +{rss:8.1f} MB  "
+          f"lookup {lookup_time * 1e9 / len(probes):6.0f} ns  hits {hits}  checksum {checksum}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--addresses', type=int, default=2_000_000)
+    parser.add_argument('--labels', type=int, default=5000)
+    parser.add_argument('--variant', choices=['dict', 'compact'], help=argparse.SUPPRESS)
+    parser.add_argument('--source', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args.variant, args.source)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = os.path.join(tmp_dir, 'labels.txt')
+        generate(source_path, args.addresses, args.labels)
+        print(f"{args.addresses} addresses, {args.labels} labels, source {os.path.getsize(source_path) / 2**20:.0f} MB")
+        # First compact run builds <source>.idx, the second one measures opening an existing index
+        for variant in ('dict', 'compact', 'compact'):
+            subprocess.run(
+                [sys.executable, __file__, '--variant', variant, '--source', source_path],
+                check=True
+            )
+        print(f"index file {os.path.getsize(source_path + '.idx') / 2**20:.0f} MB (mmapped, pages shared and evictable)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Token parse benchmark against a mocked CMC/RPC with configurable latency:
+the streaming _run_parse_pipeline against the chunked parse it replaced
+(info per chunk, then decimals and futures gathered per chunk, futures
+propagated by scanning every contract, prices in batches at the end).
+Both runs get the same mocked responses and must produce the same data.
+
+    python scripts/bench_parse_pipeline.py --tokens 3000 --chains 5 --latency-ms 50 --slow-rate 0.02 --slow-ms 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: F401  (import order as in main.py)
+from loguru import logger
+from web3 import Web3
+from config import CACHE_UPDATE_BATCH_SIZE, CHAIN_NAMES, CMC_PLATFORM_NAMES
+from parser.supply_parser import SupplyParser
+
+
+class MockedCMC:
+    """Deterministic token universe, every request sleeps latency_ms, slow_rate of them slow_ms"""
+
+    def __init__(self, tokens: int, chains: int, latency_ms: float, slow_rate: float, slow_ms: float, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.latency = latency_ms / 1000
+        self.slow_rate = slow_rate
+        self.slow = slow_ms / 1000
+        platforms = [platform for platform, chain_name in CMC_PLATFORM_NAMES.items() if chain_name in CHAIN_NAMES][:chains]
+        self.listing = []
+        self.info = {}
+        self.futures = {}
+        for token_id in range(1, tokens + 1):
+            self.listing.append({
+                'id': token_id, 'name': f"Token {token_id}", 'symbol': f"TKN{token_id}",
+                'circulating_supply': 10 ** 9, 'total_supply': 10 ** 9,
+            })
+            contracts = []
+            for platform in self.rng.sample(platforms, self.rng.randint(1, len(platforms))):
+                if CMC_PLATFORM_NAMES[platform] == 'SOLANA':
+                    address = f"So{self.rng.getrandbits(160):040x}"
+                else:
+                    address = f"0x{self.rng.getrandbits(160):040x}"
+                contracts.append({'contract_address': address, 'platform': {'name': platform}})
+            self.info[str(token_id)] = {'contract_address': contracts}
+            self.futures[token_id] = ['binance', 'bybit'] if self.rng.random() < 0.7 else []
+        self.requests = 0
+
+    async def _wait(self):
+        self.requests += 1
+        await asyncio.sleep(self.slow if self.rng.random() < self.slow_rate else self.latency)
+
+    async def tokens_data_by_ids(self, token_ids: list) -> dict:
+        await self._wait()
+        return {str(token_id): self.info[str(token_id)] for token_id in token_ids}
+
+    async def supported_futures(self, token_id: int) -> list:
+        await self._wait()
+        return list(self.futures[token_id])
+
+    async def token_decimals(self, token_address: str, chain_name: str) -> int:
+        await self._wait()
+        return 18
+
+    async def token_price(self, chain_name: str, address: str, ticker: str, cmc_id: int = None) -> float:
+        await self._wait()
+        return 1.0
+
+
+def make_parser(cmc: MockedCMC) -> SupplyParser:
+    parser = SupplyParser()
+    parser._get_cmc_tokens_data_by_ids = cmc.tokens_data_by_ids
+    parser._get_supported_futures = cmc.supported_futures
+    parser._get_token_price = cmc.token_price
+    parser.helper_evm._get_token_decimals = cmc.token_decimals
+    parser._is_banned = lambda address: False
+    parser._save_parse_checkpoint = lambda checkpoint: None
+    return parser
+
+
+async def run_streaming(parser: SupplyParser, tokens: list) -> dict:
+    main_data_dict = {chain_name: {} for chain_name in CHAIN_NAMES}
+    await parser._run_parse_pipeline(tokens, main_data_dict)
+    return main_data_dict
+
+
+async def run_chunked(parser: SupplyParser, tokens: list) -> dict:
+    """The chunked parse before the streaming pipeline, network calls only through the mocked methods"""
+    main_data_dict = {chain_name: {} for chain_name in CHAIN_NAMES}
+    chunk_size = CACHE_UPDATE_BATCH_SIZE
+    for i in range(0, len(tokens), chunk_size):
+        chunk = tokens[i:i + chunk_size]
+        data = await parser._get_cmc_tokens_data_by_ids([token['id'] for token in chunk])
+        if not data:
+            continue
+        decimals_jobs = []
+        for token in chunk:
+            for contract_data in data.get(str(token['id']), {}).get('contract_address', []):
+                address = contract_data['contract_address']
+                chain_name = CMC_PLATFORM_NAMES[contract_data['platform']['name']]
+                if chain_name != 'SOLANA':
+                    address = Web3.to_checksum_address(address)
+                    decimals_jobs.append((address, chain_name))
+                main_data_dict[chain_name][address] = {
+                    'ticker': token['symbol'].lower(),
+                    'circulating_supply': token['circulating_supply'],
+                    'total_supply': token['total_supply'],
+                    'token_address': address,
+                    'cmc_id': token['id'],
+                }
+        decimals = await asyncio.gather(
+            *[parser.helper_evm._get_token_decimals(address, chain_name) for address, chain_name in decimals_jobs]
+        )
+        futures = await asyncio.gather(*[parser._get_supported_futures(token['id']) for token in chunk])
+        for (address, chain_name), result in zip(decimals_jobs, decimals):
+            main_data_dict[chain_name][address]['decimals'] = result
+
+        with_futures = set()
+        for token, supported_futures in zip(chunk, futures):
+            if not supported_futures:
+                continue
+            with_futures.add(token['id'])
+            for chain_data in main_data_dict.values():
+                for token_info in chain_data.values():
+                    if token_info['cmc_id'] == token['id']:
+                        token_info['supported_futures'] = supported_futures
+        without_futures = {token['id'] for token in chunk} - with_futures
+        for chain_data in main_data_dict.values():
+            for address in [address for address, info in chain_data.items() if info['cmc_id'] in without_futures]:
+                del chain_data[address]
+
+    for chain_name, chain_data in main_data_dict.items():
+        chain_tokens = list(chain_data.items())
+        for i in range(0, len(chain_tokens), chunk_size):
+            batch = chain_tokens[i:i + chunk_size]
+            prices = await asyncio.gather(*[
+                parser._get_token_price(chain_name, address, info['ticker'], info['cmc_id']) for address, info in batch
+            ])
+            for (address, info), price in zip(batch, prices):
+                info['last_price'] = price
+    return main_data_dict
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--tokens', type=int, default=3000)
+    arg_parser.add_argument('--chains', type=int, default=5)
+    arg_parser.add_argument('--latency-ms', type=float, default=50)
+    arg_parser.add_argument('--slow-rate', type=float, default=0.02, help='share of requests that take --slow-ms')
+    arg_parser.add_argument('--slow-ms', type=float, default=2000)
+    arg_parser.add_argument('--verbose', action='store_true', help='keep parser logs')
+    args = arg_parser.parse_args()
+    if not args.verbose:
+        logger.remove()
+
+    results = {}
+    for name, run in (('chunked', run_chunked), ('streaming', run_streaming)):
+        cmc = MockedCMC(args.tokens, args.chains, args.latency_ms, args.slow_rate, args.slow_ms)
+        parser = make_parser(cmc)
+        t1 = time.perf_counter()
+        main_data_dict = asyncio.run(run(parser, cmc.listing))
+        elapsed = time.perf_counter() - t1
+        results[name] = (elapsed, main_data_dict)
+        contracts = sum(len(chain_data) for chain_data in main_data_dict.values())
+        print(f"{name:<10} {elapsed:7.2f}s  {cmc.requests} requests  {contracts} contracts kept")
+
+    chunked, streaming = results['chunked'], results['streaming']
+    print(f"speedup    {chunked[0] / streaming[0]:7.2f}x")
+    if chunked[1] != streaming[1]:
+        sys.exit("Parsed data differs between chunked and streaming runs")
+    print("parsed data identical")
+
+
+if __name__ == '__main__':
+    main()
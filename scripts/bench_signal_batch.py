@@ -0,0 +1,58 @@
+"""
+Serialization cost of a burst of auto-open signals: one json.dumps frame per
+transaction (unbatched) against one ujson frame per block (SIGNAL_BATCH_WINDOW_MS > 0).
+
+    python scripts/bench_signal_batch.py --signals 40 --rounds 2000
+"""
+import argparse
+import json
+import random
+import time
+
+import ujson
+
+
+def make_signals(count: int) -> list[dict]:
+    rng = random.Random(42)
+    return [{
+        'ticker': f"TKN{i}",
+        'contract': f"0x{rng.getrandbits(160):040x}",
+        'event_type': rng.choice(['deposit', 'withdraw']),
+        'direction': rng.choice(['long', 'short']),
+        'supply_percent': rng.random() / 100,
+        'auto_open': True,
+        'message_tier': 'Tier_1',
+        'from_addresses': [f"0x{rng.getrandbits(160):040x}"],
+        'to_addresses': [f"0x{rng.getrandbits(160):040x}"],
+    } for i in range(count)]
+
+
+def per_tx(signals: list[dict]) -> int:
+    return sum(len(json.dumps({'service_type': 'onchain_screener', 'signals': [signal]})) for signal in signals)
+
+
+def batched(signals: list[dict]) -> int:
+    message = {'service_type': 'onchain_screener', 'signals': signals}
+    return len(ujson.dumps(message, ensure_ascii=False, escape_forward_slashes=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signals', type=int, default=40, help='auto-open signals in one block')
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    signals = make_signals(args.signals)
+    results = {}
+    for name, fn, frames in (('json per tx', per_tx, args.signals), ('ujson batch', batched, 1)):
+        fn(signals)
+        t1 = time.perf_counter()
+        for _ in range(args.rounds):
+            size = fn(signals)
+        results[name] = (time.perf_counter() - t1) / args.rounds
+        print(f"{name:<12} {results[name] * 1e6:8.1f} us/block  {frames:4d} frames  {size / 1024:6.1f} KB")
+    print(f"speedup      {results['json per tx'] / results['ujson batch']:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Tests import modules the way main.py does, from the repo root with config.py in place"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core  # noqa: E402,F401  (core before tg_client, as in main.py)
@@ -0,0 +1,66 @@
+"""CompactLabelIndex must answer exactly like the dict loaded from the same label file"""
+import random
+
+from onchain.label_index import CompactLabelIndex
+
+
+def test_lookups_match_dict(tmp_path):
+    rng = random.Random(1)
+    source = tmp_path / 'labels.txt'
+    expected = {}
+    lines = ['# comment', '', 'not-an-address: Some Label']
+    for i in range(5000):
+        address = f"0x{rng.getrandbits(160):040x}"
+        label = f"Label {i % 37}"
+        expected[address] = label
+        lines.append(f"{address.upper().replace('0X', '0x')}:{label}")
+    expected['not-an-address'] = 'Some Label'
+    source.write_text('\n'.join(lines), encoding='utf-8')
+
+    index = CompactLabelIndex.open_for_source(str(source))
+    try:
+        assert len(index) == len(expected)
+        assert dict(index.items()) == expected
+        for address, label in expected.items():
+            assert index.get(address) == label
+            assert address in index
+        for _ in range(5000):
+            missing = f"0x{rng.getrandbits(160):040x}"
+            assert index.get(missing) is None
+            assert missing not in index
+        # Labels are interned once, lookups return the shared string
+        first, second = [address for address, label in expected.items() if label == 'Label 3'][:2]
+        assert index.get(first) is index.get(second)
+    finally:
+        index.close()
+
+
+def test_match_straddling_two_keys_is_not_a_hit(tmp_path):
+    # Both keys share the probe's bucket, the tail of the first plus the head of the second forms the probe
+    first = '0x' + 'abab' + '00' * 8 + 'ab' * 10
+    second = '0x' + 'ab' * 10 + 'cd' * 10
+    straddling = '0x' + 'ab' * 20
+    source = tmp_path / 'labels.txt'
+    source.write_text(f"{first}:A\n{second}:B\n", encoding='utf-8')
+
+    index = CompactLabelIndex.open_for_source(str(source))
+    try:
+        assert index.get(first) == 'A'
+        assert index.get(second) == 'B'
+        assert index.get(straddling) is None
+    finally:
+        index.close()
+
+
+def test_index_is_rebuilt_when_the_source_changes(tmp_path):
+    source = tmp_path / 'labels.txt'
+    address = '0x' + '11' * 20
+    source.write_text(f"{address}:Old\n", encoding='utf-8')
+    CompactLabelIndex.open_for_source(str(source)).close()
+
+    source.write_text(f"{address}:New label\n", encoding='utf-8')
+    index = CompactLabelIndex.open_for_source(str(source))
+    try:
+        assert index.get(address) == 'New label'
+    finally:
+        index.close()
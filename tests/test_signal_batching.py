@@ -0,0 +1,101 @@
+"""Auto-open batching in WebsocketClient._send_signal: window timer, size cap and the unbatched mode"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import core.ws_client as ws_client
+from core.signal_outbox import SignalOutbox
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    def make(window_ms: int, max_signals: int = 50) -> ws_client.WebsocketClient:
+        monkeypatch.setattr(ws_client, 'SIGNAL_BATCH_WINDOW_MS', window_ms)
+        monkeypatch.setattr(ws_client, 'SIGNAL_BATCH_MAX_SIGNALS', max_signals)
+        outbox = SignalOutbox(db_path=str(tmp_path / 'outbox.db'), ttl=60)
+        monkeypatch.setattr(ws_client, 'SignalOutbox', lambda: outbox)
+        return ws_client.WebsocketClient(SimpleNamespace())
+    return make
+
+
+def queued(client: ws_client.WebsocketClient) -> list[list[int]]:
+    """Signal numbers of every outbox message, in queue order"""
+    return [
+        [signal['n'] for signal in json.loads(payload)['signals']]
+        for _, payload in client.outbox.due(float('inf'))
+    ]
+
+
+def message(*numbers: int) -> dict:
+    return {'service_type': 'onchain_screener', 'signals': [{'n': n} for n in numbers]}
+
+
+def test_window_coalesces_signals_into_one_message(make_client):
+    client = make_client(window_ms=30)
+
+    async def run():
+        for n in range(5):
+            await client._send_signal(message(n))
+        assert queued(client) == []
+        await asyncio.sleep(0.06)
+
+    asyncio.run(run())
+    assert queued(client) == [[0, 1, 2, 3, 4]]
+
+
+def test_size_cap_flushes_before_the_window_ends(make_client):
+    client = make_client(window_ms=30, max_signals=4)
+
+    async def run():
+        for n in range(10):
+            await client._send_signal(message(n))
+        # Full batches go out right away, the rest waits for the timer
+        assert queued(client) == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        await asyncio.sleep(0.06)
+
+    asyncio.run(run())
+    assert queued(client) == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_flush_by_cap_cancels_the_window_timer(make_client):
+    client = make_client(window_ms=30, max_signals=2)
+
+    async def run():
+        await client._send_signal(message(0, 1))
+        assert client._batch_timer is None
+        # A new batch started right after the cap flush gets its own full window
+        await asyncio.sleep(0.02)
+        await client._send_signal(message(2))
+        await asyncio.sleep(0.02)
+        assert queued(client) == [[0, 1]]
+        await asyncio.sleep(0.03)
+
+    asyncio.run(run())
+    assert queued(client) == [[0, 1], [2]]
+
+
+def test_batched_payload_is_not_changed_by_later_signal_updates(make_client):
+    client = make_client(window_ms=10)
+    signal = {'n': 0}
+
+    async def run():
+        await client._send_signal({'service_type': 'onchain_screener', 'signals': [signal]})
+        signal['chain'] = 'eth'
+        await asyncio.sleep(0.03)
+
+    asyncio.run(run())
+    (_, payload), = client.outbox.due(float('inf'))
+    assert json.loads(payload)['signals'] == [{'n': 0}]
+
+
+def test_window_zero_sends_every_message_separately(make_client):
+    client = make_client(window_ms=0)
+
+    async def run():
+        for n in range(3):
+            await client._send_signal(message(n))
+
+    asyncio.run(run())
+    assert queued(client) == [[0], [1], [2]]
@@ -0,0 +1,92 @@
+"""
+Outbox delivery against a controller stand-in that drops connections at random:
+every signal must arrive, first deliveries in the order they were queued.
+Resends after a drop may duplicate a signal, the controller dedupes by msg_id.
+"""
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+import websockets
+
+import core.ws_client as ws_client
+from core.signal_outbox import SignalOutbox
+
+SIGNALS = 200
+
+
+class FlakyController:
+    """Acks every signal it reads, but sometimes drops the connection before or after reading one"""
+
+    def __init__(self, seed: int, drop_rate: float):
+        self.rng = random.Random(seed)
+        self.drop_rate = drop_rate
+        self.received: list[tuple[str, int]] = []
+        self.connections = 0
+        self.drops = 0
+
+    def _maybe_drop(self, ws) -> bool:
+        if self.rng.random() < self.drop_rate:
+            self.drops += 1
+            ws.transport.abort()
+            return True
+        return False
+
+    async def handler(self, ws):
+        self.connections += 1
+        async for message in ws:
+            # Dropped before reading: the signal is lost on the wire and must be resent
+            if self._maybe_drop(ws):
+                return
+            data = json.loads(message)
+            self.received.append((data['msg_id'], data['signals'][0]['n']))
+            # Dropped after reading but before the ack: the resend is a duplicate
+            if self._maybe_drop(ws):
+                return
+            await ws.send(json.dumps({'type': 'ack', 'msg_id': data['msg_id']}))
+
+
+async def _deliver(controller: FlakyController, outbox: SignalOutbox, monkeypatch) -> ws_client.WebsocketClient:
+    async with websockets.serve(controller.handler, '127.0.0.1', 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(ws_client, 'SIGNAL_WS_URL', f'ws://127.0.0.1:{port}')
+        monkeypatch.setattr(ws_client, 'SignalOutbox', lambda: outbox)
+        tg_client = SimpleNamespace(send_error_alert=lambda *args: asyncio.sleep(0))
+        client = ws_client.WebsocketClient(tg_client)
+        assert await client._connect()
+        tasks = [asyncio.create_task(client._connection_loop()), asyncio.create_task(client._sender_loop())]
+        try:
+            for n in range(SIGNALS):
+                client._put_to_outbox({'service_type': 'onchain_screener', 'signals': [{'n': n}]})
+                if n % 10 == 0:
+                    await asyncio.sleep(0.005)
+            async with asyncio.timeout(30):
+                while len(client.outbox):
+                    await asyncio.sleep(0.02)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if client.ws:
+                await client.ws.close()
+    return client
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_no_loss_and_in_order_with_random_drops(seed, tmp_path, monkeypatch):
+    monkeypatch.setattr(ws_client, 'SIGNAL_ACKS_ENABLED', True)
+    monkeypatch.setattr(ws_client, 'SIGNAL_ACK_TIMEOUT', 0.2)
+    monkeypatch.setattr(ws_client, 'RECONNECT_DELAY', 0.01)
+    monkeypatch.setattr(ws_client, 'RECONNECT_MAX_DELAY', 0.05)
+    controller = FlakyController(seed, drop_rate=0.05)
+    outbox = SignalOutbox(db_path=str(tmp_path / 'outbox.db'), ttl=60)
+
+    client = asyncio.run(_deliver(controller, outbox, monkeypatch))
+    outbox.close()
+
+    assert controller.drops > 0, "stand-in never dropped a connection, the test proves nothing"
+    assert client.reconnects == controller.connections - 1
+    first_seen = list(dict.fromkeys(controller.received))
+    assert [n for _, n in first_seen] == list(range(SIGNALS))
@@ -0,0 +1,147 @@
+"""
+Rate limited Telegram sender, one per chat.
+Requests wait in a priority queue and go out through a token bucket sized
+to Telegram limits (about 20 messages per minute in groups). RetryAfter
+pauses the chat for the requested time and the request is retried, not lost.
+During storms low priority alerts are collected into one digest message.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Optional
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from config import (
+    TG_GROUP_MESSAGES_PER_MINUTE, TG_PRIVATE_MESSAGES_PER_MINUTE, TG_BURST,
+    TG_DIGEST_BACKLOG, TG_DIGEST_INTERVAL,
+)
+from utils import get_logger
+
+PRIORITY_AUTO_OPEN = 0
+# Alerts of other tiers get 1.., highest tier first, see TelegramClient.alert_priority
+PRIORITY_NORMAL = 50
+PRIORITY_DIGEST = 100
+# Telegram message length limit
+MAX_MESSAGE_LENGTH = 4096
+
+
+class ChatSender:
+    def __init__(self, bot: Bot, chat_id: str):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.logger = get_logger("TG_SENDER")
+        # Group and channel ids are negative
+        per_minute = TG_GROUP_MESSAGES_PER_MINUTE if str(chat_id).startswith('-') else TG_PRIVATE_MESSAGES_PER_MINUTE
+        self._rate = per_minute / 60
+        self._tokens = float(TG_BURST)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        # (priority, seq, method, kwargs, future)
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._digest_lines: list[str] = []
+        self.sent = 0
+        self.retried = 0
+        self.digested = 0
+
+    @property
+    def backlog(self) -> int:
+        return len(self._queue)
+
+    @property
+    def congested(self) -> bool:
+        """Storm: requests pile up or Telegram asked us to back off"""
+        return self.backlog >= TG_DIGEST_BACKLOG or time.monotonic() < self._blocked_until
+
+    async def send(self, priority: int = PRIORITY_NORMAL, method: str = 'send_message', **kwargs) -> Optional[Any]:
+        """Queue a Bot API call for this chat and wait for its result. None if it failed."""
+        future = asyncio.get_running_loop().create_future()
+        self._push(priority, next(self._seq), method, kwargs, future)
+        return await future
+
+    def add_to_digest(self, line: str):
+        """Collect a low priority alert line, sent with others as one message after TG_DIGEST_INTERVAL"""
+        if not self._digest_lines:
+            asyncio.get_running_loop().call_later(TG_DIGEST_INTERVAL, self._queue_digest)
+        self._digest_lines.append(line)
+        self.digested += 1
+
+    def _queue_digest(self):
+        future = asyncio.get_running_loop().create_future()
+        # Lines keep accumulating until the digest is actually sent
+        self._push(PRIORITY_DIGEST, next(self._seq), 'digest', {}, future)
+
+    def _push(self, priority: int, seq: int, method: str, kwargs: dict, future: asyncio.Future):
+        heapq.heappush(self._queue, (priority, seq, method, kwargs, future))
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._worker_loop())
+
+    def _digest_kwargs(self) -> Optional[dict]:
+        lines, self._digest_lines = self._digest_lines, []
+        if not lines:
+            return None
+        text = ""
+        count = 0
+        for line in lines:
+            if count and len(text) + len(line) + 1 > MAX_MESSAGE_LENGTH - 64:
+                break
+            text += line + "\n"
+            count += 1
+        overflow = lines[count:]
+        if overflow:
+            # Lines that did not fit go out in the next digest, queued right away
+            self._digest_lines = overflow + self._digest_lines
+            self._queue_digest()
+            header = f"*Digest:* {count} alerts, {len(overflow)} more follow\n\n"
+        else:
+            header = f"*Digest:* {count} alerts\n\n"
+        return {'text': header + text, 'parse_mode': "Markdown", 'disable_web_page_preview': True}
+
+    async def _acquire_token(self):
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            self._tokens = min(TG_BURST, self._tokens + (now - self._refilled_at) * self._rate)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def _worker_loop(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._acquire_token()
+            priority, seq, method, kwargs, future = heapq.heappop(self._queue)
+            if method == 'digest':
+                kwargs = self._digest_kwargs()
+                if kwargs is None:
+                    future.set_result(None)
+                    continue
+                method = 'send_message'
+            try:
+                result = await getattr(self.bot, method)(chat_id=self.chat_id, **kwargs)
+            except TelegramRetryAfter as e:
+                self._blocked_until = time.monotonic() + e.retry_after
+                self.retried += 1
+                self.logger.warning(f"Chat {self.chat_id} rate limited, retrying in {e.retry_after}s ({self.backlog + 1} queued)")
+                # Same seq keeps its place among requests of the same priority. A digest is retried as built.
+                heapq.heappush(self._queue, (priority, seq, method, kwargs, future))
+                continue
+            except Exception as e:
+                self.logger.error(f"Error calling {method} for chat {self.chat_id}: {e}")
+                if not future.done():
+                    future.set_result(None)
+                continue
+            self.sent += 1
+            if not future.done():
+                future.set_result(result)
@@ -15,26 +15,31 @@ BINANCE_URL = "https://www.binance.com/ru/futures/"
 OKX_URL = "https://www.okx.com/ru/trade-swap/"
 KUCOIN_URL = "https://www.kucoin.com/trade/futures/"
 
-def futures_link_map(exchange_slug:str, ticker:str): 
-    link_map = {
-        'mexc': MEXC_URL+ticker.upper()+"_USDT",
-        'bybit': BYBIT_URL+ticker.upper()+"USDT",
-        'bitget': BITGET_URL+ticker.upper()+"USDT",
-        'gate': GATE_URL+ticker.upper()+"_USDT",
-        'binance': BINANCE_URL+ticker.upper()+"USDT",
-        'okx': OKX_URL+ticker.upper()+"-USDT-SWAP",
-        'kucoin': KUCOIN_URL+ticker.upper()+"USDTM"
-    }
-    emoji_map = {
-        'mexc': '🔵',
-        'bybit': '🟠',
-        'bitget': '🟢',
-        'gate': '⚪',
-        'binance': '🟡',
-        'okx': '⚫',
-        'kucoin': '🟤'
+# exchange slug: (url prefix, pair suffix appended to the upper-case ticker)
+FUTURES_URLS = {
+    'mexc': (MEXC_URL, "_USDT"),
+    'bybit': (BYBIT_URL, "USDT"),
+    'bitget': (BITGET_URL, "USDT"),
+    'gate': (GATE_URL, "_USDT"),
+    'binance': (BINANCE_URL, "USDT"),
+    'okx': (OKX_URL, "-USDT-SWAP"),
+    'kucoin': (KUCOIN_URL, "USDTM"),
+}
+FUTURES_EMOJI = {
+    'mexc': '🔵',
+    'bybit': '🟠',
+    'bitget': '🟢',
+    'gate': '⚪',
+    'binance': '🟡',
+    'okx': '⚫',
+    'kucoin': '🟤',
+}
 
-    }
-    return link_map.get(exchange_slug, ''), emoji_map.get(exchange_slug, '')
+def futures_link_map(exchange_slug:str, ticker:str): 
+    url = FUTURES_URLS.get(exchange_slug)
+    if url is None:
+        return '', ''
+    prefix, suffix = url
+    return prefix + ticker.upper() + suffix, FUTURES_EMOJI[exchange_slug]
 
 OKX_DEX_URL = "https://web3.okx.com/ru/token/"
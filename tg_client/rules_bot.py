@@ -6,13 +6,15 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.fsm.storage.memory import MemoryStorage
 from typing import Callable, Optional
 from web3 import AsyncWeb3
-from config import MANAGER_TG_BOT_TOKEN, MANAGER_TG_BOT_IDS, RPC, CHAIN_NAMES, BANNED_PATH, SUPPLY_DATA_PATH
-from utils import get_logger
+from config import MANAGER_TG_BOT_TOKEN, MANAGER_TG_BOT_IDS, RPC, CHAIN_NAMES
+from utils import get_logger, get_banned_registry, get_token_registry
 import asyncio
-import json
 
 logger = get_logger("RULES_BOT")
 
+HISTORY_DEFAULT_LIMIT = 10
+HISTORY_MAX_LIMIT = 50
+
 ERC20_ABI = [{"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]
 
 
@@ -91,14 +93,18 @@ class RulesBot:
         self,
         rules_manager,
         update_callback: Callable,
+        signal_history=None,
         bot_token: str = MANAGER_TG_BOT_TOKEN,
         chat_ids: list = MANAGER_TG_BOT_IDS,
     ):
         self.rules_manager = rules_manager
         self.update_callback = update_callback
+        self.signal_history = signal_history
         self.bot_token = bot_token
         self.chat_ids = chat_ids
         self.enabled = bool(bot_token and chat_ids)
+        self.banned_registry = get_banned_registry()
+        self.token_registry = get_token_registry()
         
         if not self.enabled:
             logger.warning("Rules bot disabled (no API key configured)")
@@ -126,133 +132,76 @@ class RulesBot:
             BotCommand(command="ban_token", description="Ban a token contract"),
             BotCommand(command="unban_token", description="Unban a token contract"),
             BotCommand(command="banned_list", description="Show banned tokens"),
+            BotCommand(command="history", description="Last signals for a token"),
             BotCommand(command="cancel", description="Cancel current operation"),
             BotCommand(command="help", description="Show help"),
         ]
         await self.bot.set_my_commands(commands)
 
     def _load_banned_list(self) -> dict:
-        try:
-            with open(BANNED_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return {}
-                return data
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
-
-    def _save_banned_list(self, banned_dict: dict):
-        with open(BANNED_PATH, 'w', encoding='utf-8') as f:
-            json.dump(banned_dict, f, indent=4)
+        return self.banned_registry.get_all()
 
     def _add_to_banned(self, token_address: str) -> tuple:
         """Add token to banned list with full data. Returns (success, token_data_dict, chains_list)."""
-        banned_dict = self._load_banned_list()
-        if token_address in banned_dict:
+        if self.banned_registry.is_banned(token_address):
             return False, {}, []
         
         token_info, chains = self._get_token_data_from_supply(token_address)
-        banned_dict[token_address] = {
+        self.banned_registry.ban(token_address, {
             "token_data": token_info,
             "chains": chains
-        }
-        self._save_banned_list(banned_dict)
+        })
         return True, token_info, chains
 
     def _remove_from_banned(self, token_address: str) -> bool:
-        """Remove token from banned list and restore to token_data.json."""
-        banned_dict = self._load_banned_list()
-        if token_address not in banned_dict:
+        """Remove token from banned list and restore it to token data."""
+        banned_entry = self.banned_registry.unban(token_address)
+        if banned_entry is None:
             return False
         
-        banned_entry = banned_dict[token_address]
         token_info = banned_entry.get("token_data", {})
         chains = banned_entry.get("chains", [])
         
         if token_info and chains:
             self._restore_to_token_data(token_address, token_info, chains)
-        
-        del banned_dict[token_address]
-        self._save_banned_list(banned_dict)
         return True
 
     def _is_banned(self, token_address: str) -> bool:
-        banned_dict = self._load_banned_list()
-        return token_address in banned_dict
+        return self.banned_registry.is_banned(token_address)
 
     def _get_token_data_from_supply(self, token_address: str) -> tuple:
-        """Get token data from token_data.json. Returns (token_info_dict, chains_list)."""
-        try:
-            with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list) or len(data) != 2:
-                return {}, []
-            
-            timestamp, token_data = data
-            token_info = {}
-            chains = []
-            
-            for chain_name in token_data.keys():
-                if token_address in token_data[chain_name]:
-                    if not token_info:
-                        token_info = token_data[chain_name][token_address].copy()
-                    chains.append(chain_name)
-            
-            return token_info, chains
-        except Exception as e:
-            logger.error(f"Error getting token data: {e}")
+        """Get token data from the token registry. Returns (token_info_dict, chains_list)."""
+        matches = self.token_registry.find(token_address)
+        if not matches:
             return {}, []
+        token_info = matches[0][2].copy()
+        chains = [chain_name for chain_name, _, _ in matches]
+        return token_info, chains
 
     def _remove_from_token_data(self, token_address: str) -> int:
-        """Remove token from token_data.json across all chains. Returns count of removals."""
+        """Remove token from token data across all chains. Returns count of removals."""
         try:
-            with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list) or len(data) != 2:
-                return 0
-            
-            timestamp, token_data = data
-            removed_count = 0
-            
-            for chain_name in list(token_data.keys()):
-                if token_address in token_data[chain_name]:
-                    del token_data[chain_name][token_address]
-                    removed_count += 1
-                    logger.info(f"Removed {token_address} from {chain_name} in token_data.json")
-            
-            if removed_count > 0:
-                with open(SUPPLY_DATA_PATH, 'w', encoding='utf-8') as f:
-                    json.dump([timestamp, token_data], f, indent=4)
-            
-            return removed_count
+            chains = self.token_registry.remove_token(token_address)
+            for chain_name in chains:
+                logger.info(f"Removed {token_address} from {chain_name} in token data")
+            if chains:
+                self.token_registry.save()
+            return len(chains)
         except Exception as e:
-            logger.error(f"Error removing token from token_data.json: {e}")
+            logger.error(f"Error removing token from token data: {e}")
             return 0
 
     def _restore_to_token_data(self, token_address: str, token_info: dict, chains: list) -> bool:
-        """Restore token to token_data.json for specified chains."""
+        """Restore token to token data for specified chains."""
         try:
-            with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if not isinstance(data, list) or len(data) != 2:
-                return False
-            
-            timestamp, token_data = data
-            
             for chain_name in chains:
-                if chain_name in token_data:
-                    token_data[chain_name][token_address] = token_info.copy()
-                    logger.info(f"Restored {token_address} to {chain_name} in token_data.json")
-            
-            with open(SUPPLY_DATA_PATH, 'w', encoding='utf-8') as f:
-                json.dump([timestamp, token_data], f, indent=4)
-            
+                if chain_name in self.token_registry.data:
+                    self.token_registry.set_token(chain_name, token_address, token_info.copy())
+                    logger.info(f"Restored {token_address} to {chain_name} in token data")
+            self.token_registry.save()
             return True
         except Exception as e:
-            logger.error(f"Error restoring token to token_data.json: {e}")
+            logger.error(f"Error restoring token to token data: {e}")
             return False
 
     async def _get_decimals(self, token_address: str, chain_name: str) -> Optional[int]:
@@ -506,6 +455,25 @@ class RulesBot:
             await state.clear()
             await self._show_banned_list(message, edit=False)
 
+        # ===== SIGNAL HISTORY =====
+        @self.router.message(Command("history"))
+        async def cmd_history(message: Message, state: FSMContext):
+            if str(message.chat.id) not in self.chat_ids:
+                return
+            await state.clear()
+            args = (message.text or "").split()[1:]
+            if not args:
+                await message.answer("Usage: `/history <ticker|address> [count]`", parse_mode="Markdown")
+                return
+            if not self.signal_history:
+                await message.answer("❌ Signal history is not available", reply_markup=get_back_to_menu_keyboard())
+                return
+            limit = HISTORY_DEFAULT_LIMIT
+            if len(args) > 1 and args[1].isdigit():
+                limit = min(int(args[1]), HISTORY_MAX_LIMIT)
+            signals = await self.signal_history.alast_for_token(args[0], limit)
+            await message.answer(self._format_history(args[0], signals), parse_mode="MarkdownV2", reply_markup=get_back_to_menu_keyboard())
+
         # ===== ADD RULE =====
         @self.router.message(Command("add_rule"))
         async def cmd_add_rule(message: Message, state: FSMContext):
@@ -1016,13 +984,33 @@ class RulesBot:
             
             await state.clear()
 
+    def _format_history(self, token: str, signals: list) -> str:
+        """MarkdownV2 text, event types like usd_based_transfer and user input are escaped"""
+        if not signals:
+            return f"📭 No signals found for `{self._escape_md_code(token)}`"
+        text = f"*🕓 Last {len(signals)} signals for* `{self._escape_md_code(token)}`\n\n"
+        for signal in signals:
+            saved_at = (signal.get('saved_at') or '')[:16].replace('T', ' ')
+            usd_amount = signal.get('usd_amount')
+            usd_display = f" ${usd_amount:,.0f}" if isinstance(usd_amount, (int, float)) and usd_amount else ""
+            text += (
+                f"`{self._escape_md_code(saved_at)}` {self._escape_md((signal.get('chain') or '').upper())} "
+                f"`{self._escape_md_code(str(signal.get('ticker')))}` {self._escape_md(str(signal.get('event_type')))}"
+                f"{self._escape_md(usd_display)}{' ⚡' if signal.get('auto_open') else ''}\n"
+            )
+        return text
+
     def _escape_md(self, text: str) -> str:
         """Escape special Markdown characters."""
-        chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
+        chars = ['\\', '_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
         for char in chars:
             text = text.replace(char, f'\\{char}')
         return text
 
+    def _escape_md_code(self, text: str) -> str:
+        """Escape text placed inside a MarkdownV2 code span"""
+        return text.replace('\\', '\\\\').replace('`', '\\`')
+
     async def _show_rules_page(self, message: Message, page: int, edit: bool = False):
         rules_list = self.rules_manager.get_all_rules_flat()
         if not rules_list:
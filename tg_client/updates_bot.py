@@ -5,21 +5,92 @@ Sends messages to Telegram if API credentials are configured, otherwise skips si
 from aiogram import Bot
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from parser import SupplyParser
-from utils import get_logger
+from utils import get_logger, get_metrics
 from typing import Optional
-from config import ALERT_TG_BOT_TOKEN, TECH_ALERTS_CHAT_ID, USER_ALERTS_CHAT_ID
+from config import (
+    ALERT_TG_BOT_TOKEN, TECH_ALERTS_CHAT_ID, USER_ALERTS_CHAT_ID, FILTER_CONFIG,
+    QUOTE_STALE_SECONDS, QUOTE_FOLLOWUP_EDIT, STATUS_UPDATE_INTERVAL,
+)
 from .consts import ARKHAM_URL, DEXSCREENER_BASE_URL, SCAN_URL, OKX_DEX_URL, futures_link_map
+from .chat_sender import ChatSender, PRIORITY_AUTO_OPEN, PRIORITY_NORMAL
 import asyncio
+import time
 from datetime import datetime
 import re
 from utils import Gecko
 
 
+# Characters that need to be escaped in Markdown
+# Templates built between yields to the event loop when precomputing
+TEMPLATE_PRECOMPUTE_BATCH = 500
+_MARKDOWN_SPECIAL = re.compile(f"([{re.escape(r'_*[]()~`>#+-=|{}.!')}])")
+
+
 def escape_markdown(text: str) -> str:
     """Escape special characters for Telegram Markdown"""
-    # Characters that need to be escaped in Markdown
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    return re.sub(f'([{re.escape(escape_chars)}])', r'\\\1', str(text))
+    return _MARKDOWN_SPECIAL.sub(r'\\\1', str(text))
+
+
+def format_mcap(value: float) -> str:
+    if not value:
+        return "0"
+    if value >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.1f}b"
+    return f"{value / 1_000_000:.1f}m"
+
+
+def format_volume(value: float) -> str:
+    if not value:
+        return "0"
+    if value >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.1f}b"
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}m"
+    return f"{value / 1_000:.1f}k"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 86400:
+        return f"{seconds // 86400}d {seconds % 86400 // 3600}h"
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    return f"{seconds // 60}m {seconds % 60}s"
+
+
+def format_address_with_name(address: str, names_map: dict) -> str:
+    short_addr = f"{address[:6]}...{address[-4:]}" if len(address) > 10 else address
+    address_url = f"{ARKHAM_URL}address/{address}"
+    name = names_map.get(address) or names_map.get(address.lower())
+    if name:
+        return f"*{name}* ([{short_addr}]({address_url}))"
+    return f"[{short_addr}]({address_url})"
+
+
+class AlertTemplate:
+    """Parts of an alert that depend only on the token: escaped title, static footer lines and keyboard"""
+    __slots__ = ('title', 'footer', 'keyboard')
+
+    def __init__(self, chain: str, contract: str, ticker: str, supported_futures: list):
+        self.title = f"`{escape_markdown(ticker).upper()}` | {escape_markdown(chain.upper())}\n\n"
+        self.footer = (
+            f"*Chain name:* {chain.upper()}\n"
+            f"*Ticker:* `{ticker.upper()}`\n"
+            f"*Contract:* `{contract}`\n"
+        )
+        # First row: DexScreener and DEX, then supported futures in rows of 2
+        keyboard_rows = [[
+            InlineKeyboardButton(text="📊 DexScreener", url=f"{DEXSCREENER_BASE_URL}/{chain}/{contract}"),
+            InlineKeyboardButton(text="🦄 DEX", url=f"{OKX_DEX_URL}{chain}/{contract}")
+        ]]
+        futures_buttons = []
+        for exchange_slug in supported_futures or []:
+            url, emoji = futures_link_map(exchange_slug, ticker)
+            if url and emoji:
+                futures_buttons.append(InlineKeyboardButton(text=f"{emoji} {exchange_slug.upper()}", url=url))
+        for i in range(0, len(futures_buttons), 2):
+            keyboard_rows.append(futures_buttons[i:i + 2])
+        self.keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
 
 
 class TelegramClient:
@@ -40,6 +111,18 @@ class TelegramClient:
         self._status_monitor_task = None
         self.gecko = Gecko()
         self.supply_parser = supply_parser
+        self._senders: dict[str, ChatSender] = {}
+        # (chain, contract, ticker) -> AlertTemplate, valid for one token metadata version
+        self._templates: dict[tuple, AlertTemplate] = {}
+        self._templates_version = -1
+        self._precompute_task: Optional[asyncio.Task] = None
+        # Follow-up quote edits, referenced until done so they are not garbage collected
+        self._background_tasks: set[asyncio.Task] = set()
+        self.metrics = get_metrics()
+        self.metrics.gauge('queue_telegram', fn=lambda: sum(sender.backlog for sender in self._senders.values()))
+        self._quote_hits = self.metrics.counter('quote_cache', 'hit')
+        self._quote_stale = self.metrics.counter('quote_cache', 'stale')
+        self._quote_misses = self.metrics.counter('quote_cache', 'miss')
 
         if self.enabled:
             self.bot = Bot(token=self.bot_token)
@@ -48,6 +131,32 @@ class TelegramClient:
             self.bot = None
             self.logger.info("Telegram notifications disabled (no API key configured)")
     
+    def _sender(self, chat_id: str) -> ChatSender:
+        sender = self._senders.get(chat_id)
+        if sender is None:
+            sender = self._senders[chat_id] = ChatSender(self.bot, chat_id)
+        return sender
+
+    @staticmethod
+    def _tier_rank(signal: dict) -> tuple[int, int]:
+        """(rank from the top, tier count) of the signal tier within its FILTER_CONFIG event"""
+        tiers = [config.get('message_tier') for config in FILTER_CONFIG.get(signal.get('event_type'), [])]
+        if signal.get('message_tier') not in tiers:
+            return 0, len(tiers)
+        return len(tiers) - 1 - tiers.index(signal.get('message_tier')), len(tiers)
+
+    def alert_priority(self, signal: dict) -> int:
+        """Lower goes first: auto-open, then tiers from the highest down"""
+        if signal.get('auto_open'):
+            return PRIORITY_AUTO_OPEN
+        return 1 + self._tier_rank(signal)[0]
+
+    def _is_low_tier(self, signal: dict) -> bool:
+        if signal.get('auto_open'):
+            return False
+        rank, tier_count = self._tier_rank(signal)
+        return tier_count > 1 and rank == tier_count - 1
+
     async def close(self):
         if self._status_monitor_task:
             self._status_monitor_task.cancel()
@@ -55,82 +164,89 @@ class TelegramClient:
                 await self._status_monitor_task
             except asyncio.CancelledError:
                 pass
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._precompute_task:
+            self._precompute_task.cancel()
         
         if self.enabled and self.bot:
             await self.bot.session.close()
             self.logger.debug("Bot session closed")
 
-    async def send_alert(
-        self,
-        signal:dict 
-    ):
+    def _alert_template(self, chain: str, contract: str, ticker: str, supported_futures: list) -> AlertTemplate:
         """
-        {   
-            "chain": chain,
-            "direction": trade_direction,
-            "ticker": ticker,
-            "contract": token_address,
-            "event_type": event_type,
-            "supply_percent": supply_percent_in_action,
-            "auto_open": auto_open, 
-            "message_tier": message_tier,
-            "from_addresses": [list of addresses],
-            "to_addresses": [list of addresses],
-            "filter_matches": {"from": [names], "to": [names]}
-        }
+        Precomputed per tracked token, see schedule_template_precompute. Tokens that are not
+        tracked (custom rules) and alerts arriving before a rebuild finished build theirs here.
         """
-        def format_mcap(value: float) -> str:
-            if not value:
-                return "0"
-            if value >= 1_000_000_000:
-                return f"{value / 1_000_000_000:.1f}b"
-            return f"{value / 1_000_000:.1f}m"
-
-        def format_volume(value: float) -> str:
-            if not value:
-                return "0"
-            if value >= 1_000_000_000:
-                return f"{value / 1_000_000_000:.1f}b"
-            if value >= 1_000_000:
-                return f"{value / 1_000_000:.1f}m"
-            return f"{value / 1_000:.1f}k"
+        registry_version = self.supply_parser.token_registry.metadata_version if self.supply_parser else 0
+        if registry_version != self._templates_version:
+            self._templates = {}
+            self._templates_version = registry_version
+        key = (chain, contract, ticker)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = AlertTemplate(chain, contract, ticker, supported_futures)
+        return template
 
-        if not self.enabled:
-            return False
+    def schedule_template_precompute(self):
+        """Rebuild alert templates of every tracked token in the background if token metadata changed"""
+        if self.supply_parser and (self._precompute_task is None or self._precompute_task.done()):
+            self._precompute_task = asyncio.create_task(self._precompute_alert_templates())
 
-        #token_data = await self.gecko.get_token_data_for_message(signal['chain'].upper(), signal['contract'])
-        # price = token_data.get('price', 0)
+    async def _precompute_alert_templates(self):
+        registry = self.supply_parser.token_registry
+        precomputed_version = -1
+        while registry.metadata_version != precomputed_version:
+            version = registry.metadata_version
+            t1 = time.perf_counter()
+            tokens = [
+                (chain_name.lower(), address, token_info.get('ticker', ''), token_info.get('supported_futures', []))
+                for chain_name, chain_data in registry.data.items()
+                for address, token_info in chain_data.items()
+            ]
+            templates = {}
+            for i, (chain, contract, ticker, supported_futures) in enumerate(tokens, 1):
+                templates[(chain, contract, ticker)] = AlertTemplate(chain, contract, ticker, supported_futures)
+                if i % TEMPLATE_PRECOMPUTE_BATCH == 0:
+                    await asyncio.sleep(0)
+                    if registry.metadata_version != version:
+                        break
+            if registry.metadata_version != version:
+                # Changed while building, start over with the new data
+                continue
+            if self._templates_version == version:
+                # Keep templates built on demand meanwhile, custom rule tokens are only built there
+                templates = {**self._templates, **templates}
+            self._templates, self._templates_version = templates, version
+            precomputed_version = version
+            self.logger.info(f"Precomputed {len(tokens)} alert templates in {time.perf_counter() - t1:.2f}s")
+
+    def _format_alert(self, signal: dict, token_data: dict, supported_futures: list) -> tuple[str, InlineKeyboardMarkup]:
+        """
+        Alert text and keyboard for a signal, token_data holds price/market_cap/volume_24h.
+        Without market_cap/volume_24h (no cached quote yet) MCap and Volume show as "…".
+        """
         ticker = signal.get('ticker', '')
         chain = signal.get('chain', '')
         contract = signal.get('contract', '')
+        template = self._alert_template(chain, contract, ticker, supported_futures)
 
-        cached_token_data = self.supply_parser.main_token_data.get(chain.upper(), {}).get(contract, {})
-        supported_futures = cached_token_data.get('supported_futures', [])
-        cmc_id = cached_token_data.get('cmc_id')
-        
-        # Get fresh price/mcap/volume from CMC using cmc_id
-        if cmc_id:
-            token_data = await self.supply_parser._get_cmc_quote_by_id(cmc_id)
-        else:
-            token_data = {}
-        
         mcap = token_data.get('market_cap', 0)
         if not mcap: 
             mcap = token_data.get("fully_diluted_market_cap", 0)
         price = token_data.get('price', 0)
         volume = token_data.get('volume_24h', 0)
+        has_quote = 'market_cap' in token_data or 'volume_24h' in token_data
 
         direction = signal.get('direction', '')
         event_type = signal.get('event_type', '')
         supply_percent = signal.get('supply_percent', 0) * 100
         tx_url = f"{ARKHAM_URL}tx/{signal.get('tx_hash', '')}"
-        dexscreener_url = f"{DEXSCREENER_BASE_URL}/{chain}/{signal.get('contract', '')}"
 
         arrow = "BUY ↗️" if direction.lower() == "long" else "SELL ↘️"
         message_tier = signal.get('message_tier', '')
         
-        message = ""
-        message += f"*{escape_markdown(message_tier)}* | `{escape_markdown(ticker).upper()}` | {escape_markdown(chain.upper())}\n\n"
+        message = f"*{escape_markdown(message_tier)}* | {template.title}"
         match event_type: 
             case "hidden_binance_alpha":
                 usd_value = signal.get('usd_amount', 0)
@@ -149,14 +265,6 @@ class TelegramClient:
                 message += f"*Event:* {supply_percent:.2f}% circ. supply *{escape_markdown(event_type).lower()}ed*\n" 
                 message += f"*Trade:* {arrow}\n\n"
         
-        def format_address_with_name(address: str, names_map: dict) -> str:
-            short_addr = f"{address[:6]}...{address[-4:]}" if len(address) > 10 else address
-            address_url = f"{ARKHAM_URL}address/{address}"
-            name = names_map.get(address) or names_map.get(address.lower())
-            if name:
-                return f"*{name}* ([{short_addr}]({address_url}))"
-            return f"[{short_addr}]({address_url})"
-        
         from_addresses = signal.get('from_addresses', [])
         to_addresses = signal.get('to_addresses', [])
         filter_matches = signal.get('filter_matches', {})
@@ -180,53 +288,97 @@ class TelegramClient:
             message += "\n"
         
         message += f"*Price:* ${price:.5f}\n"
-        message += f"*MCap:* ${format_mcap(mcap)}\n"
-        message += f"*Volume 24h:* ${format_volume(volume)}\n\n"
-        message += f"*Chain name:* {chain.upper()}\n"
-        message += f"*Ticker:* `{ticker.upper()}`\n"
-        message += f"*Contract:* `{signal.get('contract', '')}`\n"
+        message += f"*MCap:* ${format_mcap(mcap)}\n" if has_quote else "*MCap:* …\n"
+        message += f"*Volume 24h:* ${format_volume(volume)}\n\n" if has_quote else "*Volume 24h:* …\n\n"
+        message += template.footer
         message += f"*Transaction:* [open link]({tx_url})\n\n"
+        return message, template.keyboard
 
-        # Build keyboard dynamically based on supported futures
-        keyboard_rows = []
-        
-        # First row: DexScreener and DEX
-        dex_url =f"{OKX_DEX_URL}{chain}/{contract}"
-        first_row = [
-            InlineKeyboardButton(text="📊 DexScreener", url=dexscreener_url),
-            InlineKeyboardButton(text="🦄 DEX", url=dex_url)
-        ]
-        keyboard_rows.append(first_row)
-        
-        # Build futures buttons from supported_futures list
-        if supported_futures:
-            futures_buttons = []
-            for exchange_slug in supported_futures:
-                url, emoji = futures_link_map(exchange_slug, ticker)
-                if url and emoji:
-                    button_text = f"{emoji} {exchange_slug.upper()}"
-                    futures_buttons.append(InlineKeyboardButton(text=button_text, url=url))
-            
-            # Split futures buttons into rows of 2
-            for i in range(0, len(futures_buttons), 2):
-                row = futures_buttons[i:i+2]
-                keyboard_rows.append(row)
-        
-        keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_rows)
+    async def send_alert(
+        self,
+        signal:dict 
+    ):
+        """
+        {   
+            "chain": chain,
+            "direction": trade_direction,
+            "ticker": ticker,
+            "contract": token_address,
+            "event_type": event_type,
+            "supply_percent": supply_percent_in_action,
+            "auto_open": auto_open, 
+            "message_tier": message_tier,
+            "from_addresses": [list of addresses],
+            "to_addresses": [list of addresses],
+            "filter_matches": {"from": [names], "to": [names]}
+        }
+        """
+        if not self.enabled:
+            return False
 
-        try:
-            sent_message = await self.bot.send_message(
-                chat_id=self.user_alerts,
-                text=message,
-                parse_mode="Markdown",
-                reply_markup=keyboard,
-                disable_web_page_preview=True
+        ticker = signal.get('ticker', '')
+        chain = signal.get('chain', '')
+        contract = signal.get('contract', '')
+
+        sender = self._sender(self.user_alerts)
+        if sender.congested and self._is_low_tier(signal):
+            # Storm: keep the chat for higher tiers, this alert goes out in a digest
+            sender.add_to_digest(
+                f"{escape_markdown(signal.get('message_tier', '').strip())} | `{escape_markdown(ticker).upper()}` | "
+                f"{escape_markdown(chain.upper())} | {escape_markdown(signal.get('event_type', ''))} | "
+                f"[tx]({ARKHAM_URL}tx/{signal.get('tx_hash', '')})"
             )
-            self.logger.info(f"Alert sent for {ticker}")
-            return sent_message.message_id
-        except Exception as e:
-            self.logger.error(f"Error sending alert: {e}")
+            self.logger.info(f"Alert for {ticker} added to digest")
+            return None
+
+        cached_token_data = self.supply_parser.token_registry.get(chain.upper(), contract) or {}
+        supported_futures = cached_token_data.get('supported_futures', [])
+        cmc_id = cached_token_data.get('cmc_id')
+        
+        # Quotes come from the background price refresher, alerts never wait on CMC
+        quote = self.supply_parser.get_cached_quote(cmc_id) if cmc_id else None
+        stale = quote is None or time.time() - quote['updated_at'] > QUOTE_STALE_SECONDS
+        if quote is None:
+            self._quote_misses.inc()
+        elif stale:
+            self._quote_stale.inc()
+        else:
+            self._quote_hits.inc()
+        token_data = quote or {'price': cached_token_data.get('last_price') or 0}
+        message, keyboard = self._format_alert(signal, token_data, supported_futures)
+
+        sent_message = await sender.send(
+            self.alert_priority(signal),
+            text=message,
+            parse_mode="Markdown",
+            reply_markup=keyboard,
+            disable_web_page_preview=True
+        )
+        if sent_message is None:
+            self.logger.error(f"Error sending alert for {ticker}")
             return None
+        self.logger.info(f"Alert sent for {ticker}")
+        if stale and cmc_id and QUOTE_FOLLOWUP_EDIT:
+            task = asyncio.create_task(self._update_alert_quote(sent_message.message_id, signal, cmc_id, supported_futures))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        return sent_message.message_id
+
+    async def _update_alert_quote(self, message_id: int, signal: dict, cmc_id: int, supported_futures: list):
+        """Edit an alert sent with a stale or missing quote once a fresh one is fetched"""
+        quote = await self.supply_parser.fetch_quote(cmc_id)
+        if not quote:
+            return
+        message, keyboard = self._format_alert(signal, quote, supported_futures)
+        await self._sender(self.user_alerts).send(
+            PRIORITY_NORMAL,
+            method='edit_message_text',
+            message_id=message_id,
+            text=message,
+            parse_mode="Markdown",
+            reply_markup=keyboard,
+            disable_web_page_preview=True
+        )
     
     
     async def reply_price_drop(
@@ -258,19 +410,18 @@ class TelegramClient:
         message += f"*Current:* ${new_price:.6f}\n"
         message += f"*Change:* {drop_percent:.2f}%"
         
-        try:
-            await self.bot.send_message(
-                chat_id=self.user_alerts,
-                text=message,
-                parse_mode="Markdown",
-                reply_to_message_id=message_id,
-                disable_web_page_preview=True
-            )
-            self.logger.info(f"Price drop reply sent for {ticker}: {drop_percent:.2f}%")
-            return True
-        except Exception as e:
-            self.logger.error(f"Error sending price drop reply: {e}")
+        sent_message = await self._sender(self.user_alerts).send(
+            PRIORITY_NORMAL,
+            text=message,
+            parse_mode="Markdown",
+            reply_to_message_id=message_id,
+            disable_web_page_preview=True
+        )
+        if sent_message is None:
+            self.logger.error(f"Error sending price drop reply for {ticker}")
             return False
+        self.logger.info(f"Price drop reply sent for {ticker}: {drop_percent:.2f}%")
+        return True
 
     async def send_message(
         self, 
@@ -292,20 +443,16 @@ class TelegramClient:
         if not self.enabled:
             return False
         
-        try:
-            
-            await self.bot.send_message(
-                chat_id=self.tech_alerts,
-                text=message,
-                parse_mode=parse_mode,
-                disable_notification=disable_notification
-            )
-            self.logger.debug("Message sent successfully")
-            return True
-                        
-        except Exception as e:
-            self.logger.error(f"Error sending message: {e}")
+        sent_message = await self._sender(self.tech_alerts).send(
+            PRIORITY_NORMAL,
+            text=message,
+            parse_mode=parse_mode,
+            disable_notification=disable_notification
+        )
+        if sent_message is None:
             return False
+        self.logger.debug("Message sent successfully")
+        return True
     
     
     async def send_error_alert(
@@ -356,23 +503,20 @@ class TelegramClient:
         
         try:
             # Send initial message
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            message = "*Monitoring Bot Started*\n\n"
-            message += f"*Active Chains:*\n\n"
-            for chain in chains:
-                message += f"  • {chain}\n"
-            message += f"\n_Monitoring for events_\n"
-            message += f"\n*Last Update:* `{current_time}`"
+            self.metrics.sample()
+            message = self._status_message(chains)
             
-            sent_message = await self.bot.send_message(
-                chat_id=self.tech_alerts,
+            sent_message = await self._sender(self.tech_alerts).send(
+                PRIORITY_NORMAL,
                 text=message,
                 parse_mode="Markdown"
             )
+            if sent_message is None:
+                return False
             self._status_message_id = sent_message.message_id
             self.logger.info("Status monitor message sent")
             
-            # Start background task to update message every 20 seconds
+            # Start background task to update message every STATUS_UPDATE_INTERVAL seconds
             self._status_monitor_task = asyncio.create_task(
                 self._update_status_loop(chains)
             )
@@ -383,33 +527,94 @@ class TelegramClient:
             self.logger.error(f"Error starting status monitor: {e}")
             return False
     
+    def _status_message(self, chains: list[str]) -> str:
+        """Status header with the operations panel, rates are over the last update interval"""
+        metrics = self.metrics
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        def value(name: str, label: str = '') -> float:
+            metric = metrics.counters.get((name, label)) or metrics.gauges.get((name, label))
+            return metric.value if metric else 0
+
+        def share(part: float, total: float) -> str:
+            return f"{part / total * 100:.1f}%" if total else "-"
+
+        def latency(name: str) -> str:
+            histogram = metrics.histograms.get((name, ''))
+            percentiles = histogram.percentiles(50, 95, 99) if histogram else None
+            if percentiles is None:
+                return "-"
+            return " ".join(f"{label} {value:.0f}" for label, value in zip(("p50", "p95", "p99"), percentiles))
+
+        lines = [f"{'chain':<10}{'lag':>5}{'blk/s':>7}{'logs/s':>8}{'ev/s':>7}{'rpc err':>9}"]
+        for chain in chains:
+            lines.append(
+                f"{chain[:10]:<10}{value('head_lag', chain):>5.0f}{metrics.rate('blocks', chain):>7.2f}"
+                f"{metrics.rate('logs', chain):>8.1f}{metrics.rate('candidate_events', chain):>7.2f}"
+                f"{share(metrics.rate('rpc_errors', chain), metrics.rate('rpc_calls', chain)):>9}"
+            )
+        lines.append("")
+        lines.append(f"alert ms   {latency('alert_latency_ms')}")
+        lines.append(f"detect ms  {latency('detect_ms')}")
+        lines.append(
+            f"queues     dispatch {value('queue_dispatch'):.0f} | tg {value('queue_telegram'):.0f} | "
+            f"outbox {value('queue_outbox'):.0f} | history {value('queue_history'):.0f} | "
+            f"price checks {value('price_checks_pending'):.0f}"
+        )
+        if value('ws_connected'):
+            lines.append(
+                f"ws         up {format_duration(value('ws_uptime_s'))}, rtt {value('ws_rtt_ms'):.0f} ms, "
+                f"reconnects {value('ws_reconnects'):.0f}"
+            )
+        else:
+            lines.append(
+                f"ws         DOWN {format_duration(value('ws_downtime_s'))}, reconnects {value('ws_reconnects'):.0f}"
+            )
+        if ('publisher_subscribers', '') in metrics.gauges:
+            lines.append(
+                f"publisher  {value('publisher_subscribers'):.0f} clients, queued {value('publisher_queued'):.0f}, "
+                f"{metrics.rate('publisher_sent'):.2f} sent/s, dropped {value('publisher_dropped'):.0f}"
+            )
+        lines.append(
+            f"http       {metrics.rate('http_requests'):.2f} req/s, "
+            f"errors {share(metrics.rate('http_errors'), metrics.rate('http_requests'))}, "
+            f"429 {value('http_rate_limited'):.0f}"
+        )
+        hits = value('quote_cache', 'hit')
+        lookups = hits + value('quote_cache', 'stale') + value('quote_cache', 'miss')
+        lines.append(f"quotes     hit {share(hits, lookups)} ({hits:.0f}/{lookups:.0f})")
+        loop_lag = metrics.histograms.get(('loop_lag_ms', ''))
+        loop_percentiles = loop_lag.percentiles(50, 99) if loop_lag else None
+        if loop_percentiles:
+            lines.append(f"loop lag   p50 {loop_percentiles[0]:.1f} p99 {loop_percentiles[1]:.1f} max {loop_lag.max:.1f} ms")
+
+        message = "*Monitoring Bot Started*\n\n"
+        message += f"*Active Chains:* {', '.join(chains)}\n\n"
+        message += "```\n" + "\n".join(lines) + "\n```\n"
+        message += f"\n*Last Update:* `{current_time}`"
+        return message
+
     async def _update_status_loop(self, chains: list[str]):
         """
-        Background task that updates the status message every 20 seconds
+        Background task that refreshes the status panel every STATUS_UPDATE_INTERVAL seconds
         
         Args:
             chains: List of enabled chains
         """
 
         while True:
-            await asyncio.sleep(20)
+            await asyncio.sleep(STATUS_UPDATE_INTERVAL)
             
             if not self._status_message_id:
                 break
             
             try:
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                message = "*Monitoring Bot Started*\n\n"
-                message += f"*Active Chains:*\n\n"
-                for chain in chains:
-                    message += f"  • {chain}\n"
-                message += f"\n_Monitoring for events_\n"
-                message += f"\n*Last Update:* `{current_time}`"
-                
-                await self.bot.edit_message_text(
-                    chat_id=self.tech_alerts,
+                self.metrics.sample()
+                await self._sender(self.tech_alerts).send(
+                    PRIORITY_NORMAL,
+                    method='edit_message_text',
                     message_id=self._status_message_id,
-                    text=message,
+                    text=self._status_message(chains),
                     parse_mode="Markdown"
                 )
                 #self.logger.debug("Status message updated")
@@ -1,4 +1,9 @@
 from .logger_utils import get_logger
 from .http_client import HttpClient
 from .gecko_manager import Gecko
-from .db_reader import get_full_token_list
\ No newline at end of file
+from .persistence import JsonPersistence, get_persistence
+from .snapshot import StartupSnapshot, get_startup_snapshot, source_stats
+from .token_registry import TokenRegistry, get_token_registry
+from .db_reader import get_full_token_list
+from .banned_registry import BannedRegistry, get_banned_registry
+from .metrics import Metrics, get_metrics
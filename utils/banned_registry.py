@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from typing import Optional
+from config import BANNED_PATH
+from .logger_utils import get_logger
+from .persistence import get_persistence
+
+# How often membership checks may stat banned.json for outside edits
+MTIME_CHECK_INTERVAL = 1.0
+
+
+class BannedRegistry:
+    """Banned tokens loaded once per process, reloaded when banned.json changes on disk"""
+
+    def __init__(self, path: str = BANNED_PATH):
+        self.path = path
+        self.logger = get_logger("BANNED")
+        self._entries: dict = {}
+        # lowercase address -> key as stored in banned.json
+        self._normalized: dict = {}
+        self._mtime_ns: Optional[int] = None
+        self._last_check = 0.0
+        self._refresh(force=True)
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self, force: bool = False, check_now: bool = False):
+        now = time.monotonic()
+        if not (force or check_now) and now - self._last_check < MTIME_CHECK_INTERVAL:
+            return
+        self._last_check = now
+        if get_persistence().is_pending(self.path):
+            # Our own write has not landed yet, memory is newer than the file
+            return
+        mtime_ns = self._file_mtime()
+        if not force and mtime_ns == self._mtime_ns:
+            return
+        self._mtime_ns = mtime_ns
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self._entries = data if isinstance(data, dict) else {}
+        self._normalized = {address.lower(): address for address in self._entries}
+        self.logger.debug(f"Loaded {len(self._entries)} banned tokens")
+
+    def _save(self):
+        def remember_mtime():
+            self._mtime_ns = self._file_mtime()
+        get_persistence().write(self.path, dict(self._entries), on_written=remember_mtime)
+
+    def invalidate(self):
+        self._refresh(force=True)
+
+    def is_banned(self, token_address: str) -> bool:
+        self._refresh()
+        return token_address.lower() in self._normalized
+
+    def get(self, token_address: str) -> Optional[dict]:
+        self._refresh()
+        stored_key = self._normalized.get(token_address.lower())
+        return None if stored_key is None else self._entries.get(stored_key)
+
+    def get_all(self) -> dict:
+        """Banned entries keyed by address, in insertion order"""
+        self._refresh()
+        return dict(self._entries)
+
+    def ban(self, token_address: str, entry: dict) -> bool:
+        self._refresh(check_now=True)
+        if token_address.lower() in self._normalized:
+            return False
+        self._entries[token_address] = entry
+        self._normalized[token_address.lower()] = token_address
+        self._save()
+        return True
+
+    def unban(self, token_address: str) -> Optional[dict]:
+        """Remove token from the banned list. Returns its entry, None if it was not banned."""
+        self._refresh(check_now=True)
+        normalized = token_address.lower()
+        if normalized not in self._normalized:
+            return None
+        # Hand edited files may hold the same address in several cases, all of them go
+        stored_keys = [address for address in self._entries if address.lower() == normalized]
+        entry = self._entries[self._normalized.pop(normalized)]
+        for address in stored_keys:
+            del self._entries[address]
+        self._save()
+        return entry
+
+
+_registry: Optional[BannedRegistry] = None
+
+
+def get_banned_registry() -> BannedRegistry:
+    """Get the process-wide banned tokens registry"""
+    global _registry
+    if _registry is None:
+        _registry = BannedRegistry()
+    return _registry
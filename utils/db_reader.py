@@ -1,27 +1,22 @@
-from config import CUSTOM_RULES_PATH, SUPPLY_DATA_PATH, CHAIN_NAMES
+from config import CUSTOM_RULES_PATH, CHAIN_NAMES
 from typing import Literal
-import json
+from .token_registry import get_token_registry
+from .persistence import get_persistence
 
-def get_full_token_list(chain_name: Literal[*CHAIN_NAMES]) -> list:
-    """Get list of token addresses for a chain from both supply data and custom rules"""
-    token_list = []
+def get_full_token_list(chain_name: Literal[*CHAIN_NAMES], custom_rules: dict = None) -> list:
+    """
+    Get list of token addresses for a chain from both supply data and custom rules.
+    Pass custom_rules when they are already loaded to skip reading the file.
+    """
     chain_name = chain_name.upper()
-    
-    with open(SUPPLY_DATA_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        if len(data) != 2:
-            return []
-        else: 
-            data = data[1]
-        chain_data = data.get(chain_name, {})
-        for token_address in chain_data.keys():
-            token_list.append(token_address)
+    token_list = get_token_registry().addresses(chain_name)
 
-    with open(CUSTOM_RULES_PATH, 'r', encoding='utf-8') as f:
-        custom_rules = json.load(f)
-        chain_rules = custom_rules.get(chain_name, {})
-        for token_address in chain_rules.keys():
-            if token_address not in token_list:
-                token_list.append(token_address)
+    if custom_rules is None:
+        custom_rules = get_persistence().load(CUSTOM_RULES_PATH, default={})
+    chain_rules = custom_rules.get(chain_name, {})
+    known = set(token_list)
+    for token_address in chain_rules.keys():
+        if token_address not in known:
+            token_list.append(token_address)
     
     return token_list
\ No newline at end of file
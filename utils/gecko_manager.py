@@ -21,6 +21,19 @@ class Gecko(HttpClient):
             return 0
         return float(price)
     
+    async def get_token_prices_simple(self, chain_name: Literal[*CHAIN_NAMES], token_addresses: list) -> dict:
+        """Batched simple price lookup. Returns {lowercase_address: price} for tokens with a price."""
+        url = f"simple/token_price/{self._chain_name_to_gecko(chain_name)}?contract_addresses={','.join(token_addresses)}&vs_currencies=usd"
+        data = await self.get_json(url)
+        prices = {}
+        for address, price_data in data.items():
+            if not isinstance(price_data, dict):
+                continue
+            price = price_data.get("usd")
+            if price:
+                prices[address.lower()] = float(price)
+        return prices
+    
     async def get_token_data_for_message(self, chain_name: Literal[*CHAIN_NAMES], token_address: str) -> dict:
         url = f"onchain/networks/{self._chain_name_to_gecko(chain_name)}/tokens/{token_address}"
         data = await self.get_json(url)
@@ -4,6 +4,7 @@ import asyncio
 from typing import Optional, Any
 from config import REQUEST_RETRY, REQUEST_TIMEOUT, ERROR_429_RETRIES, ERROR_429_DELAY
 from .logger_utils import get_logger
+from .metrics import get_metrics
 
 class HttpClient:
     def __init__(
@@ -17,6 +18,10 @@ class HttpClient:
         self.timeout = timeout
         self.logger = get_logger("HTTP")
         self._session: Optional[AsyncSession] = None
+        metrics = get_metrics()
+        self._requests = metrics.counter('http_requests')
+        self._errors = metrics.counter('http_errors')
+        self._rate_limited = metrics.counter('http_rate_limited')
 
     async def _get_session(self) -> AsyncSession:
         if self._session is None:
@@ -42,6 +47,7 @@ class HttpClient:
         attempt = 0
         
         while True:
+            self._requests.inc()
             try:
                 session = await self._get_session()
                 response = await session.request(
@@ -53,6 +59,7 @@ class HttpClient:
                 )
                 
                 if response.status_code == 429:
+                    self._rate_limited.inc()
                     rate_limit_attempts += 1
                     if rate_limit_attempts > ERROR_429_RETRIES:
                         self.logger.error(f"Rate limit exceeded after {ERROR_429_RETRIES} retries: {full_url}")
@@ -64,6 +71,7 @@ class HttpClient:
                 return response
                 
             except (RequestsError, asyncio.TimeoutError, TimeoutError) as e:
+                self._errors.inc()
                 attempt += 1
                 if attempt > retries:
                     self.logger.error(f"Request failed after {retries} retries: {full_url} - {e}")
@@ -72,6 +80,7 @@ class HttpClient:
                 await asyncio.sleep(1)
                 
             except Exception as e:
+                self._errors.inc()
                 self.logger.error(f"Unexpected error: {full_url} - {str(e)}")
                 return None
                 
@@ -0,0 +1,143 @@
+"""
+In-process metrics registry for the operations panel.
+Hot paths report with one attribute update: they look their metric up once
+(metrics.counter('blocks', chain)) and keep it. Rates are computed on read
+from counter samples taken by the reader, percentiles from a bounded window
+of the latest observations.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+from config import METRICS_HISTOGRAM_SIZE, LOOP_LAG_CHECK_INTERVAL
+
+
+class Counter:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    """Last set value, or the result of fn for values owned by someone else (queue sizes)"""
+    __slots__ = ('_value', '_fn')
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._value = 0
+        self._fn = fn
+
+    def set(self, value: float):
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._fn() if self._fn else self._value
+
+
+class Histogram:
+    """Latest METRICS_HISTOGRAM_SIZE observations, sorted only when read"""
+    __slots__ = ('_values', 'count')
+
+    def __init__(self, size: int = METRICS_HISTOGRAM_SIZE):
+        self._values: deque = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, value: float):
+        self._values.append(value)
+        self.count += 1
+
+    def percentiles(self, *percents: float) -> Optional[Tuple[float, ...]]:
+        """Values at the given percents (0-100) of the window, None if nothing was observed"""
+        if not self._values:
+            return None
+        values = sorted(self._values)
+        last = len(values) - 1
+        return tuple(values[min(last, int(last * percent / 100 + 0.5))] for percent in percents)
+
+    @property
+    def max(self) -> Optional[float]:
+        return max(self._values) if self._values else None
+
+
+class Metrics:
+    """Metrics by (name, label). Label is usually the chain name, '' when there is none."""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, str], Counter] = {}
+        self.gauges: Dict[Tuple[str, str], Gauge] = {}
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        # (monotonic time, counter values) of the two latest samples
+        self._samples: deque = deque(maxlen=2)
+        self._loop_monitor: Optional[asyncio.Task] = None
+
+    def counter(self, name: str, label: str = '') -> Counter:
+        counter = self.counters.get((name, label))
+        if counter is None:
+            counter = self.counters[(name, label)] = Counter()
+        return counter
+
+    def gauge(self, name: str, label: str = '', fn: Optional[Callable[[], float]] = None) -> Gauge:
+        """Get a gauge. Passing fn (re)binds the gauge to a callable evaluated on read."""
+        gauge = self.gauges.get((name, label))
+        if gauge is None:
+            gauge = self.gauges[(name, label)] = Gauge(fn)
+        elif fn is not None:
+            gauge._fn = fn
+        return gauge
+
+    def histogram(self, name: str, label: str = '') -> Histogram:
+        histogram = self.histograms.get((name, label))
+        if histogram is None:
+            histogram = self.histograms[(name, label)] = Histogram()
+        return histogram
+
+    def labels(self, name: str) -> list[str]:
+        """Labels reported for a metric name, in registration order"""
+        return list(dict.fromkeys(
+            label for metrics in (self.counters, self.gauges, self.histograms)
+            for metric_name, label in metrics if metric_name == name
+        ))
+
+    def sample(self):
+        """Record counter values. rate() reports the change between the two latest samples."""
+        self._samples.append((time.monotonic(), {key: counter.value for key, counter in self.counters.items()}))
+
+    def rate(self, name: str, label: str = '') -> float:
+        """Per second increase of a counter between the two latest samples"""
+        if len(self._samples) < 2:
+            return 0.0
+        (previous_at, previous), (current_at, current) = self._samples
+        key = (name, label)
+        return (current.get(key, 0) - previous.get(key, 0)) / max(current_at - previous_at, 1e-9)
+
+    def start_loop_monitor(self, interval: float = LOOP_LAG_CHECK_INTERVAL):
+        """Measure how late the event loop wakes up a sleeping task, into the loop_lag_ms histogram"""
+        if self._loop_monitor is None or self._loop_monitor.done():
+            self._loop_monitor = asyncio.create_task(self._loop_monitor_loop(interval))
+
+    def stop_loop_monitor(self):
+        if self._loop_monitor:
+            self._loop_monitor.cancel()
+            self._loop_monitor = None
+
+    async def _loop_monitor_loop(self, interval: float):
+        lag = self.histogram('loop_lag_ms')
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            lag.observe(max(0.0, time.monotonic() - expected) * 1000)
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Get the process-wide metrics registry"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
@@ -0,0 +1,157 @@
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+import ujson
+from config import PERSIST_COALESCE_DELAY, PERSIST_COMPACT_THRESHOLD_KB
+from .logger_utils import get_logger
+
+# Marks a pending delete instead of a write
+_DELETE = object()
+# Attempts to serialize data that the event loop keeps mutating
+SERIALIZE_RETRIES = 3
+
+
+class JsonPersistence:
+    """
+    Write-behind JSON state files.
+    Writes are queued per path and done by one worker thread: serialize,
+    write to a temp file, fsync, rename over the target. Rapid writes to the
+    same path within PERSIST_COALESCE_DELAY collapse into one. Files bigger
+    than PERSIST_COMPACT_THRESHOLD_KB are written without indentation.
+    """
+
+    def __init__(self):
+        self.logger = get_logger("PERSIST")
+        self._cond = threading.Condition()
+        self._pending: dict[str, tuple[Any, Optional[Callable]]] = {}
+        self._in_flight: set[str] = set()
+        self._thread = threading.Thread(target=self._worker_loop, name="json-persistence", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def write(self, path: str, data: Any, on_written: Callable = None):
+        """Queue data for writing to path. on_written runs on the worker thread after the rename."""
+        with self._cond:
+            self._pending[path] = (data, on_written)
+            self._cond.notify_all()
+
+    def remove(self, path: str):
+        """Queue deletion of path, dropping any write still pending for it"""
+        with self._cond:
+            self._pending[path] = (_DELETE, None)
+            self._cond.notify_all()
+
+    def is_pending(self, path: str) -> bool:
+        with self._cond:
+            return path in self._pending or path in self._in_flight
+
+    def exists(self, path: str) -> bool:
+        """Whether path exists once queued writes and deletes are applied"""
+        with self._cond:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return pending[0] is not _DELETE
+        return os.path.exists(path)
+
+    def load(self, path: str, default: Any = None) -> Any:
+        """Read a JSON file, preferring data that is queued but not written yet"""
+        with self._cond:
+            pending = self._pending.get(path)
+        if pending is not None:
+            return default if pending[0] is _DELETE else pending[0]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return ujson.load(f)
+        except FileNotFoundError:
+            return default
+
+    def flush(self, timeout: float = 30):
+        """Block until everything queued so far is on disk"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.logger.warning(f"Flush timed out with {len(self._pending)} files pending")
+                    return
+                self._cond.wait(remaining)
+
+    @staticmethod
+    def _serialize(data: Any) -> str:
+        for attempt in range(SERIALIZE_RETRIES):
+            try:
+                text = ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False)
+                if len(text) < PERSIST_COMPACT_THRESHOLD_KB * 1024:
+                    text = ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False, indent=4)
+                return text
+            except RuntimeError:
+                # Dict changed size while being walked, try again
+                if attempt == SERIALIZE_RETRIES - 1:
+                    raise
+                time.sleep(0.05)
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def _process(self, path: str, data: Any, on_written: Optional[Callable]):
+        if data is _DELETE:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return
+        t1 = time.perf_counter()
+        text = self._serialize(data)
+        self._write_atomic(path, text)
+        if on_written:
+            on_written()
+        self.logger.debug(f"Saved {path} ({len(text) / 1024:.0f} KB) in {time.perf_counter() - t1:.2f}s")
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let rapid successive writes to the same files collapse
+            time.sleep(PERSIST_COALESCE_DELAY)
+            with self._cond:
+                batch = self._pending
+                self._pending = {}
+                self._in_flight = set(batch)
+            for path, (data, on_written) in batch.items():
+                try:
+                    self._process(path, data, on_written)
+                except Exception as e:
+                    self.logger.error(f"Failed to save {path}: {e}")
+                finally:
+                    with self._cond:
+                        self._in_flight.discard(path)
+                        self._cond.notify_all()
+
+
+_persistence: Optional[JsonPersistence] = None
+
+
+def get_persistence() -> JsonPersistence:
+    """Get the process-wide JSON persistence service"""
+    global _persistence
+    if _persistence is None:
+        _persistence = JsonPersistence()
+    return _persistence
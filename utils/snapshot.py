@@ -0,0 +1,176 @@
+"""
+Binary startup snapshot.
+Named sections (token data, custom rules, filters, labels), one file per
+section, each a marshal blob stored together with the mtime/size its source
+files had when the data was parsed. A section is only used while its sources
+are unchanged, otherwise callers fall back to parsing the source files.
+Sections are written by a background thread, only the section that changed.
+
+File <STARTUP_SNAPSHOT_PATH>.<quoted section name>:
+    MAGIC | version u16 | header length u32 | marshal(header) | section blob
+"""
+import atexit
+import gc
+import marshal
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Iterable, Optional
+from urllib.parse import quote
+from config import STARTUP_SNAPSHOT_PATH
+from .logger_utils import get_logger
+
+SNAPSHOT_MAGIC = b'OCSNAP'
+SNAPSHOT_VERSION = 2
+PREFIX = struct.Struct('<6sHI')
+# Attempts to marshal data that the event loop keeps mutating
+SERIALIZE_RETRIES = 3
+
+
+def _stat_source(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def source_stats(source_paths: Iterable[str]) -> tuple:
+    """(path, stat) of source files. Take it before reading them, so edits made while parsing invalidate the section."""
+    return tuple((source_path, _stat_source(source_path)) for source_path in source_paths)
+
+
+class StartupSnapshot:
+    """Sections are read from their own files, puts are queued for the writer thread"""
+
+    def __init__(self, path: str = STARTUP_SNAPSHOT_PATH):
+        self.path = path
+        self.logger = get_logger("SNAPSHOT")
+        self._cond = threading.Condition()
+        # name -> (sources, data) waiting for the writer
+        self._pending: dict[str, tuple[tuple, Any]] = {}
+        self._in_flight: set[str] = set()
+        self._thread = threading.Thread(target=self._worker_loop, name="startup-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _section_path(self, name: str) -> str:
+        return f"{self.path}.{quote(name, safe='')}"
+
+    def get(self, name: str) -> Any:
+        """Section data, None if missing, not written yet or any of its source files changed since parsing"""
+        with self._cond:
+            if name in self._pending or name in self._in_flight:
+                return None
+        try:
+            with open(self._section_path(name), 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            magic, version, header_len = PREFIX.unpack_from(raw, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                self.logger.warning(f"Unsupported snapshot section {name}, ignoring")
+                return None
+            header = marshal.loads(raw[PREFIX.size:PREFIX.size + header_len])
+        except (struct.error, ValueError, EOFError, TypeError) as e:
+            self.logger.warning(f"Broken snapshot section {name}, ignoring: {e}")
+            return None
+        if header.get('python') != list(sys.version_info[:2]):
+            self.logger.info(f"Snapshot section {name} written by another Python version, ignoring")
+            return None
+        for source_path, stat in header.get('sources', []):
+            if _stat_source(source_path) != (tuple(stat) if stat is not None else None):
+                self.logger.debug(f"Snapshot section {name} is stale: {source_path} changed")
+                return None
+        # Cyclic GC passes over the freshly built containers cost more than decoding itself
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return marshal.loads(memoryview(raw)[PREFIX.size + header_len:])
+        except (ValueError, EOFError, TypeError) as e:
+            self.logger.warning(f"Broken snapshot section {name}: {e}")
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def put(self, name: str, data: Any, sources: tuple):
+        """
+        Queue a section write. sources comes from source_stats() taken before the data was parsed.
+        data must not be replaced wholesale afterwards. In-place updates are tolerated.
+        """
+        with self._cond:
+            self._pending[name] = (sources, data)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 30):
+        """Block until every queued section is on disk"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.logger.warning(f"Snapshot flush timed out with {len(self._pending)} sections pending")
+                    return
+                self._cond.wait(remaining)
+
+    @staticmethod
+    def _serialize(data: Any) -> bytes:
+        for attempt in range(SERIALIZE_RETRIES):
+            try:
+                return marshal.dumps(data)
+            except RuntimeError:
+                # Dict changed size while being walked, try again
+                if attempt == SERIALIZE_RETRIES - 1:
+                    raise
+                time.sleep(0.05)
+
+    def _write(self, name: str, sources: tuple, data: Any):
+        t1 = time.perf_counter()
+        blob = self._serialize(data)
+        header = marshal.dumps({
+            'python': list(sys.version_info[:2]),
+            'sources': [[source_path, list(stat) if stat is not None else None] for source_path, stat in sources],
+        })
+        path = self._section_path(name)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+            f.write(header)
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.logger.debug(f"Snapshot section {name} written ({len(blob) / 1024:.0f} KB) in {time.perf_counter() - t1:.2f}s")
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch = self._pending
+                self._pending = {}
+                self._in_flight = set(batch)
+            for name, (sources, data) in batch.items():
+                try:
+                    self._write(name, sources, data)
+                except Exception as e:
+                    self.logger.error(f"Failed to write snapshot section {name}: {e}")
+            with self._cond:
+                self._in_flight = set()
+                self._cond.notify_all()
+
+
+_snapshot: Optional[StartupSnapshot] = None
+
+
+def get_startup_snapshot() -> StartupSnapshot:
+    """Get the process-wide startup snapshot"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = StartupSnapshot()
+    return _snapshot
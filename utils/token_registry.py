@@ -0,0 +1,165 @@
+import json
+from datetime import datetime
+from typing import Optional
+from config import SUPPLY_DATA_PATH
+from .logger_utils import get_logger
+from .persistence import get_persistence
+from .snapshot import get_startup_snapshot, source_stats
+
+
+class TokenRegistry:
+    """
+    Process-wide owner of parsed token data: {chain: {address: token_info}}.
+    Chain dicts are mutated in place so detectors holding them see every update.
+    Lookup indexes and snapshots are rebuilt lazily once per data version.
+    metadata_version changes only with the token set or token metadata (tickers,
+    futures), not with price refreshes, for caches that do not depend on prices.
+    """
+
+    def __init__(self, path: str = SUPPLY_DATA_PATH):
+        self.path = path
+        self.logger = get_logger("TOKEN_REGISTRY")
+        self.data: dict[str, dict] = {}
+        self.updated_at: Optional[datetime] = None
+        self.loaded = False
+        self.version = 0
+        self.metadata_version = 0
+        self._index_version = -1
+        self._by_address: dict[str, list[tuple[str, str]]] = {}
+        self._by_cmc_id: dict[int, list[tuple[str, str]]] = {}
+        self._by_ticker: dict[str, list[tuple[str, str]]] = {}
+        self._snapshot: Optional[dict] = None
+        self._snapshot_version = -1
+        self._load()
+
+    def _load(self):
+        snapshot = get_startup_snapshot()
+        raw = snapshot.get('token_data')
+        if raw is None:
+            sources = source_stats([self.path])
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+            except FileNotFoundError:
+                self.logger.warning(f'Token data file not found, starting empty')
+                return
+            except json.JSONDecodeError as e:
+                self.logger.error(f'Failed to parse {self.path}: {e}')
+                return
+            snapshot.put('token_data', raw, sources)
+        if not isinstance(raw, list) or len(raw) != 2 or not isinstance(raw[1], dict):
+            return
+        self.data.update(raw[1])
+        self.updated_at = datetime.fromisoformat(raw[0]) if raw[0] else None
+        self.loaded = True
+        self.touch()
+        self.logger.info(f'Loaded {sum(len(chain_data) for chain_data in self.data.values())} contracts')
+
+    def touch(self, metadata: bool = True):
+        """
+        Mark data as changed. Call after mutating chain dicts or token infos directly.
+        Pass metadata=False when only prices changed.
+        """
+        self.version += 1
+        if metadata:
+            self.metadata_version += 1
+
+    def _ensure_indexes(self):
+        if self._index_version == self.version:
+            return
+        by_address, by_cmc_id, by_ticker = {}, {}, {}
+        for chain_name, chain_data in self.data.items():
+            for address, token_info in chain_data.items():
+                key = (chain_name, address)
+                by_address.setdefault(address.lower(), []).append(key)
+                if token_info.get('cmc_id') is not None:
+                    by_cmc_id.setdefault(token_info['cmc_id'], []).append(key)
+                if token_info.get('ticker'):
+                    by_ticker.setdefault(token_info['ticker'].upper(), []).append(key)
+        self._by_address, self._by_cmc_id, self._by_ticker = by_address, by_cmc_id, by_ticker
+        self._index_version = self.version
+
+    def chain(self, chain_name: str) -> dict:
+        """Live token dict of a chain"""
+        return self.data.setdefault(chain_name, {})
+
+    def get(self, chain_name: str, token_address: str) -> Optional[dict]:
+        return self.data.get(chain_name, {}).get(token_address)
+
+    def addresses(self, chain_name: str) -> list:
+        return list(self.data.get(chain_name, {}).keys())
+
+    def _resolve(self, keys: list) -> list[tuple[str, str, dict]]:
+        return [
+            (chain_name, address, self.data[chain_name][address])
+            for chain_name, address in keys
+            if address in self.data.get(chain_name, {})
+        ]
+
+    def find(self, token_address: str) -> list[tuple[str, str, dict]]:
+        """(chain, address, token_info) for every chain the address is tracked on, case-insensitive"""
+        self._ensure_indexes()
+        return self._resolve(self._by_address.get(token_address.lower(), []))
+
+    def by_cmc_id(self, cmc_id: int) -> list[tuple[str, str, dict]]:
+        self._ensure_indexes()
+        return self._resolve(self._by_cmc_id.get(cmc_id, []))
+
+    def by_ticker(self, ticker: str) -> list[tuple[str, str, dict]]:
+        self._ensure_indexes()
+        return self._resolve(self._by_ticker.get(ticker.upper(), []))
+
+    def snapshot(self) -> dict:
+        """Copy of the data for readers that must not see later updates. Cached per version."""
+        if self._snapshot_version != self.version:
+            self._snapshot = {
+                chain_name: {address: dict(token_info) for address, token_info in chain_data.items()}
+                for chain_name, chain_data in self.data.items()
+            }
+            self._snapshot_version = self.version
+        return self._snapshot
+
+    def replace(self, new_data: dict):
+        """Replace data of every chain in new_data, keeping chain dict identity"""
+        for chain_name, chain_data in new_data.items():
+            live_chain_data = self.chain(chain_name)
+            live_chain_data.clear()
+            live_chain_data.update(chain_data)
+        self.loaded = True
+        self.touch()
+
+    def set_token(self, chain_name: str, token_address: str, token_info: dict):
+        self.chain(chain_name)[token_address] = token_info
+        self.touch()
+
+    def remove_token(self, token_address: str) -> list[str]:
+        """Remove address from every chain. Returns chains it was removed from."""
+        chains = []
+        for chain_name, address, _ in self.find(token_address):
+            del self.data[chain_name][address]
+            chains.append(chain_name)
+        if chains:
+            self.touch()
+        return chains
+
+    def save(self, updated_at: Optional[datetime] = None):
+        """Queue an atomic write of the data. updated_at marks a finished parse and defaults to the stored time."""
+        if updated_at is not None:
+            self.updated_at = updated_at
+        stored = [self.updated_at.isoformat() if self.updated_at else None, self.data]
+        get_persistence().write(
+            self.path,
+            stored,
+            on_written=lambda: get_startup_snapshot().put('token_data', stored, source_stats([self.path]))
+        )
+
+
+_registry: Optional[TokenRegistry] = None
+
+
+def get_token_registry() -> TokenRegistry:
+    """Get the process-wide token registry"""
+    global _registry
+    if _registry is None:
+        _registry = TokenRegistry()
+    return _registry